@@ -0,0 +1,4 @@
+# ============================================================================
+# Offline benchmarks for the download, rename and subtitle pipelines
+# Run from the repository root: python -m benchmarks.run_benchmarks
+# ============================================================================
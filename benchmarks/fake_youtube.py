@@ -0,0 +1,121 @@
+# ============================================================================
+# Local stand-in for YouTube used by the benchmarks
+# A threaded HTTP server serves synthetic channel pages, video metadata and
+# media files; the yt-dlp plugin in benchmarks/plugins answers youtube.com
+# channel and watch URLs from it, so the scripts run unchanged offline
+# ============================================================================
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+# ============================================================================
+PAGE_SIZE = 30  # entries per continuation page, like the real /videos tab
+
+def video_id(index):
+    return f"v{index:010d}"
+
+# Titles include characters the sanitizers have to deal with
+def video_title(index):
+    return f"Synthetic lesson {index}: part {index % 7}? \"Q&A\" | take {index % 3}"
+# ============================================================================
+class FakeYoutube:
+    def __init__(self, channel_size=1000, media_bytes=64 * 1024, page_delay=0.0):
+        self.channel_size = channel_size
+        self.new_items = 0  # videos "uploaded" since the last sync, listed first
+        self.media_bytes = media_bytes
+        self.page_delay = page_delay
+        self.requests = {"page": 0, "video": 0, "media": 0}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fake._handle(self)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, kind):
+        with self._lock:
+            self.requests[kind] += 1
+
+    # Video indexes newest first: the new uploads, then the original channel
+    def listing(self, start, stop):
+        total = self.channel_size + self.new_items
+        return range(total - 1 - start, max(total - 1 - stop, -1), -1)
+
+    def _handle(self, request):
+        url = urlparse(request.path)
+        query = parse_qs(url.query)
+
+        if url.path.startswith("/page"):
+            self._count("page")
+            if self.page_delay:
+                time.sleep(self.page_delay)
+            page = int(query.get("n", ["0"])[0])
+            indexes = self.listing(page * PAGE_SIZE, (page + 1) * PAGE_SIZE)
+            body = {
+                "entries": [{"id": video_id(i), "title": video_title(i), "duration": 60 + i % 600} for i in indexes],
+                "next": page + 1 if (page + 1) * PAGE_SIZE < self.channel_size + self.new_items else None,
+            }
+            return self._send_json(request, body)
+
+        match = re.match(r"^/video/(v\d{10})$", url.path)
+        if match:
+            self._count("video")
+            index = int(match.group(1)[1:])
+            return self._send_json(request, {
+                "id": match.group(1), "title": video_title(index), "duration": 60 + index % 600,
+                "description": f"Synthetic description for lesson {index}", "upload_date": "20240101",
+                "filesize": self.media_bytes,
+            })
+
+        match = re.match(r"^/media/(v\d{10})\.mp4$", url.path)
+        if match:
+            self._count("media")
+            seed = hashlib.sha1(match.group(1).encode()).digest()
+            body = (seed * (self.media_bytes // len(seed) + 1))[:self.media_bytes]
+            request.send_response(200)
+            request.send_header("Content-Type", "video/mp4")
+            request.send_header("Content-Length", str(len(body)))
+            request.end_headers()
+            request.wfile.write(body)
+            return
+
+        request.send_error(404)
+
+    def _send_json(self, request, body):
+        data = json.dumps(body).encode()
+        request.send_response(200)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
@@ -0,0 +1,61 @@
+# ============================================================================
+# yt-dlp plugin extractors for the benchmark stand-in
+# With FAKE_YOUTUBE_URL set, youtube.com channel and watch URLs are answered
+# from the local server in benchmarks/fake_youtube.py instead of YouTube
+# Plugin extractors are tried before the built-in ones; without the variable
+# they match nothing
+# ============================================================================
+import os
+
+from yt_dlp.extractor.common import InfoExtractor
+# ============================================================================
+def _base_url():
+    return os.environ.get('FAKE_YOUTUBE_URL', '').rstrip('/')
+
+class _FakeYoutubeBaseIE(InfoExtractor):
+    @classmethod
+    def suitable(cls, url):
+        return bool(_base_url()) and super().suitable(url)
+# ============================================================================
+class FakeYoutubeIE(_FakeYoutubeBaseIE):
+    IE_NAME = 'fakeyoutube'
+    _VALID_URL = r'https?://(?:www\.)?youtube\.com/watch\?v=(?P<id>v\d{10})'
+
+    def _real_extract(self, url):
+        video_id = self._match_id(url)
+        data = self._download_json(f"{_base_url()}/video/{video_id}", video_id, note=False)
+        return {
+            'id': video_id,
+            'title': data['title'],
+            'duration': data['duration'],
+            'description': data['description'],
+            'upload_date': data['upload_date'],
+            'formats': [{
+                'format_id': '22',
+                'url': f"{_base_url()}/media/{video_id}.mp4",
+                'ext': 'mp4',
+                'height': 720,
+                'vcodec': 'avc1.64001F',
+                'acodec': 'mp4a.40.2',
+                'filesize': data['filesize'],
+            }],
+        }
+# ============================================================================
+class FakeYoutubeTabIE(_FakeYoutubeBaseIE):
+    IE_NAME = 'fakeyoutube:tab'
+    _VALID_URL = r'https?://(?:www\.)?youtube\.com/@(?P<id>[^/?#]+)(?:/videos)?/?$'
+
+    # One continuation page per request, like the real /videos tab
+    def _entries(self, channel):
+        page = 0
+        while page is not None:
+            data = self._download_json(f"{_base_url()}/page?n={page}", channel,
+                                       note=False, errnote=f"Unable to download page {page}")
+            for entry in data['entries']:
+                yield self.url_result(f"https://www.youtube.com/watch?v={entry['id']}", FakeYoutubeIE.ie_key(),
+                                      entry['id'], entry['title'], duration=entry['duration'])
+            page = data['next']
+
+    def _real_extract(self, url):
+        channel = self._match_id(url)
+        return self.playlist_result(self._entries(channel), channel, channel)
@@ -0,0 +1,334 @@
+# ============================================================================
+# Offline end-to-end benchmarks
+# Every script runs unchanged in its own scratch folder with a generated
+# settings.ini, while yt-dlp is pointed at the local fake YouTube through the
+# plugin in benchmarks/plugins
+# Results are written to benchmarks/results/latest.json and compared with
+# benchmarks/baseline.json (save one with --save-baseline)
+#
+#   python -m benchmarks.run_benchmarks --sizes 1000 10000 100000
+# ============================================================================
+import argparse
+import csv
+import importlib.util
+import json
+import math
+import os
+import platform
+import re
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from datetime import datetime
+
+from benchmarks.fake_youtube import FakeYoutube, video_id, video_title
+# ============================================================================
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+PLUGIN_DIR = os.path.join(BENCHMARK_DIR, 'plugins')
+RESULTS_FILE = os.path.join(BENCHMARK_DIR, 'results', 'latest.json')
+BASELINE_FILE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+
+SCHEMA_VERSION = 1
+CHANNEL_URL = "https://www.youtube.com/@benchmark/videos"
+NEW_UPLOADS = 10        # videos added before the incremental re-sync
+FOLDER_SIZE = 1000      # files per subfolder in the sanitize benchmark
+SAMPLE_RATE = 16000
+
+DONE_LINE = re.compile(r'Done\. Total: (\d+), Downloaded: (\d+), Skipped: (\d+), Failed: (\d+)')
+# ============================================================================
+# One scratch folder per benchmark, holding settings.ini and a copy of the
+# script, run from that folder the way a user runs it from the repository
+class Workspace:
+    def __init__(self, root, name, settings, env):
+        self.path = os.path.join(root, name)
+        self.env = env
+        os.makedirs(os.path.join(self.path, settings.get('video_dir', 'videos')), exist_ok=True)
+        with open(os.path.join(self.path, 'settings.ini'), 'w', encoding='utf-8') as f:
+            f.write("[Settings]\n")
+            for key, value in settings.items():
+                f.write(f"{key} = {value}\n")
+
+    def file(self, *parts):
+        return os.path.join(self.path, *parts)
+
+    # Returns (seconds, log text); a failing script raises RuntimeError
+    def run(self, script, *args):
+        if not os.path.exists(self.file(script)):
+            shutil.copy(os.path.join(REPO_DIR, script), self.file(script))
+        log_path = self.file(f"{os.path.splitext(script)[0]}.log")
+        with open(log_path, 'a', encoding='utf-8') as log:
+            start = time.perf_counter()
+            result = subprocess.run([sys.executable, script, *args], cwd=self.path, env=self.env,
+                                    stdout=log, stderr=subprocess.STDOUT)
+            seconds = time.perf_counter() - start
+        with open(log_path, encoding='utf-8', errors='replace') as log:
+            text = log.read()
+        if result.returncode != 0:
+            tail = "\n".join(text.splitlines()[-15:])
+            raise RuntimeError(f"{script} exited with {result.returncode}:\n{tail}")
+        return seconds, text
+
+def _result(seconds, items, **extra):
+    return {"status": "ok", "seconds": round(seconds, 4), "items": items,
+            "items_per_second": round(items / seconds, 2) if seconds else None, **extra}
+
+def _csv_rows(path):
+    with open(path, encoding='utf-8') as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+def _touch(path):
+    open(path, 'wb').close()
+# ============================================================================
+# search_by_channel.py: cold enumeration, then an incremental re-sync after
+# NEW_UPLOADS videos were added to the channel
+def bench_search(fake, workspace, size):
+    fake.channel_size = size
+    fake.new_items = 0
+    fake.requests = dict.fromkeys(fake.requests, 0)
+    seconds, _ = workspace.run('search_by_channel.py')
+    rows = _csv_rows(workspace.file('channel.csv'))
+    full = _result(seconds, rows, requests=dict(fake.requests))
+
+    fake.new_items = NEW_UPLOADS
+    fake.requests = dict.fromkeys(fake.requests, 0)
+    seconds, _ = workspace.run('search_by_channel.py')
+    rows = _csv_rows(workspace.file('channel.csv'))
+    incremental = _result(seconds, rows, requests=dict(fake.requests))
+    return {'search_by_channel.full': full, 'search_by_channel.incremental': incremental}
+# ============================================================================
+# download_by_csv (mp4).py on the enumerated CSV
+# First run: legacy title scan + skip scan + `downloads` real downloads from
+# the fake server; second run: pure archive skip scan with nothing left to do
+def bench_download(fake, workspace, channel_csv, downloads):
+    shutil.copy(channel_csv, workspace.file('channel.csv'))
+    with open(workspace.file('cookies.txt'), 'w', encoding='utf-8') as f:
+        f.write("# Netscape HTTP Cookie File\n")
+
+    with open(channel_csv, encoding='utf-8') as f:
+        rows = list(csv.reader(f))[1:]
+    for _, title, _ in rows[downloads:]:
+        # Named the way an older run of the downloader saved them
+        _touch(workspace.file('videos', re.sub(r'[\\/*?:"<>|]', '', title) + '.mp4'))
+
+    results = {}
+    for name in ('download_mp4.first_run', 'download_mp4.skip_scan'):
+        fake.requests = dict.fromkeys(fake.requests, 0)
+        seconds, log = workspace.run('download_by_csv (mp4).py')
+        totals = DONE_LINE.findall(log)
+        total, downloaded, skipped, failed = (int(n) for n in totals[-1]) if totals else (0, 0, 0, 0)
+        results[name] = _result(seconds, total, downloaded=downloaded, skipped=skipped, failed=failed,
+                                requests=dict(fake.requests))
+    return results
+# ============================================================================
+# rename_by_id.py: every video as "<id>.mp4", every tenth with an .en.srt
+def bench_rename_by_id(workspace, channel_csv):
+    shutil.copy(channel_csv, workspace.file('channel.csv'))
+    with open(channel_csv, encoding='utf-8') as f:
+        ids = [row[0] for row in list(csv.reader(f))[1:]]
+
+    files = 0
+    for index, vid in enumerate(ids):
+        _touch(workspace.file('videos', f"{vid}.mp4"))
+        files += 1
+        if index % 10 == 0:
+            _touch(workspace.file('videos', f"{vid}.en.srt"))
+            files += 1
+
+    seconds, _ = workspace.run('rename_by_id.py')
+    return {'rename_by_id': _result(seconds, files)}
+# ============================================================================
+# rename_to_windows_name.py --recursive over FOLDER_SIZE files per subfolder
+def bench_sanitize(workspace, size):
+    for index in range(size):
+        folder = workspace.file('videos', f"part_{index // FOLDER_SIZE:03d}")
+        if index % FOLDER_SIZE == 0:
+            os.makedirs(folder, exist_ok=True)
+        _touch(os.path.join(folder, f"{video_title(index)} [{video_id(index)}].mp4"))
+
+    seconds, _ = workspace.run('rename_to_windows_name.py', '--recursive')
+    return {'rename_to_windows_name': _result(seconds, size)}
+# ============================================================================
+# subtitle_generator.py on short synthetic clips (a gliding tone with pauses)
+# The clips are WAV data with an .mp4 name; ffmpeg probes the content
+def write_clip(path, seconds, seed):
+    frames = bytearray()
+    for n in range(int(seconds * SAMPLE_RATE)):
+        t = n / SAMPLE_RATE
+        level = 0.3 if int(t * 2) % 3 else 0.0
+        sample = level * math.sin(2 * math.pi * (220 + 40 * seed + 30 * t) * t)
+        frames += struct.pack('<h', int(sample * 32767))
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(bytes(frames))
+
+def subtitles_unavailable():
+    missing = [tool for tool in ('ffmpeg', 'ffprobe') if shutil.which(tool) is None]
+    missing += [module for module in ('whisper', 'numpy') if importlib.util.find_spec(module) is None]
+    return missing
+
+def bench_subtitles(workspace, clips, clip_seconds):
+    for index in range(clips):
+        write_clip(workspace.file('videos', f"clip_{index:02d}.mp4"), clip_seconds, index)
+
+    seconds, _ = workspace.run('subtitle_generator.py')
+    written = sum(1 for name in os.listdir(workspace.file('videos')) if name.endswith('.srt'))
+    audio_seconds = clips * clip_seconds
+    return {'subtitle_generator': _result(seconds, written, audio_seconds=audio_seconds,
+                                          rtf=round(seconds / audio_seconds, 4))}
+# ============================================================================
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    try:
+        import yt_dlp.version
+        yt_dlp_version = yt_dlp.version.__version__
+    except ImportError:
+        yt_dlp_version = None
+    return {"git_commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+            "machine": platform.machine(), "cpu_count": os.cpu_count(), "yt_dlp": yt_dlp_version}
+
+def run_benchmarks(args, root):
+    results = {}
+    with FakeYoutube(media_bytes=args.media_kib * 1024, page_delay=args.page_delay_ms / 1000) as fake:
+        env = dict(os.environ)
+        env['FAKE_YOUTUBE_URL'] = fake.base_url
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [REPO_DIR, PLUGIN_DIR, env.get('PYTHONPATH')]))
+        env['PYTHONIOENCODING'] = 'utf-8'
+        settings = {
+            'channel_url': CHANNEL_URL,
+            'csv_name': 'channel.csv',
+            'video_dir': 'videos',
+            'download_workers': args.download_workers,
+            'requests_per_minute': 0,
+            'max_requests_per_minute': 0,
+            'max_attempts': 1,
+            'retry_delay': 0,
+            'metrics_file': 'metrics.jsonl',
+            'whisper_model': args.whisper_model,
+            'transcribe_workers': args.transcribe_workers,
+        }
+
+        def record(size, name, run):
+            print(f"\033[92m[INFO]\033[0m Running {name} ({size} items)")
+            try:
+                for key, result in run().items():
+                    results[f"{key}@{size}"] = {"size": size, **result}
+            except Exception as e:
+                print(f"\033[91m[ERROR]\033[0m {name} failed: {e}")
+                results[f"{name}@{size}"] = {"size": size, "status": "error", "error": str(e)}
+
+        for size in args.sizes:
+            search = Workspace(root, f"search_{size}", settings, env)
+            channel_csv = search.file('channel.csv')
+            record(size, 'search_by_channel', lambda: bench_search(fake, search, size))
+            if not os.path.exists(channel_csv):
+                continue
+            record(size, 'download_mp4', lambda: bench_download(
+                fake, Workspace(root, f"download_{size}", settings, env), channel_csv, args.downloads))
+            record(size, 'rename_by_id', lambda: bench_rename_by_id(
+                Workspace(root, f"rename_{size}", settings, env), channel_csv))
+            record(size, 'rename_to_windows_name', lambda: bench_sanitize(
+                Workspace(root, f"sanitize_{size}", settings, env), size))
+
+        if args.clips:
+            missing = subtitles_unavailable()
+            if missing:
+                print(f"\033[93m[SKIP]\033[0m subtitle_generator: {', '.join(missing)} not available")
+                results[f"subtitle_generator@{args.clips}"] = {"size": args.clips, "status": "skipped",
+                                                               "error": f"missing {', '.join(missing)}"}
+            else:
+                record(args.clips, 'subtitle_generator', lambda: bench_subtitles(
+                    Workspace(root, 'subtitles', settings, env), args.clips, args.clip_seconds))
+    return results
+# ============================================================================
+# Flag every benchmark slower than the baseline by more than threshold
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"\n{'benchmark':<42}{'seconds':>10}{'items/s':>12}{'baseline':>10}{'change':>9}")
+    for key, result in results.items():
+        if result['status'] != 'ok':
+            print(f"{key:<42}{result['status']:>10}")
+            continue
+        base = baseline.get(key)
+        line = f"{key:<42}{result['seconds']:>10.2f}{result['items_per_second'] or 0:>12.1f}"
+        if base and base.get('status') == 'ok' and base['seconds']:
+            change = result['seconds'] / base['seconds'] - 1
+            line += f"{base['seconds']:>10.2f}{change:>+9.0%}"
+            if change > threshold:
+                regressions.append(key)
+                line += "  \033[91mREGRESSION\033[0m"
+        print(line)
+    return regressions
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+    os.replace(temp_path, path)
+# ============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Time the scripts end to end against a local fake YouTube")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000], help="library sizes to benchmark")
+    parser.add_argument('--downloads', type=int, default=20, help="videos actually downloaded per library size")
+    parser.add_argument('--download-workers', type=int, default=4)
+    parser.add_argument('--media-kib', type=int, default=64, help="size of each synthetic media file")
+    parser.add_argument('--page-delay-ms', type=float, default=0, help="simulated latency per listing page")
+    parser.add_argument('--clips', type=int, default=3, help="synthetic clips for subtitle_generator (0 to skip)")
+    parser.add_argument('--clip-seconds', type=float, default=10)
+    parser.add_argument('--whisper-model', default='tiny')
+    parser.add_argument('--transcribe-workers', type=int, default=1)
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="baseline to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the new baseline")
+    parser.add_argument('--threshold', type=float, default=0.25, help="slowdown reported as a regression")
+    parser.add_argument('--keep', action='store_true', help="keep the scratch folders for inspection")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='youtube_bench_')
+    try:
+        results = run_benchmarks(args, root)
+    finally:
+        if args.keep:
+            print(f"\033[92m[INFO]\033[0m Scratch folders kept in {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+    report = {
+        "schema": SCHEMA_VERSION,
+        "created": datetime.now().isoformat(timespec='seconds'),
+        "environment": environment(),
+        "parameters": {key: value for key, value in vars(args).items()
+                       if key not in ('baseline', 'save_baseline', 'keep')},
+        "results": results,
+    }
+    write_json(RESULTS_FILE, report)
+    print(f"\033[92m[INFO]\033[0m Results saved to {RESULTS_FILE}")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.save_baseline:
+        write_json(args.baseline, report)
+        print(f"\033[92m[INFO]\033[0m Baseline saved to {args.baseline}")
+    if regressions:
+        print(f"\033[91m[ERROR]\033[0m {len(regressions)} benchmark(s) slower than the baseline by more than "
+              f"{args.threshold:.0%}")
+    failed = [key for key, result in results.items() if result['status'] == 'error']
+    return 1 if regressions or failed else 0
+# ============================================================================
+if __name__ == "__main__":
+    sys.exit(main())
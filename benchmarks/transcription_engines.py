@@ -0,0 +1,158 @@
+# ============================================================================
+# Transcription engine comparison on a fixed local clip set
+# Every clip in the clip folder (any format ffmpeg reads) needs a reference
+# transcript next to it with the same name and a .txt extension
+# Each engine transcribes every clip; the report gives load time, realtime
+# factor (processing time / audio length, lower is faster) and word error
+# rate against the references, and names the fastest engine within --max-wer
+# Results are written to benchmarks/results/engines.json
+#
+#   python -m benchmarks.transcription_engines --clips benchmarks/clips \
+#       --engines openai-whisper:base faster-whisper:base:int8
+# ============================================================================
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.run_benchmarks import BENCHMARK_DIR, environment, write_json
+from youtube_tools.audio_prefetch import SAMPLE_RATE, decode_audio, load_pcm
+from youtube_tools.transcription_engines import ENGINES, create_engine
+# ============================================================================
+CLIP_DIR = os.path.join(BENCHMARK_DIR, 'clips')
+RESULTS_FILE = os.path.join(BENCHMARK_DIR, 'results', 'engines.json')
+
+# Case and punctuation do not count as errors; apostrophes stay part of words
+WORD = re.compile(r"[\w']+")
+
+def words(text):
+    return WORD.findall(text.lower())
+
+# Word-level edit distance (substitutions + deletions + insertions)
+def edit_distance(reference, hypothesis):
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1]
+# ============================================================================
+# (name, media_path, reference_text) for every clip with a reference
+def load_clips(folder):
+    clips = []
+    for name in sorted(os.listdir(folder)):
+        stem, ext = os.path.splitext(name)
+        reference = os.path.join(folder, stem + '.txt')
+        if ext.lower() != '.txt' and os.path.exists(reference):
+            with open(reference, encoding='utf-8') as f:
+                clips.append((name, os.path.join(folder, name), f.read()))
+    return clips
+
+# "engine:model[:compute_type]" -> spec dict for create_engine
+def parse_engine(text, threads, beam_size):
+    engine, _, rest = text.partition(':')
+    model, _, compute_type = rest.partition(':')
+    if engine not in ENGINES:
+        raise argparse.ArgumentTypeError(f"unknown engine '{engine}' (available: {', '.join(ENGINES)})")
+    return {'engine': engine, 'model': model or 'base', 'threads': threads or None,
+            'beam_size': beam_size or None, 'compute_type': compute_type or None}
+
+def bench_engine(spec, clips):
+    engine = create_engine(spec)
+    start_time = time.monotonic()
+    engine.load()
+    load_seconds = time.monotonic() - start_time
+
+    per_clip = []
+    for name, pcm_path, audio_seconds, reference in clips:
+        start_time = time.monotonic()
+        segments = engine.transcribe(load_pcm(pcm_path))
+        seconds = time.monotonic() - start_time
+        ref_words = words(reference)
+        errors = edit_distance(ref_words, words(' '.join(segment['text'] for segment in segments)))
+        per_clip.append({'clip': name, 'audio_seconds': round(audio_seconds, 2), 'seconds': round(seconds, 3),
+                         'rtf': round(seconds / audio_seconds, 4), 'words': len(ref_words), 'errors': errors,
+                         'wer': round(errors / max(1, len(ref_words)), 4)})
+
+    audio_total = sum(clip['audio_seconds'] for clip in per_clip)
+    seconds_total = sum(clip['seconds'] for clip in per_clip)
+    words_total = sum(clip['words'] for clip in per_clip)
+    return {'spec': spec, 'load_seconds': round(load_seconds, 2), 'seconds': round(seconds_total, 3),
+            'rtf': round(seconds_total / audio_total, 4) if audio_total else None,
+            'wer': round(sum(clip['errors'] for clip in per_clip) / max(1, words_total), 4),
+            'clips': per_clip}
+# ============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Compare transcription engines on local clips")
+    parser.add_argument('--clips', default=CLIP_DIR, help="folder of clips with .txt reference transcripts")
+    parser.add_argument('--engines', nargs='+', default=['openai-whisper:base', 'faster-whisper:base:int8'],
+                        help="engine:model[:compute_type] to compare")
+    parser.add_argument('--threads', type=int, default=0, help="inference threads (0: engine default)")
+    parser.add_argument('--beam-size', type=int, default=0, help="beam size (0: engine default)")
+    parser.add_argument('--max-wer', type=float, default=0.15, help="accuracy bar for the recommendation")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.clips):
+        print(f"\033[91m[ERROR]\033[0m Clip folder not found: {args.clips}")
+        return 1
+    clips = load_clips(args.clips)
+    if not clips:
+        print(f"\033[91m[ERROR]\033[0m No clips with a .txt reference transcript in {args.clips}")
+        return 1
+    try:
+        specs = [parse_engine(text, args.threads, args.beam_size) for text in args.engines]
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    # Decode every clip once, so all engines get identical audio and decoding is not timed
+    tmp_dir = tempfile.mkdtemp(prefix='engine_bench_')
+    results = []
+    try:
+        decoded = []
+        for index, (name, path, reference) in enumerate(clips):
+            pcm_path = os.path.join(tmp_dir, f"{index}.f32")
+            decode_audio(path, pcm_path)
+            decoded.append((name, pcm_path, os.path.getsize(pcm_path) / 4 / SAMPLE_RATE, reference))
+        print(f"\033[92m[INFO]\033[0m {len(decoded)} clip(s), {sum(clip[2] for clip in decoded):.0f}s of audio")
+
+        for spec, text in zip(specs, args.engines):
+            print(f"\033[92m[INFO]\033[0m Running {text}")
+            try:
+                results.append(bench_engine(spec, decoded) | {'name': text, 'status': 'ok'})
+            except ImportError as e:
+                print(f"\033[93m[SKIP]\033[0m {text}: backend not installed ({e})")
+                results.append({'name': text, 'spec': spec, 'status': 'skipped', 'reason': str(e)})
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"\n{'engine':<36}{'load s':>8}{'RTF':>8}{'WER':>8}")
+    for result in results:
+        if result['status'] != 'ok':
+            print(f"{result['name']:<36}{result['status']:>8}")
+            continue
+        print(f"{result['name']:<36}{result['load_seconds']:>8.1f}{result['rtf']:>8.3f}{result['wer']:>8.1%}")
+
+    eligible = [result for result in results if result['status'] == 'ok' and result['wer'] <= args.max_wer]
+    best = min(eligible, key=lambda result: result['rtf']) if eligible else None
+    if best:
+        print(f"\n\033[92m[INFO]\033[0m Fastest within {args.max_wer:.0%} WER: {best['name']}")
+    else:
+        print(f"\n\033[93m[WARN]\033[0m No engine stayed within {args.max_wer:.0%} WER")
+
+    write_json(RESULTS_FILE, {
+        "created": datetime.now().isoformat(timespec='seconds'),
+        "environment": environment(),
+        "parameters": {key: value for key, value in vars(args).items()},
+        "recommended": best['name'] if best else None,
+        "results": results,
+    })
+    print(f"\033[92m[INFO]\033[0m Results saved to {RESULTS_FILE}")
+    return 0 if best else 1
+# ============================================================================
+if __name__ == "__main__":
+    sys.exit(main())
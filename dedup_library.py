@@ -0,0 +1,11 @@
+# ============================================================================
+# Replace byte-identical files in the library folders with hardlinks
+# Only new or changed files are hashed again; use --dry-run to preview
+# Thin wrapper around: python -m youtube_tools dedup
+# ============================================================================
+import sys
+
+from youtube_tools.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main(['dedup'] + sys.argv[1:]))
@@ -0,0 +1,12 @@
+# ===================================================================================
+# Download every channel listed in the manifest (channels.ini)
+# All channels share one worker pool and one requests/minute budget
+# Download process will be logged to one CSV file per channel
+# Thin wrapper around: python -m youtube_tools download --source manifest
+# ===================================================================================
+import sys
+
+from youtube_tools.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main(['download', '--source', 'manifest'] + sys.argv[1:]))
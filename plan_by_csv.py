@@ -0,0 +1,12 @@
+# ===================================================================================
+# Plan the download of all videos in a CSV file before downloading
+# Metadata for every row is fetched concurrently and cached on disk
+# Writes a plan CSV with availability, duration and estimated size per video
+# Thin wrapper around: python -m youtube_tools plan
+# ===================================================================================
+import sys
+
+from youtube_tools.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main(['plan'] + sys.argv[1:]))
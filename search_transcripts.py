@@ -0,0 +1,12 @@
+# ===================================================================================
+# Find where a phrase is spoken in the downloaded and generated subtitles
+# Prints every hit with its timestamp and a watch link starting there
+# Only subtitle files changed since the last run are re-indexed
+# Thin wrapper around: python -m youtube_tools transcripts
+# ===================================================================================
+import sys
+
+from youtube_tools.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main(['transcripts'] + sys.argv[1:]))
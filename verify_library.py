@@ -0,0 +1,12 @@
+# ============================================================================
+# Find downloads that are broken or shorter than the listed duration and
+# queue them again for the next download run
+# Only files new or changed since their last check are probed
+# Thin wrapper around: python -m youtube_tools verify
+# ============================================================================
+import sys
+
+from youtube_tools.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main(['verify'] + sys.argv[1:]))
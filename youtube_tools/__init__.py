@@ -0,0 +1,3 @@
+# ============================================================================
+# Shared helpers for the YouTube download, rename and subtitle scripts
+# ============================================================================
@@ -0,0 +1,85 @@
+# ============================================================================
+# Decode-ahead stage for transcription
+# A background thread runs ffmpeg on the next files while Whisper works on the
+# current one, leaving 16 kHz mono float32 PCM in temp files that the
+# transcriber memory-maps instead of decoding the MP4 inline
+# ============================================================================
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+# ============================================================================
+SAMPLE_RATE = 16000
+
+def decode_audio(file_path, pcm_path):
+    subprocess.run(
+        ["ffmpeg", "-nostdin", "-v", "error", "-threads", "0", "-i", file_path,
+         "-f", "f32le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-acodec", "pcm_f32le", "-y", pcm_path],
+        capture_output=True, check=True)
+
+# Copy-on-write map so torch gets a writable array without reading the file up front
+def load_pcm(pcm_path):
+    import numpy as np
+    return np.memmap(pcm_path, dtype=np.float32, mode='c')
+# ============================================================================
+_DONE = object()
+
+class AudioPrefetcher:
+    # depth = how many decoded files may wait ahead of the transcriber
+    def __init__(self, jobs, depth=2):
+        self.jobs = list(jobs)
+        self.depth = max(1, int(depth))
+        self._slots = threading.Semaphore(self.depth)
+        self._ready = queue.Queue()
+        self._stopped = threading.Event()
+        self._tmp_dir = tempfile.mkdtemp(prefix="whisper_pcm_")
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stopped.set()
+        # Wake the producer if it is blocked waiting for a free slot
+        for _ in range(self.depth):
+            self._slots.release()
+        self._thread.join()
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+    def _produce(self):
+        for index, job in enumerate(self.jobs):
+            self._slots.acquire()
+            if self._stopped.is_set():
+                break
+
+            pcm_path = os.path.join(self._tmp_dir, f"{index}.f32")
+            start_time = time.monotonic()
+            try:
+                decode_audio(job[0], pcm_path)
+                error = None
+            except (OSError, subprocess.CalledProcessError) as e:
+                pcm_path = None
+                error = e.stderr.decode(errors='replace').strip() if getattr(e, 'stderr', None) else e
+            self._ready.put((job, pcm_path, time.monotonic() - start_time, error))
+        self._ready.put(_DONE)
+
+    # Yields (job, pcm_path, decode_seconds, error) in job order
+    # pcm_path is None when decoding failed; call release() when done with it
+    def __iter__(self):
+        while True:
+            item = self._ready.get()
+            if item is _DONE:
+                return
+            yield item
+
+    def release(self, pcm_path):
+        if pcm_path:
+            try:
+                os.remove(pcm_path)
+            except OSError:
+                pass
+        self._slots.release()
@@ -0,0 +1,111 @@
+# ============================================================================
+# Captions YouTube already has, used instead of Whisper
+# Downloads ask yt-dlp for the English manual or automatic captions, which
+# land next to the video as "<title>.en.srt" (or .vtt); the transcriber
+# looks for "<title>.srt", so without this every video went to Whisper
+# Captions are matched to videos by video ID (archive, ID in the name,
+# known title) and else by file name, checked, and rewritten as the
+# video's .srt; only videos without a usable caption are transcribed
+# ============================================================================
+import os
+import re
+
+from youtube_tools.rename_planner import LANGUAGE_SUFFIX, split_suffix
+from youtube_tools.srt_checkpoint import srt_block
+from youtube_tools.transcript_index import SUBTITLE_EXTENSIONS, parse_subtitles
+# ============================================================================
+MIN_COVERAGE = 0.5      # the captions must reach at least this far into the audio
+MIN_WORDS_PER_MINUTE = 20
+MAX_TAG_SHARE = 0.5     # of cues that are only "[Music]", "[Applause]", ...
+
+TAG_ONLY = re.compile(r'^(?:\s*[\[(♪][^\])]*[\])♪]?\s*)+$')
+WORD = re.compile(r"[\w']+")
+# ============================================================================
+def _language(suffix):
+    return LANGUAGE_SUFFIX.search(os.path.splitext(suffix)[0]).group(0)[1:]
+
+# Caption files in folder with a language tag in languages, e.g. "en" also
+# takes "en-US"; an exact tag sorts first, .srt before .vtt
+def find_captions(folder, languages=('en',)):
+    captions = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if not entry.is_file() or not entry.name.lower().endswith(SUBTITLE_EXTENSIONS):
+                continue
+            stem, suffix = split_suffix(entry.name)
+            if stem == os.path.splitext(entry.name)[0]:
+                continue
+            language = _language(suffix)
+            if language.split('-')[0] in languages:
+                captions.append((language not in languages, not suffix.lower().endswith('.srt'), entry.path))
+    return [path for _, _, path in sorted(captions)]
+
+# {normcased "<folder>/<stem>": first caption file} by file name alone, for
+# listings that must not open the archive or read the captions
+def captions_by_stem(folder, languages=('en',)):
+    by_stem = {}
+    for path in find_captions(folder, languages):
+        stem, _ = split_suffix(os.path.basename(path))
+        by_stem.setdefault(os.path.normcase(os.path.join(folder, stem)), path)
+    return by_stem
+
+# Cheap check for captions that would be worse than a transcription: the
+# auto captions of music, silent or cut-off videos
+# cues: (start_ms, end_ms, text); returns the reason to reject them or None
+def caption_problem(cues, duration=None):
+    if not cues:
+        return "no cues"
+    tags = sum(1 for _, _, text in cues if TAG_ONLY.match(text))
+    if tags / len(cues) > MAX_TAG_SHARE:
+        return f"{tags} of {len(cues)} cues are only sound tags"
+    last_ms = max(end for _, end, _ in cues)
+    if duration and last_ms / 1000 < duration * MIN_COVERAGE:
+        return f"captions end at {last_ms // 1000}s of {int(duration)}s"
+    minutes = max(1.0, (duration or last_ms / 1000) / 60)
+    words = sum(len(WORD.findall(text)) for _, _, text in cues)
+    if words / minutes < MIN_WORDS_PER_MINUTE:
+        return f"only {words / minutes:.0f} words per minute"
+    return None
+
+# jobs: (file_path, srt_file, duration or None) without a subtitle yet
+# resolve(path): video ID of a media or caption file, or None
+# Returns (jobs still for Whisper, [(job, caption_path, cues)], [(job, caption_path, reason)])
+def plan_captions(jobs, resolve, languages=('en',), check=True):
+    by_id, by_stem = {}, {}
+    folders = {os.path.dirname(job[0]) for job in jobs}
+    for folder in folders:
+        for path in find_captions(folder, languages):
+            stem, _ = split_suffix(os.path.basename(path))
+            by_stem.setdefault(os.path.normcase(os.path.join(folder, stem)), []).append(path)
+            video_id = resolve(path)
+            if video_id:
+                by_id.setdefault(video_id, []).append(path)
+
+    remaining, captioned, rejected = [], [], []
+    for job in jobs:
+        file_path, _, duration = job
+        video_id = resolve(file_path)
+        candidates = list(by_id.get(video_id, [])) if video_id else []
+        candidates += [path for path in by_stem.get(os.path.normcase(os.path.splitext(file_path)[0]), [])
+                       if path not in candidates]
+        problem = None
+        for path in candidates:
+            cues = parse_subtitles(path)
+            problem = caption_problem(cues, duration) if check else (None if cues else "no cues")
+            if problem is None:
+                captioned.append((job, path, cues))
+                break
+        else:
+            if candidates:
+                rejected.append((job, candidates[0], problem))
+            remaining.append(job)
+    return remaining, captioned, rejected
+
+# The caption as a plain SRT at srt_file: WebVTT converted, the repeated
+# rolling lines of auto captions dropped, markup removed
+def write_caption(cues, srt_file):
+    part_path = srt_file + ".part"
+    with open(part_path, "w", encoding="utf-8") as f:
+        for i, (start_ms, end_ms, text) in enumerate(cues, start=1):
+            f.write(srt_block(i, {'start': start_ms / 1000, 'end': end_ms / 1000, 'text': text}))
+    os.replace(part_path, srt_file)
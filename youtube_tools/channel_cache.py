@@ -0,0 +1,189 @@
+# ============================================================================
+# Local cache of channel enumerations for incremental sync
+# The /videos tab lists newest first, so paging stops at the first video ID
+# that is already cached (the high-water mark) and only new entries are merged
+# Entries are streamed to the caller as pages arrive, never held as a full list
+# ============================================================================
+import sqlite3
+import threading
+from datetime import datetime
+# ============================================================================
+# Order is newest sync run first, then listing position within that run
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS channel_videos (
+    channel_url TEXT NOT NULL,
+    video_id    TEXT NOT NULL,
+    title       TEXT,
+    duration    REAL,
+    sync_run    INTEGER NOT NULL,
+    position    INTEGER NOT NULL,
+    first_seen  TEXT,
+    PRIMARY KEY (channel_url, video_id)
+);
+CREATE INDEX IF NOT EXISTS channel_videos_by_order ON channel_videos (channel_url, sync_run DESC, position);
+CREATE TABLE IF NOT EXISTS sync_runs (
+    channel_url TEXT NOT NULL,
+    sync_run    INTEGER NOT NULL,
+    finished_at TEXT,
+    PRIMARY KEY (channel_url, sync_run)
+);
+"""
+
+BATCH_SIZE = 500
+
+def watch_url(video_id):
+    return f"https://www.youtube.com/watch?v={video_id}"
+# ============================================================================
+# Yield flat playlist entries one page at a time instead of waiting for the
+# whole listing (process=False keeps yt-dlp's entries generator lazy)
+def iter_channel_entries(channel_url, ydl_opts=None):
+    opts = {
+        'quiet': True,
+        'ignoreerrors': True,
+        'extract_flat': 'in_playlist',
+        'skip_download': True,
+        'lazy_playlist': True,
+    }
+    opts.update(ydl_opts or {})
+
+    import yt_dlp
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        info = ydl.extract_info(channel_url, download=False, process=False)
+        while info and info.get('_type') in ('url', 'url_transparent'):
+            info = ydl.extract_info(info['url'], download=False, process=False)
+        if not info:
+            return
+
+        for entry in info.get('entries') or []:
+            if entry and entry.get('id'):
+                yield entry
+# ============================================================================
+class ChannelCache:
+    def __init__(self, db_path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def count(self, channel_url):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM channel_videos WHERE channel_url = ?", (channel_url,)).fetchone()[0]
+
+    # True when the video was last listed by a sync run that finished; only
+    # those runs prove that everything older is cached as well
+    def contains(self, channel_url, video_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM channel_videos JOIN sync_runs USING (channel_url, sync_run) "
+                "WHERE channel_url = ? AND video_id = ?", (channel_url, video_id)).fetchone()
+        return row is not None
+
+    def has_finished_sync(self, channel_url):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM sync_runs WHERE channel_url = ?", (channel_url,)).fetchone()
+        return row is not None
+
+    def begin_sync(self, channel_url):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COALESCE(MAX(sync_run), 0) + 1 FROM channel_videos WHERE channel_url = ?",
+                (channel_url,)).fetchone()[0]
+
+    # The listing of sync_run reached its end or an entry of a finished run
+    def finish_sync(self, channel_url, sync_run):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_runs (channel_url, sync_run, finished_at) VALUES (?, ?, ?)",
+                (channel_url, sync_run, datetime.now().isoformat(timespec='seconds')))
+
+    # Record one listed entry under the current sync run
+    # Returns True when the video was not cached before
+    def add(self, channel_url, entry, sync_run, position):
+        now = datetime.now().isoformat(timespec='seconds')
+        with self._lock:
+            known = self._conn.execute(
+                "SELECT 1 FROM channel_videos WHERE channel_url = ? AND video_id = ?",
+                (channel_url, entry['id'])).fetchone() is not None
+            self._conn.execute(
+                "INSERT INTO channel_videos (channel_url, video_id, title, duration, sync_run, position, first_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (channel_url, video_id) DO UPDATE SET "
+                "title = excluded.title, duration = COALESCE(excluded.duration, channel_videos.duration), "
+                "sync_run = excluded.sync_run, position = excluded.position",
+                (channel_url, entry['id'], entry.get('title'), entry.get('duration'), sync_run, position, now))
+        return not known
+
+    # Cached (video_id, title, url) rows, newest first like the /videos tab
+    # Rows from before_run onwards are left out; read in batches to keep memory flat
+    def iter_entries(self, channel_url, before_run=None):
+        last_key = None
+        while True:
+            query = "SELECT video_id, title, sync_run, position FROM channel_videos WHERE channel_url = ?"
+            params = [channel_url]
+            if before_run is not None:
+                query += " AND sync_run < ?"
+                params.append(before_run)
+            if last_key is not None:
+                query += " AND (sync_run < ? OR (sync_run = ? AND position > ?))"
+                params.extend([last_key[0], last_key[0], last_key[1]])
+            query += " ORDER BY sync_run DESC, position LIMIT ?"
+            params.append(BATCH_SIZE)
+
+            with self._lock:
+                rows = self._conn.execute(query, params).fetchall()
+            if not rows:
+                return
+            for video_id, title, sync_run, position in rows:
+                yield video_id, title, watch_url(video_id)
+            last_key = (rows[-1][2], rows[-1][3])
+
+    def entries(self, channel_url):
+        return list(self.iter_entries(channel_url))
+
+    # video_id -> title over every cached channel
+    def titles(self):
+        with self._lock:
+            return dict(self._conn.execute("SELECT video_id, title FROM channel_videos WHERE title IS NOT NULL"))
+
+    # video_id -> duration in seconds over every cached channel
+    def durations(self):
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT video_id, duration FROM channel_videos WHERE duration IS NOT NULL"))
+# ============================================================================
+# Stream (video_id, title, url) for the whole channel, newest first
+# Listed entries are yielded and cached as each page arrives; with
+# incremental=True paging stops at the first video ID cached by a finished
+# sync run and the rest of the channel is replayed from the cache
+# A run only counts as finished once its listing got that far, so an
+# interrupted run never becomes the high-water mark for the next one
+# new_ids (a list) collects the IDs that were not cached before
+def stream_channel(cache, channel_url, incremental=True, ydl_opts=None, new_ids=None):
+    incremental = incremental and cache.has_finished_sync(channel_url)
+    sync_run = cache.begin_sync(channel_url)
+    position = 0
+
+    for entry in iter_channel_entries(channel_url, ydl_opts):
+        if incremental and cache.contains(channel_url, entry['id']):
+            break
+        position += 1
+        is_new = cache.add(channel_url, entry, sync_run, position)
+        if is_new and new_ids is not None:
+            new_ids.append(entry['id'])
+        yield entry['id'], entry.get('title'), watch_url(entry['id'])
+    cache.finish_sync(channel_url, sync_run)
+
+    if incremental:
+        yield from cache.iter_entries(channel_url, before_run=sync_run)
@@ -0,0 +1,88 @@
+# ============================================================================
+# Splitting one long recording into chunks that transcribe in parallel
+# Cuts are placed in detected silences near evenly spaced targets, so no
+# word is cut; where no silence is close enough, neighbouring chunks overlap
+# and each keeps only the cues centred on its own side of the cut
+# Stitching shifts every chunk's cues to file time and drops a cue that
+# repeats the text right before the cut
+# ============================================================================
+import math
+import re
+import subprocess
+
+from youtube_tools.audio_prefetch import SAMPLE_RATE
+# ============================================================================
+SILENCE_DB = -35        # quieter than this counts as silence
+MIN_SILENCE = 0.4       # shortest pause worth cutting in, seconds
+SEARCH = 30.0           # how far from a target a silence may be, seconds
+OVERLAP = 2.0           # shared audio on each side of a cut outside silence
+MIN_CHUNK = 120.0       # chunks are never shorter than this, seconds
+
+SILENCE_LINE = re.compile(r'silence_(start|end): (-?[\d.]+)')
+# ============================================================================
+# (start, end) of every pause in a decoded 16 kHz mono float32 PCM file
+def detect_silences(pcm_path):
+    output = subprocess.run(
+        ["ffmpeg", "-nostdin", "-hide_banner", "-f", "f32le", "-ar", str(SAMPLE_RATE), "-ac", "1", "-i", pcm_path,
+         "-af", f"silencedetect=noise={SILENCE_DB}dB:d={MIN_SILENCE}", "-f", "null", "-"],
+        capture_output=True, text=True, check=True).stderr
+    silences = []
+    start = None
+    for kind, value in SILENCE_LINE.findall(output):
+        if kind == 'start':
+            start = max(0.0, float(value))
+        elif start is not None:
+            silences.append((start, float(value)))
+            start = None
+    return silences
+
+# Chunks of about chunk_seconds as (start, end, keep_start, keep_end):
+# audio from start to end is transcribed, cues centred in keep are used
+def plan_chunks(duration, silences, chunk_seconds):
+    count = max(1, math.ceil(duration / max(MIN_CHUNK, chunk_seconds)))
+    cuts = [(0.0, True)]
+    for k in range(1, count):
+        target = k * duration / count
+        middles = [(begin + end) / 2 for begin, end in silences]
+        middles = [middle for middle in middles
+                   if abs(middle - target) <= SEARCH and middle > cuts[-1][0] + MIN_CHUNK / 2]
+        if middles:
+            cuts.append((min(middles, key=lambda middle: abs(middle - target)), True))
+        else:
+            cuts.append((target, False))
+    cuts.append((duration, True))
+
+    chunks = []
+    for (keep_start, silent_start), (keep_end, silent_end) in zip(cuts, cuts[1:]):
+        start = keep_start if silent_start else max(0.0, keep_start - OVERLAP)
+        end = keep_end if silent_end else min(duration, keep_end + OVERLAP)
+        chunks.append((start, end, keep_start, keep_end))
+    return chunks
+# ============================================================================
+def _words(text):
+    return re.findall(r"[\w']+", text.lower())
+
+# A cue right after a cut that only repeats the end of the text before it
+def _repeats(previous, segment):
+    before, after = _words(previous['text']), _words(segment['text'])
+    return bool(after) and before[-len(after):] == after
+
+# parts: per chunk in order, (keep_start, keep_end, segments in file time)
+def stitch(parts):
+    stitched = []
+    last = len(parts) - 1
+    for i, (keep_start, keep_end, segments) in enumerate(parts):
+        first_of_chunk = True
+        for segment in segments:
+            middle = (segment['start'] + segment['end']) / 2
+            if middle < keep_start or (middle >= keep_end and i < last):
+                continue
+            if stitched and first_of_chunk and _repeats(stitched[-1], segment):
+                continue
+            first_of_chunk = False
+            if stitched and segment['start'] < stitched[-1]['end']:
+                segment = dict(segment, start=stitched[-1]['end'])
+                if segment['end'] < segment['start']:
+                    segment['end'] = segment['start']
+            stitched.append(segment)
+    return stitched
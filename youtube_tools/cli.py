@@ -0,0 +1,112 @@
+# ============================================================================
+# Command line entry point: python -m youtube_tools <command> [options]
+#   sync        list the channel into the CSV (search_by_channel.py)
+#   search      query the local metadata index into the CSV
+#               (search_by_channel_and_keyword.py)
+#   download    download the channel, the CSV or every channel of the
+#               manifest (download_by_*.py)
+#   plan        estimate a CSV download before running it (plan_by_csv.py)
+#   rename      rename files to their titles by video ID (rename_by_id.py)
+#   sanitize    make file names Windows compatible (rename_to_windows_name.py)
+#   dedup       hardlink identical files across the library folders
+#               (dedup_library.py)
+#   verify      re-queue broken or truncated downloads (verify_library.py)
+#   transcribe  generate subtitles with Whisper (subtitle_generator.py)
+#   transcripts find where a phrase is spoken in the subtitle files
+#               (search_transcripts.py)
+# settings.ini is read once here; a command's module, and with it yt-dlp or
+# Whisper, is only imported when that command runs
+# ============================================================================
+import argparse
+import importlib
+
+from youtube_tools.settings import Settings, SettingsError
+# ============================================================================
+def build_parser():
+    parser = argparse.ArgumentParser(prog="youtube_tools", description="YouTube channel download and subtitle tools")
+    parser.add_argument('--settings', default='settings.ini', help="settings file (default: settings.ini)")
+    commands = parser.add_subparsers(dest='command', required=True, metavar='command')
+
+    sync = commands.add_parser('sync', help="list all videos of channel_url into csv_name")
+    sync.add_argument('--keyword', nargs='?', const='', default=None,
+                      help="only export titles containing KEYWORD (default: keyword from settings)")
+
+    search = commands.add_parser('search', help="search the local metadata index and export matches to csv_name")
+    search.add_argument('query', nargs='*', help="FTS5 query: words, AND/OR/NOT, \"phrases\", prefix* "
+                                                 "(default: keyword from settings)")
+    search.add_argument('--after', help="uploaded on or after this date (YYYY-MM-DD)")
+    search.add_argument('--before', help="uploaded on or before this date (YYYY-MM-DD)")
+    search.add_argument('--min-duration', type=float, help="shortest duration in seconds")
+    search.add_argument('--max-duration', type=float, help="longest duration in seconds")
+    search.add_argument('--limit', type=int)
+    search.add_argument('--all-channels', action='store_true', help="search every indexed channel, not only channel_url")
+    search.add_argument('--details', action='store_true',
+                        help="fetch descriptions and upload dates for matches that lack them (network)")
+    search.add_argument('--csv', help="export file (default: csv_name)")
+    search.add_argument('--quiet', action='store_true', help="do not print the matches")
+
+    download = commands.add_parser('download', help="download the channel, the CSV or every channel of the manifest")
+    download.add_argument('--source', choices=['channel', 'csv', 'manifest'], default='csv')
+    download.add_argument('--manifest', help="channel manifest for --source manifest (default: manifest)")
+    download.add_argument('--profile', choices=['mp4', 'mp3'], default='mp4',
+                          help="format for the csv source (mp3: any audio_format)")
+    download.add_argument('--workers', type=int, help="override download_workers")
+    download.add_argument('--plan', action=argparse.BooleanOptionalAction, default=None,
+                          help="fetch metadata and order the queue first (default: plan_downloads)")
+    download.add_argument('--pending', action='store_true', help="list videos not downloaded yet and exit")
+    download.add_argument('--local-audio', action=argparse.BooleanOptionalAction, default=None,
+                          help="cut audio from MP4s already in a library before downloading (default: local_audio)")
+
+    plan = commands.add_parser('plan', help="estimate size and time of downloading the CSV")
+    plan.add_argument('--profile', choices=['mp4', 'mp3'], default='mp4', help="format the downloader will use")
+    plan.add_argument('--order', choices=['csv', 'shortest', 'longest', 'smallest'], help="default: queue_order")
+
+    rename = commands.add_parser('rename', help="rename files in video_dir to their titles by video ID")
+    rename.add_argument('--dry-run', action='store_true', help="print the rename plan without touching any file")
+    rename.add_argument('--rollback', action='store_true', help="undo the renames recorded in the journal")
+    rename.add_argument('--abandon', action='store_true', help="drop an interrupted plan instead of resuming it")
+
+    sanitize = commands.add_parser('sanitize', help="make file names in video_dir Windows compatible")
+    sanitize.add_argument('--recursive', action='store_true', help="also sanitize files in subfolders")
+    sanitize.add_argument('--dry-run', action='store_true', help="print the renames without touching any file")
+    sanitize.add_argument('--rollback', action='store_true', help="undo the renames recorded in the journal")
+    sanitize.add_argument('--abandon', action='store_true', help="drop an interrupted run instead of resuming it")
+
+    dedup = commands.add_parser('dedup', help="replace identical files in the library folders with hardlinks")
+    dedup.add_argument('--folder', action='append',
+                       help="library folder, may be repeated (default: video_dir and the manifest's folders)")
+    dedup.add_argument('--workers', type=int, help="override dedup_workers")
+    dedup.add_argument('--dry-run', action='store_true', help="report the duplicates without linking")
+
+    verify = commands.add_parser('verify', help="probe the downloaded files and re-queue broken or truncated ones")
+    verify.add_argument('--folder', action='append', help="only files under this folder, may be repeated")
+    verify.add_argument('--workers', type=int, help="override verify_workers")
+    verify.add_argument('--recheck', action='store_true', help="probe every file again, ignoring verify_cache")
+    verify.add_argument('--dry-run', action='store_true', help="report the broken files without re-queueing them")
+
+    transcribe = commands.add_parser('transcribe', help="generate .srt subtitles for the videos in video_dir")
+    transcribe.add_argument('--engine', choices=['openai-whisper', 'faster-whisper'], help="override transcribe_engine")
+    transcribe.add_argument('--model', help="override whisper_model")
+    transcribe.add_argument('--workers', type=int, help="override transcribe_workers")
+    transcribe.add_argument('--pending', action='store_true', help="list videos without subtitles and exit")
+    transcribe.add_argument('--no-captions', action='store_true', help="transcribe videos that have YouTube captions too")
+    transcribe.add_argument('--no-cache', action='store_true', help="transcribe everything, ignoring transcript_cache")
+
+    transcripts = commands.add_parser('transcripts', help="search the .srt / .vtt subtitles for where a phrase is spoken")
+    transcripts.add_argument('query', nargs='+', help="FTS5 query: words, AND/OR/NOT, \"phrases\", prefix*")
+    transcripts.add_argument('--folder', action='append',
+                             help="subtitle folder, may be repeated (default: video_dir and the manifest's folders)")
+    transcripts.add_argument('--limit', type=int, default=20)
+    transcripts.add_argument('--per-video', type=int, default=3, help="most hits shown per video (0: no cap)")
+    transcripts.add_argument('--no-refresh', action='store_true', help="query the index without rescanning the folders")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    settings = Settings(args.settings)
+    command = importlib.import_module(f"youtube_tools.commands.{args.command}")
+    try:
+        return command.run(settings, args) or 0
+    except SettingsError as e:
+        print(f"\033[91m[ERROR]\033[0m {e}")
+        return 2
@@ -0,0 +1,4 @@
+# ============================================================================
+# One module per CLI subcommand, each exposing run(settings, args)
+# cli.py imports a module only when its subcommand is chosen
+# ============================================================================
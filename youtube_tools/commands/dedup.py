@@ -0,0 +1,64 @@
+# ============================================================================
+# dedup: replace byte-identical files in the library folders with hardlinks
+# Folders default to video_dir and the folders of every channel in the
+# manifest; files of at least dedup_min_mb are compared (see dedup)
+# Every group found is written to dedup_report; --dry-run only reports
+# Hardlinks need every copy on one file system, so only files on the same
+# drive are grouped
+# ============================================================================
+import json
+import os
+import time
+from datetime import datetime
+
+from youtube_tools.dedup import DuplicateFinder, HashCache, keeper, link_group, scan_files
+from youtube_tools.library import library_folders
+# ============================================================================
+def _size(size):
+    return f"{size / 1024 ** 2:.1f} MB" if size < 1024 ** 3 else f"{size / 1024 ** 3:.2f} GB"
+
+def run(settings, args):
+    folders = [os.path.abspath(folder) for folder in args.folder] if args.folder else library_folders(settings)
+    missing = [folder for folder in folders if not os.path.isdir(folder)]
+    for folder in missing:
+        print(f"\033[93m[SKIP]\033[0m Folder not found: {folder}")
+    folders = [folder for folder in folders if folder not in missing]
+    if not folders:
+        print("\033[91m[ERROR]\033[0m No library folder to scan")
+        return 1
+
+    start = time.monotonic()
+    inodes = scan_files(folders, max(1, int(settings.dedup_min_mb * 1024 ** 2)))
+    print(f"\033[92m[INFO]\033[0m {sum(len(paths) for _, paths in inodes.values())} file(s) in {len(folders)} folder(s)")
+
+    with HashCache(settings.dedup_cache) as cache:
+        finder = DuplicateFinder(cache, args.workers or settings.dedup_workers)
+        groups = finder.find(inodes)
+
+    report = []
+    linked_total, freed_total, errors = 0, 0, list(finder.errors)
+    for group in groups:
+        target = keeper(group)[1][0]
+        linked, freed, group_errors = link_group(group, args.dry_run)
+        linked_total += len(linked)
+        freed_total += freed
+        errors += group_errors
+        tag = "\033[92m[PLAN]\033[0m" if args.dry_run else "\033[92m[LINK]\033[0m"
+        for path, _ in linked:
+            print(f"{tag} {path} → {os.path.basename(target)}")
+        report.append({'size': group[0][0].st_size, 'keep': target, 'linked': [path for path, _ in linked],
+                       'errors': [{'path': path, 'error': error} for path, error in group_errors]})
+    for path, error in errors:
+        print(f"\033[91m[ERROR]\033[0m {path}: {error}")
+
+    with open(settings.dedup_report, 'w', encoding='utf-8') as f:
+        json.dump({'created': datetime.now().isoformat(timespec='seconds'), 'dry_run': args.dry_run,
+                   'folders': folders, 'groups': report, 'linked': linked_total, 'freed_bytes': freed_total,
+                   'hashed_bytes': finder.hashed_bytes, 'cache_hits': finder.cache_hits}, f, indent=2, ensure_ascii=False)
+
+    verb = "would free" if args.dry_run else "freed"
+    print(f"\n\033[92m[INFO]\033[0m {len(groups)} duplicate group(s), {linked_total} file(s) "
+          f"{'to link' if args.dry_run else 'linked'}, {verb} {_size(freed_total)}")
+    print(f"\033[92m[INFO]\033[0m Read {_size(finder.hashed_bytes)} ({finder.cache_hits} cached hash(es)) in "
+          f"{time.monotonic() - start:.1f}s; report written to {settings.dedup_report}")
+    return 1 if errors else 0
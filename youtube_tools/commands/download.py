@@ -0,0 +1,261 @@
+# ===================================================================================
+# download: download the whole channel, every video in the CSV, or every
+# channel listed in the manifest under one shared request budget
+# Downloads run on download_workers threads sharing one requests/minute budget
+# Download process will be logged to a CSV file
+# --pending only lists what is left to download, without touching yt-dlp
+# Audio downloads are cut from MP4s already in a library when there are any
+# (local_audio), so only missing videos are fetched
+# With separate_postprocessing, merging and MP3 conversion run on their own
+# process pool while the download workers move on to the next video
+# ===================================================================================
+import csv
+import os
+from datetime import datetime
+
+from youtube_tools.channel_cache import ChannelCache, stream_channel
+from youtube_tools.download_archive import DownloadArchive
+from youtube_tools.download_planner import MetadataCache, fetch_metadata, order_plan, summarize_plan
+from youtube_tools.download_pool import DownloadJob, DownloadStats, run_download_jobs, run_download_pool
+from youtube_tools.errors import is_permanent
+from youtube_tools.local_audio import AUDIO_FORMATS, local_first
+from youtube_tools.manifest import load_manifest
+from youtube_tools.metrics import MetricsRecorder
+from youtube_tools.postprocess import split_options
+from youtube_tools.rate_limiter import AdaptiveRateController
+from youtube_tools.settings import SettingsError
+from youtube_tools.ydl_options import channel_options, csv_options, load_csv, normalize_filename, sanitize_filename
+# ===================================================================================
+# Title matching used to import files downloaded before the archive existed
+LEGACY_MATCH = {
+    'channel': (sanitize_filename, ('.mp4', '.mkv', '.webm')),
+    'mp4': (normalize_filename, ('.mp4', '.mkv', '.webm')),
+    'mp3': (sanitize_filename, tuple(ext for ext, _, _, _ in AUDIO_FORMATS.values())),
+}
+# ===================================================================================
+def open_log(log_filepath):
+    log_file = open(log_filepath, mode='w', newline='', encoding='utf-8')
+    csv_writer = csv.writer(log_file)
+    csv_writer.writerow(["Video ID", "Title", "Video Link", "Status"])
+    return log_file, csv_writer
+# ===================================================================================
+def run(settings, args):
+    if args.workers:
+        settings.download_workers = args.workers
+    if args.local_audio is not None:
+        settings.local_audio = args.local_audio
+    if settings.audio_format not in AUDIO_FORMATS:
+        raise SettingsError(f"audio_format must be one of {', '.join(AUDIO_FORMATS)}, not '{settings.audio_format}'")
+    if args.source == 'manifest':
+        return download_manifest(settings, args.manifest or settings.manifest, args.pending)
+
+    output_dir = settings.require('video_dir')
+    profile = 'mp4' if args.source == 'channel' else args.profile
+    if args.pending:
+        return list_pending(settings, args.source, output_dir, profile)
+
+    os.makedirs(output_dir, exist_ok=True)
+    if args.source == 'channel':
+        download_channel(settings, output_dir)
+    else:
+        plan_downloads = settings.plan_downloads if args.plan is None else args.plan
+        download_csv(settings, output_dir, profile, plan_downloads)
+# ===================================================================================
+# Videos not yet marked done in the archive; the channel source reads the
+# cached listing, so nothing here needs the network
+def list_pending(settings, source, output_dir, profile):
+    if source == 'channel':
+        with ChannelCache(settings.channel_cache) as cache:
+            videos = cache.entries(settings.require('channel_url'))
+    else:
+        videos = load_csv(settings.require('csv_name'))
+
+    with DownloadArchive(settings.archive_file, output_dir, profile) as archive:
+        pending = [video for video in videos if not archive.is_done(video[0])]
+
+    for video_id, title, url in pending:
+        print(f"{video_id}\t{title}")
+    print(f"\n\033[92m[INFO]\033[0m {len(pending)} of {len(videos)} video(s) left to download ({profile})")
+# ===================================================================================
+def _limiter(settings):
+    # Pacing backs off on throttling and speeds up again on success
+    return AdaptiveRateController(settings.requests_per_minute, settings.max_requests_per_minute)
+
+# (ydl_opts, postprocess spec): raw-stream options when postprocessing is a separate stage
+def _pipeline(settings, ydl_opts):
+    if settings.separate_postprocessing:
+        return split_options(ydl_opts)
+    return ydl_opts, None
+
+def download_channel(settings, output_dir):
+    # Create timestamped log filename in the working folder
+    timestamp = datetime.now().strftime("%Y-%m-%d, %H-%M")
+    log_filepath = os.path.abspath(f"Download Log [{timestamp}].csv")
+    log_file, csv_writer = open_log(log_filepath)
+
+    # Stream the channel listing straight into the download queue
+    # Previous listings are cached, so a re-run only pages until the first known video
+    print("\033[92m[INFO]\033[0m Fetching video list from the channel...")
+    cache = ChannelCache(settings.channel_cache)
+    new_videos = []
+    queue_items = (
+        (video_id, title or f"video_{video_id}", url)
+        for video_id, title, url in stream_channel(cache, settings.require('channel_url'),
+                                                   settings.incremental_sync, new_ids=new_videos)
+    )
+
+    # Skip checks are video-ID lookups in the archive; files downloaded before the
+    # archive existed are matched by title once and recorded
+    archive = DownloadArchive(settings.archive_file, output_dir, 'mp4')
+    key_fn, extensions = LEGACY_MATCH['channel']
+    queue_items = archive.import_legacy(output_dir, queue_items, key_fn, extensions)
+
+    metrics = MetricsRecorder('download_by_channel', settings.metrics_file, settings.prometheus_dir)
+    stats = DownloadStats(csv_writer, log_file, metrics)
+    ydl_opts, postprocess = _pipeline(settings, channel_options(output_dir))
+    run_download_pool(queue_items, ydl_opts, stats, archive,
+                      workers=settings.download_workers, limiter=_limiter(settings),
+                      max_attempts=settings.max_attempts, retry_delay=settings.retry_delay,
+                      postprocess=postprocess, postprocess_workers=settings.postprocess_workers)
+    archive.close()
+    metrics.close()
+    cache.close()
+    log_file.close()
+
+    if stats.retried:
+        print(f"\n\033[92m[INFO]\033[0m {stats.retried} transient failure(s) retried.")
+    print(f"\n\033[92m[INFO]\033[0m {len(new_videos)} new video(s) since the last sync.")
+    print(f"\n\033[92m[INFO]\033[0m Log written to {log_filepath}")
+    print(f"\n\033[92m[INFO]\033[0m Done! Downloaded {stats.downloaded} videos.")
+    print(f"\033[92m[INFO]\033[0m Total = {stats.processed}, Download = {stats.downloaded}, "
+          f"Skip = {stats.skipped}, Error = {stats.failed}")
+
+def download_csv(settings, output_dir, profile, plan_downloads):
+    videos = load_csv(settings.require('csv_name'))
+    total_videos = len(videos)
+    print(f"\033[92m[INFO]\033[0m Loaded {total_videos} videos from CSV")
+
+    # Create timestamped log
+    timestamp = datetime.now().strftime("%Y-%m-%d, %H-%M")
+    if profile == 'mp4':
+        log_filename = f"Download Log - {output_dir} [{timestamp}].csv"
+    else:
+        log_filename = f"Download Log [{timestamp}].csv"
+    log_file, csv_writer = open_log(log_filename)
+
+    ydl_opts_download = csv_options(profile, output_dir, settings.audio_format)
+    metrics = MetricsRecorder(f'download_by_csv_{profile}', settings.metrics_file, settings.prometheus_dir)
+    stats = DownloadStats(csv_writer, log_file, metrics)
+
+    # Skip checks are video-ID lookups in the archive; files downloaded before the
+    # archive existed are matched by title once and recorded
+    archive = DownloadArchive(settings.archive_file, output_dir, profile)
+    key_fn, extensions = LEGACY_MATCH[profile]
+    queue_items = archive.import_legacy(output_dir, videos, key_fn, extensions)
+    if profile == 'mp3' and settings.local_audio:
+        queue_items = local_first(queue_items, archive, stats, output_dir, settings.audio_format)
+
+    # Optional planning stage: fetch metadata for every row (cached on disk),
+    # log unavailable/private videos up front and order the queue
+    if plan_downloads:
+        queue_items = plan_queue(settings, list(queue_items), archive, stats, ydl_opts_download)
+
+    ydl_opts_download, postprocess = _pipeline(settings, ydl_opts_download)
+    run_download_pool(queue_items, ydl_opts_download, stats, archive,
+                      workers=settings.download_workers, limiter=_limiter(settings), total=total_videos,
+                      max_attempts=settings.max_attempts, retry_delay=settings.retry_delay,
+                      postprocess=postprocess, postprocess_workers=settings.postprocess_workers)
+    archive.close()
+    metrics.close()
+    if stats.retried:
+        print(f"\n\033[92m[INFO]\033[0m {stats.retried} transient failure(s) retried.")
+
+    log_file.close()
+    print(f"\n\033[92m[INFO]\033[0m Log saved to {log_filename}")
+    extracted = f"Extracted: {stats.extracted}, " if stats.extracted else ""
+    print(f"\033[92m[INFO]\033[0m Done. Total: {total_videos}, Downloaded: {stats.downloaded}, {extracted}"
+          f"Skipped: {stats.skipped}, Failed: {stats.failed}")
+
+def plan_queue(settings, queue_items, archive, stats, ydl_opts_download):
+    downloaded = [item for item in queue_items if archive.is_done(item[0])]
+    pending = [item for item in queue_items if not archive.is_done(item[0])]
+    with MetadataCache(settings.metadata_cache) as metadata_cache:
+        plan = fetch_metadata(pending, metadata_cache, ydl_opts_download['format'], settings.metadata_workers,
+                              AdaptiveRateController(settings.metadata_requests_per_minute), ydl_opts_download)
+    summarize_plan(plan, settings.bandwidth_mbps, settings.requests_per_minute, settings.download_workers)
+
+    for item in plan:
+        if is_permanent(item['status']):
+            print(f"\033[93m[SKIP]\033[0m {item['status'].capitalize()}: {item['title']}")
+            stats.record(item['video_id'], item['title'], item['url'], item['status'])
+    # Already-downloaded rows stay in the queue so they are logged as skipped
+    return downloaded + [(item['video_id'], item['title'], item['url'])
+                         for item in order_plan(plan, settings.queue_order)
+                         if not is_permanent(item['status'])]
+# ===================================================================================
+# Every channel of the manifest in one process
+# One worker pool and one adaptive budget serve all channels; pending videos
+# are dispatched round-robin, so wall time follows the budget rather than the
+# number of channels
+def _channel_stream(cache, channel, incremental, new_ids):
+    for video_id, title, url in stream_channel(cache, channel.channel_url, incremental, new_ids=new_ids):
+        if channel.matches(title):
+            yield video_id, title or f"video_{video_id}", url
+
+def download_manifest(settings, manifest_path, pending_only=False):
+    channels = load_manifest(manifest_path)
+    print(f"\033[92m[INFO]\033[0m {len(channels)} channel(s) in {manifest_path}")
+
+    if pending_only:
+        with ChannelCache(settings.channel_cache) as cache:
+            for channel in channels:
+                videos = [video for video in cache.iter_entries(channel.channel_url) if channel.matches(video[1])]
+                with DownloadArchive(settings.archive_file, channel.video_dir, channel.profile) as archive:
+                    pending = sum(1 for video in videos if not archive.is_done(video[0]))
+                print(f"\033[92m[INFO]\033[0m [{channel.name}] {pending} of {len(videos)} cached video(s) "
+                      f"left to download ({channel.profile})")
+        return
+
+    timestamp = datetime.now().strftime("%Y-%m-%d, %H-%M")
+    cache = ChannelCache(settings.channel_cache)
+    metrics = MetricsRecorder('download_manifest', settings.metrics_file, settings.prometheus_dir)
+    streams = []
+    opened = []
+    new_videos = {}
+    for channel in channels:
+        os.makedirs(channel.video_dir, exist_ok=True)
+        log_filename = f"Download Log - {channel.name} [{timestamp}].csv"
+        log_file, csv_writer = open_log(log_filename)
+        archive = DownloadArchive(settings.archive_file, channel.video_dir, channel.profile)
+        opened.append((channel, log_filename, log_file, archive))
+
+        if channel.profile == 'mp4':
+            ydl_opts, (key_fn, extensions) = channel_options(channel.video_dir), LEGACY_MATCH['channel']
+        else:
+            ydl_opts = csv_options('mp3', channel.video_dir, settings.audio_format)
+            key_fn, extensions = LEGACY_MATCH['mp3']
+        new_videos[channel.name] = []
+        stats = DownloadStats(csv_writer, log_file, metrics)
+        videos = _channel_stream(cache, channel, settings.incremental_sync, new_videos[channel.name])
+        videos = archive.import_legacy(channel.video_dir, videos, key_fn, extensions)
+        if channel.profile == 'mp3' and settings.local_audio:
+            videos = local_first(videos, archive, stats, channel.video_dir, settings.audio_format,
+                                 label=f"[{channel.name}] ")
+        ydl_opts, postprocess = _pipeline(settings, ydl_opts)
+        job = DownloadJob(ydl_opts, stats, archive, name=channel.name, postprocess=postprocess)
+        streams.append((job, videos))
+
+    all_stats = run_download_jobs(streams, settings.download_workers, _limiter(settings),
+                                  settings.max_attempts, settings.retry_delay, settings.postprocess_workers)
+    metrics.close()
+    cache.close()
+
+    print()
+    for (channel, log_filename, log_file, archive), stats in zip(opened, all_stats):
+        archive.close()
+        log_file.close()
+        print(f"\033[92m[INFO]\033[0m [{channel.name}] Total = {stats.processed}, Download = {stats.downloaded}, "
+              f"Extracted = {stats.extracted}, Skip = {stats.skipped}, Error = {stats.failed}, "
+              f"New = {len(new_videos[channel.name])} (log: {log_filename})")
+    print(f"\n\033[92m[INFO]\033[0m Done! Downloaded {sum(stats.downloaded for stats in all_stats)} videos "
+          f"from {len(channels)} channel(s).")
@@ -0,0 +1,35 @@
+# ===================================================================================
+# plan: estimate size and time of downloading every video in the CSV
+# Metadata for every row is fetched concurrently and cached on disk
+# Writes a plan CSV with availability, duration and estimated size per video
+# Metadata is fetched with the downloader's own options (cookies, client), as
+# the cache is shared with download --plan
+# ===================================================================================
+import csv
+from datetime import datetime
+
+from youtube_tools.download_planner import MetadataCache, fetch_metadata, order_plan, summarize_plan
+from youtube_tools.rate_limiter import AdaptiveRateController
+from youtube_tools.ydl_options import csv_options, load_csv
+# ===================================================================================
+def run(settings, args):
+    output_dir = settings.require('video_dir')
+    videos = load_csv(settings.require('csv_name'))
+    print(f"\033[92m[INFO]\033[0m Loaded {len(videos)} videos from CSV")
+
+    ydl_opts = csv_options(args.profile, output_dir, settings.audio_format)
+    with MetadataCache(settings.metadata_cache) as cache:
+        plan = fetch_metadata(videos, cache, ydl_opts['format'], settings.metadata_workers,
+                              AdaptiveRateController(settings.metadata_requests_per_minute), ydl_opts)
+    summarize_plan(plan, settings.bandwidth_mbps, settings.requests_per_minute, settings.download_workers)
+
+    timestamp = datetime.now().strftime("%Y-%m-%d, %H-%M")
+    plan_filename = f"Download Plan - {output_dir} [{timestamp}].csv"
+    with open(plan_filename, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['Video ID', 'Title', 'URL', 'Status', 'Duration', 'Bytes'])
+        for item in order_plan(plan, args.order or settings.queue_order):
+            writer.writerow([item['video_id'], item['title'], item['url'], item['status'],
+                             item.get('duration') or '', item.get('bytes') or ''])
+
+    print(f"\n\033[92m[INFO]\033[0m Plan saved to {plan_filename}")
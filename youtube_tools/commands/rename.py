@@ -0,0 +1,84 @@
+# ============================================================================
+# rename: rename downloaded video and subtitle files using video ID and title from CSV
+# The whole plan is built in one pass, checked for collisions and journaled
+# before any file is renamed; use --dry-run to preview, --rollback to undo
+# An interrupted plan is resumed by the next run; --abandon drops it instead
+# ============================================================================
+import csv
+import os
+
+from youtube_tools.download_archive import DownloadArchive
+from youtube_tools.rename_journal import RenameJournal, apply_plan, rollback
+from youtube_tools.rename_planner import plan_renames
+# ============================================================================
+# Load CSV to map video ID → Title
+def load_titles(csv_file):
+    video_titles = {}
+    if os.path.exists(csv_file):
+        with open(csv_file, mode='r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                video_id = row["Video ID"].strip()
+                title = row["Title"].strip()
+                if video_id and title:
+                    video_titles[video_id] = title
+    else:
+        print(f"File '{csv_file}' not found.")
+    return video_titles
+# ============================================================================
+def run(settings, args):
+    videos_folder = settings.require('video_dir')
+    csv_file = settings.require('csv_name')
+    journal_file = settings.rename_journal
+    rename_workers = settings.rename_workers
+
+    # Recorded output paths in the download archive follow the renames
+    archive = DownloadArchive(settings.archive_file, videos_folder) if os.path.exists(settings.archive_file) else None
+    on_renamed = archive.rename_path if archive else None
+    lookup_path = archive.lookup_path if archive else None
+    journal = RenameJournal(journal_file)
+    rename_count = 0
+
+    if args.rollback:
+        rename_count = rollback(journal, on_renamed)
+        print(f"\n\033[92m[INFO]\033[0m Done! Restored {rename_count} file(s).")
+
+    elif args.abandon:
+        if journal.has_pending():
+            left = journal.abandon()
+            print(f"\033[92m[INFO]\033[0m Abandoned {left} pending rename(s) in {journal_file} "
+                  f"(done renames can still be undone with --rollback)")
+        else:
+            print(f"\033[92m[INFO]\033[0m No pending renames in {journal_file}")
+
+    elif journal.has_pending() and not args.dry_run:
+        # Finish the plan a previous run was interrupted in; renames that
+        # failed before are not retried, a new plan picks them up
+        ops, done, failed, _ = journal.load_all()
+        print(f"\033[92m[INFO]\033[0m Resuming {len(ops) - len(done) - len(failed)} rename(s) from {journal_file}")
+        journal.reopen()
+        rename_count, errors = apply_plan(journal, ops, rename_workers, done, on_renamed, failed=failed)
+        journal.close()
+        print(f"\n\033[92m[INFO]\033[0m Done! Renamed {rename_count} file(s), {len(errors)} error(s).")
+
+    else:
+        ops, skipped = plan_renames(videos_folder, load_titles(csv_file), lookup_path)
+        for filename, reason in skipped:
+            print(f"\033[93m[SKIP]\033[0m {filename}: {reason}")
+
+        if args.dry_run:
+            for op in ops:
+                if not op.get("quiet"):
+                    print(f"\033[92m[PLAN]\033[0m {os.path.basename(op['src'])} → {os.path.basename(op['dst'])}")
+            print(f"\n\033[92m[INFO]\033[0m Dry run: {len(ops)} rename(s) planned, {len(skipped)} skipped.")
+        elif ops:
+            journal.start(ops, folder=os.path.abspath(videos_folder), csv=csv_file)
+            rename_count, errors = apply_plan(journal, ops, rename_workers, on_renamed=on_renamed)
+            journal.close()
+            print(f"\n\033[92m[INFO]\033[0m Done! Renamed {rename_count} file(s), {len(errors)} error(s).")
+            print(f"\033[92m[INFO]\033[0m Journal written to {journal_file} (undo with --rollback)")
+        else:
+            print(f"\n\033[92m[INFO]\033[0m Done! Renamed {rename_count} file(s).")
+
+    if archive:
+        archive.close()
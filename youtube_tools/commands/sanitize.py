@@ -0,0 +1,170 @@
+# ============================================================================
+# sanitize: change file names from Non-Windows Compatible File Names to Windows Compatible Files
+# Remove some punctuation characters and Emoji characters
+# With --recursive the whole tree is streamed one folder at a time, every
+# rename is journaled and can be undone with --rollback; an interrupted run
+# is resumed by the next one, --abandon drops it instead
+# ============================================================================
+import os
+import re
+
+from youtube_tools.download_archive import DownloadArchive
+from youtube_tools.rename_journal import RenameJournal, apply_plan, rollback
+# ============================================================================
+DEFAULT_JOURNAL = 'sanitize_journal.jsonl'
+# ============================================================================
+# Sanitize filename
+# Remove emojis from text (more comprehensive range)
+EMOJI_PATTERN = re.compile(
+    "["
+    "\U0001F600-\U0001F64F"  # emoticons
+    "\U0001F300-\U0001F5FF"  # symbols & pictographs
+    "\U0001F680-\U0001F6FF"  # transport & map symbols
+    "\U0001F1E0-\U0001F1FF"  # flags (iOS)
+    "\U00002702-\U000027B0"
+    "\U000024C2-\U0001F251"
+    "]+", flags=re.UNICODE)
+
+# Invalid chars for Windows filenames, one translate table per replacement
+INVALID_CHARS = '<>:"/\\|?*'
+_translate_tables = {}
+
+def remove_emojis(text):
+    return EMOJI_PATTERN.sub(r'', text)
+
+def sanitize_filename(name: str, replacement="_") -> str:
+    name = remove_emojis(name)
+    table = _translate_tables.get(replacement)
+    if table is None:
+        table = _translate_tables[replacement] = str.maketrans({c: replacement for c in INVALID_CHARS})
+    name = name.translate(table)
+    # Strip trailing spaces and dots
+    name = name.rstrip('. ')
+    return name
+# ============================================================================
+# Collision handling by appending a number suffix
+# The next free counter is remembered per name, so many files sanitizing to
+# the same name do not re-probe _1, _2, ... from the start every time
+class CollisionResolver:
+    def __init__(self, existing_names):
+        self.existing_names = existing_names
+        self._next_counter = {}
+
+    def resolve(self, name):
+        if name not in self.existing_names:
+            self.existing_names.add(name)
+            return name
+
+        name_root, ext = os.path.splitext(name)
+        counter = self._next_counter.get(name, 1)
+        candidate_name = f"{name_root}_{counter}{ext}"
+        while candidate_name in self.existing_names:
+            counter += 1
+            candidate_name = f"{name_root}_{counter}{ext}"
+        self._next_counter[name] = counter + 1
+        self.existing_names.add(candidate_name)
+        return candidate_name
+# ============================================================================
+# Plan the renames for one folder in a single scandir pass
+# Returns (ops, subfolders)
+def plan_folder(folder, first_id=0):
+    files = []
+    subfolders = []
+    existing_names = set()
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            existing_names.add(entry.name)
+            if entry.is_dir(follow_symlinks=False):
+                subfolders.append(entry.path)
+            elif entry.is_file():
+                files.append(entry.name)
+
+    # A sanitized name never equals an unsanitized one, so the renames in a
+    # folder are independent of each other and can run in parallel
+    resolver = CollisionResolver(existing_names)
+    ops = []
+    for filename in sorted(files):
+        sanitized_name = sanitize_filename(filename)
+        if filename == sanitized_name:
+            continue
+        candidate_name = resolver.resolve(sanitized_name)
+        op_id = first_id + len(ops)
+        ops.append({"id": op_id, "chain": op_id,
+                    "src": os.path.join(folder, filename), "dst": os.path.join(folder, candidate_name)})
+    return ops, subfolders
+# ============================================================================
+# Rename files in folder (and below it when recursive) with collision handling
+# Memory stays bounded by the largest single folder, not the whole tree
+def rename_files_in_folder(folder=".", archive=None, recursive=False, journal=None,
+                           workers=8, dry_run=False):
+    on_renamed = archive.rename_path if archive else None
+    if journal is None:
+        journal = RenameJournal(DEFAULT_JOURNAL)
+
+    # The journal is only started once a folder has renames, so a run with
+    # nothing to do leaves the previous journal (and its rollback) in place
+    started = False
+    next_id = 0
+    if not dry_run and journal.has_pending():
+        # Finish the interrupted run first and keep appending to its journal
+        ops, done, failed, _ = journal.load_all()
+        print(f"[INFO] Resuming {len(ops) - len(done) - len(failed)} rename(s) from {journal.path}")
+        journal.reopen()
+        apply_plan(journal, ops, workers, done, on_renamed, complete=False, failed=failed)
+        next_id = journal.next_id
+        started = True
+
+    rename_count = 0
+    error_count = 0
+    pending_folders = [folder]
+    while pending_folders:
+        current = pending_folders.pop()
+        ops, subfolders = plan_folder(current, next_id)
+        if recursive:
+            pending_folders.extend(sorted(subfolders, reverse=True))
+        if not ops:
+            continue
+        next_id += len(ops)
+
+        if dry_run:
+            for op in ops:
+                print(f"[PLAN] {op['src']} -> {os.path.basename(op['dst'])}")
+            rename_count += len(ops)
+            continue
+
+        if not started:
+            journal.begin(folder=os.path.abspath(folder), recursive=recursive)
+            started = True
+        journal.add(ops)
+        renamed, errors = apply_plan(journal, ops, workers, on_renamed=on_renamed, complete=False)
+        rename_count += renamed
+        error_count += len(errors)
+
+    if started:
+        journal.record("complete", errors=error_count)
+        journal.close()
+
+    if dry_run:
+        print(f"\n[INFO] Dry run: {rename_count} rename(s) planned.")
+    else:
+        print(f"\n[INFO] All filenames sanitized. Renamed {rename_count} file(s), {error_count} error(s).")
+# ============================================================================
+def run(settings, args):
+    target_folder = os.path.abspath(settings.require('video_dir'))
+    archive_file = settings.archive_file
+    archive = DownloadArchive(archive_file, target_folder) if os.path.exists(archive_file) else None
+
+    if args.rollback:
+        restored = rollback(RenameJournal(settings.sanitize_journal), archive.rename_path if archive else None)
+        print(f"\n[INFO] Restored {restored} file(s).")
+    elif args.abandon:
+        journal = RenameJournal(settings.sanitize_journal)
+        if journal.has_pending():
+            print(f"[INFO] Abandoned {journal.abandon()} pending rename(s) in {journal.path}")
+        else:
+            print(f"[INFO] No pending renames in {journal.path}")
+    else:
+        rename_files_in_folder(target_folder, archive, args.recursive, RenameJournal(settings.sanitize_journal),
+                               workers=settings.rename_workers, dry_run=args.dry_run)
+    if archive:
+        archive.close()
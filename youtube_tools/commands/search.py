@@ -0,0 +1,84 @@
+# ===================================================================================
+# search: query the local metadata index and export matches to the CSV
+# ('Video ID', 'Title', 'URL', the format the downloaders read)
+# Runs offline; the channel is only listed over the network when it was never
+# synced before, and --details fetches descriptions and upload dates
+# ===================================================================================
+import csv
+import time
+
+from youtube_tools.channel_cache import ChannelCache, stream_channel, watch_url
+from youtube_tools.metadata_index import MetadataIndex, QueryError
+from youtube_tools.ydl_options import csv_options
+# ===================================================================================
+def _format_duration(seconds):
+    if not seconds:
+        return "?"
+    seconds = int(seconds)
+    return f"{seconds // 60}:{seconds % 60:02}"
+
+def _format_date(upload_date):
+    return f"{upload_date[:4]}-{upload_date[4:6]}-{upload_date[6:]}" if upload_date else "????-??-??"
+
+# Fetch full metadata (through the metadata cache) for matches without an upload date
+# The cache is shared with download --plan, so the downloader's options are used
+def _fetch_details(settings, index, query, channel_url):
+    from youtube_tools.download_planner import MetadataCache, fetch_metadata
+    from youtube_tools.rate_limiter import AdaptiveRateController
+
+    rows = index.search(query, channel_url, missing_dates=True)
+    if not rows:
+        return
+    print(f"\033[92m[INFO]\033[0m Fetching details for {len(rows)} video(s)")
+    ydl_opts = csv_options('mp4', '.')
+    with MetadataCache(settings.metadata_cache) as cache:
+        fetch_metadata([(video_id, title, watch_url(video_id)) for video_id, title, _, _ in rows], cache,
+                       ydl_opts['format'], settings.metadata_workers,
+                       AdaptiveRateController(settings.metadata_requests_per_minute), ydl_opts)
+    index.refresh(metadata_cache_path=settings.metadata_cache)
+# ===================================================================================
+def run(settings, args):
+    query = " ".join(args.query) if args.query else settings.keyword
+    channel_url = None if args.all_channels else settings.require('channel_url')
+    output_csv = args.csv or settings.require('csv_name')
+
+    with MetadataIndex(settings.metadata_index) as index:
+        if channel_url:
+            with ChannelCache(settings.channel_cache) as cache:
+                if cache.count(channel_url) == 0:
+                    print("\033[92m[INFO]\033[0m Channel not listed yet, fetching video list from the channel...")
+                    for _ in stream_channel(cache, channel_url, incremental=False):
+                        pass
+        index.refresh(settings.channel_cache, settings.metadata_cache)
+        if args.details:
+            _fetch_details(settings, index, query, channel_url)
+
+        start = time.perf_counter()
+        try:
+            rows = index.search(query, channel_url, args.after, args.before,
+                                args.min_duration, args.max_duration, limit=args.limit)
+        except QueryError as e:
+            print(f"\033[91m[ERROR]\033[0m {e}")
+            return 2
+        elapsed = time.perf_counter() - start
+        indexed = index.count(channel_url)
+        # Upload dates only come with --details; without them a date filter
+        # silently leaves out every match that has none yet
+        undated = []
+        if (args.after or args.before) and not args.details:
+            undated = index.search(query, channel_url, min_duration=args.min_duration,
+                                   max_duration=args.max_duration, missing_dates=True)
+
+    with open(output_csv, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['Video ID', 'Title', 'URL'])
+        for video_id, title, upload_date, duration in rows:
+            writer.writerow([video_id, title, watch_url(video_id)])
+            if not args.quiet:
+                print(f"{_format_date(upload_date)}  {_format_duration(duration):>7}  {title}")
+
+    print(f"\n\033[92m[INFO]\033[0m {len(rows)} of {indexed} indexed video(s) matched in {elapsed * 1000:.1f} ms")
+    print(f"\033[92m[INFO]\033[0m Exported {len(rows)} videos matching '{query or '*'}' to {output_csv}")
+    if undated:
+        print(f"\033[93m[WARN]\033[0m {len(undated)} matching video(s) have no upload date yet and were left out "
+              f"by --after/--before; add --details to fetch their dates")
@@ -0,0 +1,44 @@
+# ===================================================================================
+# sync: list all videos of the channel into the CSV ('Video ID', 'Title', 'URL')
+# Previous listings are cached, so a re-run only pages until the first known video
+# With --keyword only titles containing the keyword are exported
+# ===================================================================================
+import csv
+
+from youtube_tools.channel_cache import ChannelCache, stream_channel
+# ===================================================================================
+def run(settings, args):
+    channel_url = settings.require('channel_url')
+    output_csv = settings.require('csv_name')
+    search_keyword = None
+    if args.keyword is not None:
+        search_keyword = (args.keyword or settings.require('keyword')).lower()
+
+    # Page through the channel (stops at the high-water mark when incremental)
+    # Rows are written and flushed as each page of the listing arrives
+    video_count = 0
+    new_videos = []
+
+    with ChannelCache(settings.channel_cache) as cache, \
+            open(output_csv, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['Video ID', 'Title', 'URL'])
+
+        for video_id, title, url in stream_channel(cache, channel_url, settings.incremental_sync,
+                                                   new_ids=new_videos):
+            if not title:
+                continue
+            if search_keyword is not None and search_keyword not in title.lower():
+                continue
+            writer.writerow([video_id, title, url])
+            file.flush()
+            video_count += 1
+            if search_keyword is not None:
+                print(f"\n\033[92m[INFO]\033[0m {video_count} video(s) found.")
+                print(f"\033[92m[INFO]\033[0m {title} - added.")
+
+    print(f"\033[92m[INFO]\033[0m {len(new_videos)} new video(s) since the last sync.")
+    if search_keyword is not None:
+        print(f"\n\033[92m[INFO]\033[0m Exported {video_count} videos matching '{search_keyword}' to {output_csv}")
+    else:
+        print(f"\n\033[92m[INFO]\033[0m Exported {video_count} videos to {output_csv}")
@@ -0,0 +1,132 @@
+# ============================================================================
+# transcribe: generate subtitle files using Whisper
+# transcribe_engine picks the backend (openai-whisper or faster-whisper),
+# whisper_model, whisper_threads, beam_size and compute_type tune it
+# Video files must be in video_dir
+# Files are transcribed by transcribe_workers processes, longest first
+# (0: one, or a share of the cores when a file is long enough to split)
+# Audio for the next decode_ahead files is decoded while Whisper runs
+# Audio transcribed before (renamed files, the same video in another folder)
+# gets its subtitle from transcript_cache instead of Whisper
+# Subtitles are written window by window (stream_window seconds) with a
+# checkpoint after each, so an interrupted file resumes where it stopped
+# With several workers, files of split_long_files seconds or more are cut
+# at silences and transcribed by all workers at once (0 turns this off)
+# English captions downloaded with a video ("Title.en.srt" / ".vtt") become
+# its subtitle when use_captions is on and they pass check_captions; only
+# videos without usable captions go to Whisper (--no-captions: all of them)
+# --pending only lists the videos still missing a subtitle, by file name
+# alone (captions are checked on a real run), so it returns at once
+# ============================================================================
+import os
+
+from youtube_tools.caption_planner import captions_by_stem, plan_captions, write_caption
+from youtube_tools.library import video_id_resolver
+from youtube_tools.media_probe import probe_durations
+from youtube_tools.metrics import MetricsRecorder
+from youtube_tools.settings import SettingsError
+from youtube_tools.srt_checkpoint import checkpoint_path
+from youtube_tools.transcript_cache import TranscriptCache
+from youtube_tools.transcription import transcribe_files
+from youtube_tools.transcription_engines import ENGINES
+# ============================================================================
+# Returns (jobs, skipped): jobs are (file_path, srt_file) without a subtitle yet
+def find_jobs(video_source_folder, verbose=True):
+    jobs = []
+    skipped = 0
+    for file in os.listdir(video_source_folder):
+        if file.lower().endswith(".mp4"):
+            file_path = os.path.join(video_source_folder, file)
+            base_name = os.path.splitext(file)[0]
+            srt_file = os.path.join(video_source_folder, base_name + ".srt")
+
+            if os.path.exists(srt_file):
+                if verbose:
+                    print(f"\033[93m[SKIP]\033[0m Skipping {file} (subtitle already exists)")
+                skipped += 1
+                continue
+
+            jobs.append((file_path, srt_file))
+    return jobs, skipped
+
+def _languages(settings):
+    return tuple(language.strip() for language in settings.caption_languages.split(',') if language.strip())
+
+# jobs are (file_path, srt_file, duration); returns plan_captions' result
+def _plan_captions(settings, jobs):
+    resolve, archive = video_id_resolver(settings)
+    try:
+        return plan_captions(jobs, resolve, _languages(settings), settings.check_captions)
+    finally:
+        if archive:
+            archive.close()
+# ============================================================================
+def run(settings, args):
+    video_source_folder = os.path.abspath(settings.require('video_dir'))
+    if not os.path.isdir(video_source_folder):
+        print(f"\033[91m[ERROR]\033[0m Folder not found: {video_source_folder}")
+        return 1
+
+    use_captions = settings.use_captions and not args.no_captions
+    if args.pending:
+        jobs, skip_count = find_jobs(video_source_folder, verbose=False)
+        # Only file names here, so listing stays instant: captions are not
+        # matched by ID or checked until a real run
+        captions = captions_by_stem(video_source_folder, _languages(settings)) if use_captions else {}
+        for file_path, srt_file in sorted(jobs):
+            caption_path = captions.get(os.path.normcase(os.path.splitext(file_path)[0]))
+            if caption_path:
+                note = f" (caption {os.path.basename(caption_path)} may be used)"
+            else:
+                note = " (resumes from checkpoint)" if os.path.exists(checkpoint_path(srt_file)) else ""
+            print(os.path.basename(file_path) + note)
+        print(f"\n\033[92m[INFO]\033[0m {len(jobs)} file{'s' if len(jobs) != 1 else ''} without subtitles, "
+              f"{skip_count} already done.")
+        return
+
+    if args.workers:
+        settings.transcribe_workers = args.workers
+    engine = {
+        'engine': args.engine or settings.transcribe_engine,
+        'model': args.model or settings.whisper_model,
+        'threads': settings.whisper_threads or None,
+        'beam_size': settings.beam_size or None,
+        'compute_type': settings.compute_type or None,
+    }
+    if engine['engine'] not in ENGINES:
+        raise SettingsError(f"transcribe_engine must be one of {', '.join(ENGINES)}, not '{engine['engine']}'")
+
+    complete_count = 0
+    jobs, skip_count = find_jobs(video_source_folder)
+    if jobs:
+        durations = probe_durations([file_path for file_path, _ in jobs])
+        jobs = [(file_path, srt_file, durations[file_path]) for file_path, srt_file in jobs]
+        captioned = []
+        if use_captions:
+            jobs, captioned, rejected = _plan_captions(settings, jobs)
+            for job, caption_path, reason in rejected:
+                print(f"\033[93m[SKIP]\033[0m Not using {os.path.basename(caption_path)}: {reason}")
+            for job, caption_path, cues in captioned:
+                write_caption(cues, job[1])
+                print(f"\033[92m[CAPTION]\033[0m Subtitle saved: {job[1]} (from {os.path.basename(caption_path)})")
+            complete_count += len(captioned)
+            if captioned:
+                print(f"\033[92m[INFO]\033[0m {len(captioned)} subtitle{'s' if len(captioned) != 1 else ''} "
+                      f"from YouTube captions, {len(jobs)} left for Whisper")
+        cache = None
+        if settings.transcript_cache and not args.no_cache:
+            cache = TranscriptCache(settings.transcript_cache, int(settings.transcript_cache_mb * 1024 ** 2))
+        try:
+            with MetricsRecorder('subtitle_generator', settings.metrics_file, settings.prometheus_dir) as metrics:
+                for _ in captioned:
+                    metrics.item("captioned")
+                complete_count += transcribe_files(jobs, engine, settings.transcribe_workers,
+                                                   settings.decode_ahead, metrics, cache, settings.stream_window,
+                                                   settings.split_long_files)
+        finally:
+            if cache is not None:
+                cache.close()
+
+    # Final summary split into two lines
+    print(f"\n\033[92m[INFO]\033[0m Total {complete_count} file{'s' if complete_count != 1 else ''} generated.")
+    print(f"\033[93m[INFO]\033[0m {skip_count} file{'s' if skip_count != 1 else ''} skipped.")
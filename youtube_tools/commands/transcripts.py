@@ -0,0 +1,49 @@
+# ===================================================================================
+# transcripts: find where a phrase is spoken in the subtitle files
+# Covers the .srt files from subtitle_generator.py and the .en.srt / .en.vtt
+# captions downloaded with the videos; every hit has its timestamp and a
+# watch link that starts playback there
+# Files are matched to video IDs through the download archive, an ID in the
+# file name, or the title in the channel cache
+# ===================================================================================
+import os
+import time
+
+from youtube_tools.library import library_folders, video_id_resolver
+from youtube_tools.metadata_index import QueryError
+from youtube_tools.rename_planner import split_suffix
+from youtube_tools.transcript_index import TranscriptIndex, format_ms, watch_link
+# ===================================================================================
+def run(settings, args):
+    query = " ".join(args.query)
+    folders = [os.path.abspath(folder) for folder in args.folder] if args.folder else library_folders(settings)
+
+    with TranscriptIndex(settings.transcript_index) as index:
+        if not args.no_refresh:
+            start = time.perf_counter()
+            resolve, archive = video_id_resolver(settings)
+            try:
+                reindexed, segments, removed = index.refresh(folders, resolve)
+            finally:
+                if archive:
+                    archive.close()
+            print(f"\033[92m[INFO]\033[0m Index refreshed in {(time.perf_counter() - start) * 1000:.0f} ms: "
+                  f"{reindexed} file(s) re-indexed ({segments} segments), {removed} removed")
+
+        start = time.perf_counter()
+        try:
+            hits = index.search(query, args.limit, args.per_video, mark=('\033[93m', '\033[0m'))
+        except QueryError as e:
+            print(f"\033[91m[ERROR]\033[0m {e}")
+            return 2
+        elapsed = time.perf_counter() - start
+        files, total_segments = index.count()
+
+    for video_id, path, start_ms, end_ms, text in hits:
+        name, _ = split_suffix(os.path.basename(path))
+        print(f"{format_ms(start_ms)} - {format_ms(end_ms)}  {name}")
+        print(f"    {text}")
+        print(f"    {watch_link(video_id, start_ms) if video_id else path}")
+
+    print(f"\n\033[92m[INFO]\033[0m {len(hits)} hit(s) for '{query}' in {total_segments} segments "
+          f"of {files} file(s), {elapsed * 1000:.1f} ms")
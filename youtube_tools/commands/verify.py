@@ -0,0 +1,62 @@
+# ============================================================================
+# verify: find broken or truncated downloads and queue them again
+# Every media file recorded in the download archive is checked with ffprobe
+# (verify_workers at once) and against the duration in the channel cache;
+# only files new or changed since their last check are probed
+# A broken file is moved aside as "<name>.corrupt" and its download marked
+# failed, so the next download run fetches it again; --dry-run only reports
+# ============================================================================
+import os
+import time
+
+from youtube_tools.channel_cache import ChannelCache
+from youtube_tools.download_archive import DownloadArchive
+from youtube_tools.integrity import ProbeCache, verify_files
+# ============================================================================
+CORRUPT_SUFFIX = ".corrupt"
+
+def _in_folders(path, folders):
+    return any(path.startswith(os.path.join(os.path.normcase(folder), '')) for folder in folders)
+
+def run(settings, args):
+    if not os.path.exists(settings.archive_file):
+        print(f"\033[91m[ERROR]\033[0m Download archive not found: {settings.archive_file}")
+        return 1
+    expected = {}
+    if os.path.exists(settings.channel_cache):
+        with ChannelCache(settings.channel_cache) as channel_cache:
+            expected = channel_cache.durations()
+
+    start = time.monotonic()
+    with DownloadArchive(settings.archive_file, '.') as archive, ProbeCache(settings.verify_cache) as cache:
+        files = archive.recorded_files()
+        if args.folder:
+            folders = [os.path.abspath(folder) for folder in args.folder]
+            files = [item for item in files if _in_folders(item[0], folders)]
+        results, probed = verify_files(files, cache, expected, args.workers or settings.verify_workers, args.recheck)
+
+        broken = [(path, video_id, problem) for path, video_id, problem in results if problem]
+        requeued = 0
+        for path, video_id, problem in broken:
+            if args.dry_run:
+                print(f"\033[93m[PLAN]\033[0m {os.path.basename(path)}: {problem}")
+                continue
+            try:
+                # Out of the way, or yt-dlp would find the name taken and skip the download
+                os.replace(path, path + CORRUPT_SUFFIX)
+            except OSError as e:
+                print(f"\033[91m[ERROR]\033[0m Could not move {os.path.basename(path)} aside: {e}")
+                continue
+            archive.requeue_file(path, f"verify: {problem}")
+            cache.forget(path)
+            requeued += 1
+            print(f"\033[93m[REQUEUE]\033[0m {os.path.basename(path)} ({video_id}): {problem}")
+
+    print(f"\n\033[92m[INFO]\033[0m {len(results)} file(s) checked, {probed} probed, "
+          f"{len(results) - probed} unchanged since their last check, in {time.monotonic() - start:.1f}s")
+    if args.dry_run:
+        print(f"\033[92m[INFO]\033[0m Dry run: {len(broken)} broken file(s) would be re-queued")
+    else:
+        print(f"\033[92m[INFO]\033[0m {requeued} broken file(s) moved aside as *{CORRUPT_SUFFIX} and re-queued; "
+              f"the next download run fetches them again")
+    return 1 if broken else 0
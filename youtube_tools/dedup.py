@@ -0,0 +1,206 @@
+# ============================================================================
+# Byte-identical files across library folders, replaced by hardlinks
+# Candidates are narrowed in three steps so most files are never read:
+#   1. same size on the same file system (files already hardlinked together
+#      count once)
+#   2. same hash of the first and last PARTIAL_BYTES
+#   3. same SHA-256 of the whole file
+# Hashing runs on a thread pool; hashes are cached per inode and only
+# trusted while size and mtime are unchanged, so a re-run reads only new
+# or modified files
+# ============================================================================
+import hashlib
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+# ============================================================================
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    dev         INTEGER NOT NULL,
+    inode       INTEGER NOT NULL,
+    size        INTEGER NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    partial     TEXT,
+    full        TEXT,
+    PRIMARY KEY (dev, inode)
+);
+"""
+
+PARTIAL_BYTES = 64 * 1024
+BLOCK = 1024 * 1024
+TEMP_SUFFIX = ".dedup-link"
+# ============================================================================
+def partial_hash(path, size):
+    digest = hashlib.sha256(str(size).encode())
+    with open(path, 'rb') as f:
+        digest.update(f.read(PARTIAL_BYTES))
+        if size > PARTIAL_BYTES:
+            f.seek(max(PARTIAL_BYTES, size - PARTIAL_BYTES))
+            digest.update(f.read(PARTIAL_BYTES))
+    return digest.hexdigest()
+
+def full_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while block := f.read(BLOCK):
+            digest.update(block)
+    return digest.hexdigest()
+
+# {(dev, inode): (stat, [paths])} for every file of at least min_size under folders
+def scan_files(folders, min_size=1):
+    inodes = {}
+    seen = set()
+    for folder in folders:
+        stack = [os.path.abspath(folder)]
+        while stack:
+            try:
+                entries = list(os.scandir(stack.pop()))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                    continue
+                if not entry.is_file(follow_symlinks=False) or entry.name.endswith(TEMP_SUFFIX):
+                    continue
+                key = os.path.normcase(entry.path)
+                if key in seen:
+                    continue  # nested or repeated folders
+                seen.add(key)
+                try:
+                    stat = os.stat(entry.path)
+                except OSError:
+                    continue
+                if stat.st_size >= min_size:
+                    inodes.setdefault((stat.st_dev, stat.st_ino), (stat, []))[1].append(entry.path)
+    return inodes
+# ============================================================================
+class HashCache:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # (partial, full) of an unchanged inode, either may be None
+    def get(self, stat):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT partial, full FROM hashes WHERE dev = ? AND inode = ? AND size = ? AND mtime_ns = ?",
+                (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)).fetchone()
+        return row or (None, None)
+
+    def put(self, stat, partial, full=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO hashes (dev, inode, size, mtime_ns, partial, full) VALUES (?, ?, ?, ?, ?, ?)",
+                (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, partial, full))
+# ============================================================================
+class DuplicateFinder:
+    def __init__(self, cache, workers=8):
+        self.cache = cache
+        self.workers = max(1, int(workers))
+        self.hashed_bytes = 0
+        self.cache_hits = 0
+        self.errors = []
+        self._lock = threading.Lock()
+
+    # The cached or freshly computed hash of one inode; full=False for the partial one
+    def _hash(self, item, full):
+        stat, paths = item
+        partial, whole = self.cache.get(stat)
+        cached = whole if full else partial
+        if cached:
+            with self._lock:
+                self.cache_hits += 1
+            return cached
+        try:
+            digest = full_hash(paths[0]) if full else partial_hash(paths[0], stat.st_size)
+        except OSError as e:
+            with self._lock:
+                self.errors.append((paths[0], str(e)))
+            return None
+        with self._lock:
+            self.hashed_bytes += stat.st_size if full else min(stat.st_size, 2 * PARTIAL_BYTES)
+        if full:
+            self.cache.put(stat, partial, digest)
+        else:
+            self.cache.put(stat, digest, whole)
+        return digest
+
+    # Groups of items with the same key_function value, only groups of two or more
+    @staticmethod
+    def _groups(items, key_function):
+        groups = {}
+        for item in items:
+            key = key_function(item)
+            if key is not None:
+                groups.setdefault(key, []).append(item)
+        return [group for group in groups.values() if len(group) > 1]
+
+    def _refine(self, groups, full):
+        items = [item for group in groups for item in group]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            digests = dict(zip(map(id, items), pool.map(lambda item: self._hash(item, full), items)))
+        refined = []
+        for group in groups:
+            refined += self._groups(group, lambda item: digests[id(item)])
+        return refined
+
+    # inodes from scan_files -> groups of [(stat, paths)] with identical content, largest first
+    def find(self, inodes):
+        by_size = self._groups(inodes.values(), lambda item: (item[0].st_dev, item[0].st_size))
+        by_partial = self._refine(by_size, full=False)
+        by_full = self._refine(by_partial, full=True)
+        return sorted(by_full, key=lambda group: group[0][0].st_size * (len(group) - 1), reverse=True)
+# ============================================================================
+# The copy every other path of the group is linked to: the inode with the
+# most links already, then the oldest
+def keeper(group):
+    return max(group, key=lambda item: (item[0].st_nlink, -item[0].st_mtime_ns))
+
+# Point every path of the group's other inodes at the keeper
+# A path whose file changed since the scan is left alone
+# Returns ([(path, target)] linked, bytes freed, [(path, error)])
+def link_group(group, dry_run=False):
+    kept = keeper(group)
+    target = kept[1][0]
+    linked, freed, errors = [], 0, []
+    for stat, paths in group:
+        if stat is kept[0]:
+            continue
+        replaced = 0
+        for path in paths:
+            try:
+                current = os.stat(path)
+                if (current.st_ino, current.st_size, current.st_mtime_ns) != (stat.st_ino, stat.st_size, stat.st_mtime_ns):
+                    errors.append((path, "changed since the scan"))
+                    continue
+                if not dry_run:
+                    # Link next to the file first, so the path is never missing
+                    temp_path = path + TEMP_SUFFIX
+                    if os.path.lexists(temp_path):
+                        os.remove(temp_path)
+                    os.link(target, temp_path)
+                    os.replace(temp_path, path)
+                linked.append((path, target))
+                replaced += 1
+            except OSError as e:
+                errors.append((path, str(e)))
+        # The space comes back once no path outside the scan still holds the inode
+        if replaced == stat.st_nlink:
+            freed += stat.st_size
+    return linked, freed, errors
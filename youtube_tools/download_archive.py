@@ -0,0 +1,235 @@
+# ============================================================================
+# Persistent download archive keyed by video ID
+# One SQLite file is shared by the downloaders and the rename scripts
+# Rows are scoped to a library (output folder) and a profile (mp4 / mp3)
+# ============================================================================
+import os
+import sqlite3
+import threading
+from datetime import datetime
+# ============================================================================
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS downloads (
+    library     TEXT NOT NULL,
+    profile     TEXT NOT NULL,
+    video_id    TEXT NOT NULL,
+    title       TEXT,
+    url         TEXT,
+    status      TEXT NOT NULL,
+    bytes       INTEGER DEFAULT 0,
+    attempts    INTEGER DEFAULT 0,
+    error       TEXT,
+    started_at  TEXT,
+    finished_at TEXT,
+    PRIMARY KEY (library, profile, video_id)
+);
+CREATE TABLE IF NOT EXISTS files (
+    path        TEXT PRIMARY KEY,
+    library     TEXT NOT NULL,
+    profile     TEXT NOT NULL,
+    video_id    TEXT NOT NULL,
+    bytes       INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS files_by_video ON files (library, profile, video_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key         TEXT PRIMARY KEY,
+    value       TEXT
+);
+"""
+
+STATUS_DOWNLOADING = "downloading"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+# ============================================================================
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+def _library_key(folder):
+    return os.path.normcase(os.path.abspath(folder))
+
+def _path_key(path):
+    return os.path.normcase(os.path.abspath(path))
+# ============================================================================
+class DownloadArchive:
+    def __init__(self, db_path, output_dir, profile=""):
+        self.db_path = db_path
+        self.library = _library_key(output_dir)
+        self.profile = profile
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------------
+    # Lookups
+    def get(self, video_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT video_id, title, url, status, bytes, attempts, error, started_at, finished_at "
+                "FROM downloads WHERE library = ? AND profile = ? AND video_id = ?",
+                (self.library, self.profile, video_id)).fetchone()
+        if row is None:
+            return None
+        keys = ("video_id", "title", "url", "status", "bytes", "attempts", "error", "started_at", "finished_at")
+        return dict(zip(keys, row))
+
+    def is_done(self, video_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM downloads WHERE library = ? AND profile = ? AND video_id = ? AND status = ?",
+                (self.library, self.profile, video_id, STATUS_DONE)).fetchone()
+        return row is not None
+
+    def paths(self, video_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path FROM files WHERE library = ? AND profile = ? AND video_id = ?",
+                (self.library, self.profile, video_id)).fetchall()
+        return [row[0] for row in rows]
+
+    # (path, video_id) of every recorded file in any library
+    def recorded_files(self):
+        with self._lock:
+            return self._conn.execute("SELECT path, video_id FROM files").fetchall()
+
+    # Returns (video_id, profile) for a file in any library, or None
+    def lookup_path(self, path):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT video_id, profile FROM files WHERE path = ?", (_path_key(path),)).fetchone()
+        return row
+
+    # Recorded files of a video under profile in every library, e.g. the MP4
+    # a channel or CSV download already stored; only files still on disk
+    def library_paths(self, video_id, profile):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path FROM files WHERE profile = ? AND video_id = ?", (profile, video_id)).fetchall()
+        return [row[0] for row in rows if os.path.isfile(row[0])]
+
+    def count(self, status=None):
+        query = "SELECT COUNT(*) FROM downloads WHERE library = ? AND profile = ?"
+        params = [self.library, self.profile]
+        if status is not None:
+            query += " AND status = ?"
+            params.append(status)
+        with self._lock:
+            return self._conn.execute(query, params).fetchone()[0]
+
+    # ------------------------------------------------------------------------
+    # Status transitions
+    def mark_started(self, video_id, title, url):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO downloads (library, profile, video_id, title, url, status, attempts, started_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, 1, ?) "
+                "ON CONFLICT (library, profile, video_id) DO UPDATE SET "
+                "title = excluded.title, url = excluded.url, status = excluded.status, "
+                "attempts = downloads.attempts + 1, error = NULL, started_at = excluded.started_at",
+                (self.library, self.profile, video_id, title, url, STATUS_DOWNLOADING, _now()))
+
+    def mark_done(self, video_id, paths, title=None, url=None):
+        records = []
+        for path in paths:
+            size = os.path.getsize(path) if os.path.isfile(path) else 0
+            records.append((_path_key(path), self.library, self.profile, video_id, size))
+        total_bytes = sum(record[4] for record in records)
+
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "INSERT INTO downloads (library, profile, video_id, title, url, status, bytes, finished_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (library, profile, video_id) DO UPDATE SET "
+                "title = COALESCE(excluded.title, downloads.title), url = COALESCE(excluded.url, downloads.url), "
+                "status = excluded.status, bytes = excluded.bytes, error = NULL, finished_at = excluded.finished_at",
+                (self.library, self.profile, video_id, title, url, STATUS_DONE, total_bytes, _now()))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO files (path, library, profile, video_id, bytes) VALUES (?, ?, ?, ?, ?)",
+                records)
+
+    def mark_failed(self, video_id, error):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE downloads SET status = ?, error = ?, finished_at = ? "
+                "WHERE library = ? AND profile = ? AND video_id = ?",
+                (STATUS_FAILED, str(error), _now(), self.library, self.profile, video_id))
+
+    # A recorded file found broken: its download goes back to failed so the
+    # next run fetches it again, and the file is no longer recorded
+    # Returns the video ID, or None when the path is not in the archive
+    def requeue_file(self, path, error):
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            row = self._conn.execute(
+                "SELECT library, profile, video_id FROM files WHERE path = ?", (_path_key(path),)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE downloads SET status = ?, error = ?, finished_at = ? "
+                "WHERE library = ? AND profile = ? AND video_id = ?",
+                (STATUS_FAILED, str(error), _now()) + tuple(row))
+            self._conn.execute("DELETE FROM files WHERE path = ?", (_path_key(path),))
+        return row[2]
+
+    # Video IDs left in "downloading" by a run that was killed mid-way
+    def interrupted(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT video_id, title, url FROM downloads WHERE library = ? AND profile = ? AND status = ?",
+                (self.library, self.profile, STATUS_DOWNLOADING)).fetchall()
+        return rows
+
+    # ------------------------------------------------------------------------
+    # Keep recorded paths in step with the rename scripts
+    def rename_path(self, old_path, new_path):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE OR REPLACE files SET path = ? WHERE path = ?", (_path_key(new_path), _path_key(old_path)))
+
+    # ------------------------------------------------------------------------
+    # Import of files downloaded before the archive existed
+    # Passes (video_id, title, url) items through unchanged while recording
+    # title matches (compared with key_fn), so it works on a streamed queue
+    # Every run lists the folder again, but only files the archive does not
+    # record yet take part, so a CSV aimed at a folder another job already
+    # filled still finds its own older files
+    def import_legacy(self, output_dir, videos, key_fn, extensions=None):
+        with self._lock:
+            recorded = {row[0] for row in self._conn.execute(
+                "SELECT path FROM files WHERE library = ?", (self.library,))}
+
+        files_by_key = {}
+        for entry in os.scandir(output_dir):
+            if entry.is_file() and not entry.name.startswith(os.path.basename(self.db_path)):
+                base_name, ext = os.path.splitext(entry.name)
+                if extensions and ext.lower() not in extensions:
+                    continue
+                if _path_key(entry.path) in recorded:
+                    continue
+                files_by_key.setdefault(key_fn(base_name), []).append(entry.path)
+        if not files_by_key:
+            yield from videos
+            return
+
+        imported = 0
+        for video_id, title, url in videos:
+            paths = files_by_key.get(key_fn(title))
+            if paths and not self.is_done(video_id):
+                self.mark_done(video_id, paths, title, url)
+                imported += 1
+            yield video_id, title, url
+
+        if imported:
+            print(f"\033[92m[INFO]\033[0m Imported {imported} existing file{'s' if imported != 1 else ''} into {self.db_path}")
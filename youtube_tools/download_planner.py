@@ -0,0 +1,166 @@
+# ============================================================================
+# Pre-download planning for CSV inputs
+# Full metadata for every row is fetched concurrently on a bounded thread pool
+# and cached on disk, giving duration, chosen format sizes and availability
+# before any download slot is spent
+# ============================================================================
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from youtube_tools.errors import STATUS_ERROR, STATUS_THROTTLED, classify_error, is_permanent
+# ============================================================================
+STATUS_OK = "ok"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    video_id    TEXT NOT NULL,
+    format      TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    fetched_at  REAL NOT NULL,
+    info        TEXT,
+    PRIMARY KEY (video_id, format)
+);
+"""
+# ============================================================================
+# Keep only what planning and indexing need from a full info dict
+def summarize_info(info):
+    formats = info.get('requested_formats') or [info]
+    size = 0
+    for fmt in formats:
+        size += fmt.get('filesize') or fmt.get('filesize_approx') or 0
+    return {
+        'title': info.get('title'),
+        'duration': info.get('duration'),
+        'bytes': size,
+        'format_id': info.get('format_id'),
+        'upload_date': info.get('upload_date'),
+        'description': info.get('description'),
+        'channel': info.get('channel'),
+    }
+# ============================================================================
+class MetadataCache:
+    def __init__(self, db_path, max_age_days=7):
+        self.max_age = max_age_days * 86400
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Cached (status, summary) or None when missing, stale or a transient error
+    def get(self, video_id, format_selector):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, fetched_at, info FROM metadata WHERE video_id = ? AND format = ?",
+                (video_id, format_selector)).fetchone()
+        if row is None:
+            return None
+        status, fetched_at, info = row
+        if status in (STATUS_ERROR, STATUS_THROTTLED) or time.time() - fetched_at > self.max_age:
+            return None
+        return status, json.loads(info) if info else {}
+
+    def put(self, video_id, format_selector, status, summary):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO metadata (video_id, format, status, fetched_at, info) VALUES (?, ?, ?, ?, ?)",
+                (video_id, format_selector, status, time.time(), json.dumps(summary, ensure_ascii=False)))
+# ============================================================================
+# Fetch metadata for (video_id, title, url) rows, serving what the cache has
+# Returns a list of plan items: dicts with video_id, title, url, status and
+# the summarized metadata
+# ydl_opts may be the downloader's own options (cookies, client), the format
+# selector is the one the download will use
+def fetch_metadata(videos, cache, format_selector, workers=8, limiter=None, ydl_opts=None):
+    import yt_dlp
+
+    opts = dict(ydl_opts or {})
+    opts.update({'quiet': True, 'no_warnings': True, 'skip_download': True, 'format': format_selector})
+    opts.pop('postprocessors', None)
+    local = threading.local()
+    counter = {"fetched": 0, "cached": 0}
+    counter_lock = threading.Lock()
+    instances = []
+
+    def ydl():
+        if not hasattr(local, 'ydl'):
+            local.ydl = yt_dlp.YoutubeDL(opts)
+            instances.append(local.ydl)
+        return local.ydl
+
+    def fetch(video):
+        video_id, title, url = video
+        cached = cache.get(video_id, format_selector)
+        if cached is not None:
+            status, summary = cached
+            with counter_lock:
+                counter["cached"] += 1
+        else:
+            if limiter is not None:
+                limiter.acquire()
+            try:
+                info = ydl().extract_info(url, download=False)
+                status, summary = (STATUS_OK, summarize_info(info)) if info else (STATUS_ERROR, {})
+            except Exception as e:
+                status, summary = classify_error(e), {'error': str(e)}
+            if limiter is not None:
+                limiter.report(status)
+            cache.put(video_id, format_selector, status, summary)
+            with counter_lock:
+                counter["fetched"] += 1
+        # The CSV title wins over YouTube's: the downloaders match files by it
+        return {**summary, 'video_id': video_id, 'title': title, 'url': url, 'status': status}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        items = list(pool.map(fetch, videos))
+    for instance in instances:
+        instance.close()
+
+    print(f"\033[92m[INFO]\033[0m Metadata: {counter['fetched']} fetched, {counter['cached']} from cache")
+    return items
+# ============================================================================
+# Order the queue: csv (as listed), shortest, longest or smallest first
+def order_plan(items, order='csv'):
+    if order == 'shortest':
+        return sorted(items, key=lambda item: item.get('duration') or 0)
+    if order == 'longest':
+        return sorted(items, key=lambda item: item.get('duration') or 0, reverse=True)
+    if order == 'smallest':
+        return sorted(items, key=lambda item: item.get('bytes') or 0)
+    return list(items)
+
+# Estimated wall time = transfer time at the given bandwidth, or the request
+# budget, whichever is the bottleneck
+def summarize_plan(items, bandwidth_mbps=20, requests_per_minute=4, workers=1):
+    ready = [item for item in items if not is_permanent(item['status'])]
+    total_bytes = sum(item.get('bytes') or 0 for item in ready)
+    total_duration = sum(item.get('duration') or 0 for item in ready)
+    transfer_seconds = total_bytes * 8 / (bandwidth_mbps * 1_000_000) / max(1, workers) if bandwidth_mbps else 0
+    budget_seconds = len(ready) * 60 / requests_per_minute if requests_per_minute else 0
+
+    counts = {}
+    for item in items:
+        counts[item['status']] = counts.get(item['status'], 0) + 1
+
+    print(f"\n\033[92m[INFO]\033[0m Plan: {len(ready)} downloadable, "
+          + ", ".join(f"{count} {status}" for status, count in sorted(counts.items()) if status != STATUS_OK))
+    print(f"\033[92m[INFO]\033[0m Estimated size: {total_bytes / 1024 ** 3:.2f} GiB, "
+          f"media length: {str(timedelta(seconds=int(total_duration)))}")
+    print(f"\033[92m[INFO]\033[0m Estimated time: {str(timedelta(seconds=int(max(transfer_seconds, budget_seconds))))} "
+          f"(transfer {str(timedelta(seconds=int(transfer_seconds)))}, request budget {str(timedelta(seconds=int(budget_seconds)))})")
+    return {'items': len(items), 'downloadable': len(ready), 'bytes': total_bytes,
+            'duration': total_duration, 'seconds': max(transfer_seconds, budget_seconds),
+            'created': datetime.now().isoformat(timespec='seconds'), 'statuses': counts}
@@ -0,0 +1,359 @@
+# ============================================================================
+# Concurrent download worker pool
+# Every worker keeps its own YoutubeDL instance and draws from one shared
+# rate limiter, log rows and counters are guarded by a single lock
+# Skip checks and resume state come from the video-ID download archive
+# Transient failures go to a retry queue; only permanent failures and
+# videos out of attempts are logged as failed
+# With a MetricsRecorder every attempt's stage timings are recorded
+# Several jobs (e.g. channels of a manifest) can share one pool and budget
+# Jobs with a postprocess spec download raw streams only and hand merging and
+# audio conversion to a PostprocessStage; a video counts as downloaded once
+# that stage has finished it
+# ============================================================================
+import collections
+import heapq
+import itertools
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+
+from youtube_tools.errors import STATUS_THROTTLED, classify_error, is_permanent
+from youtube_tools.metrics import StageTimer
+from youtube_tools.postprocess import MERGE, PostprocessStage, plan_task
+# ============================================================================
+# Counters and CSV log shared by all workers
+class DownloadStats:
+    def __init__(self, csv_writer, log_file=None, metrics=None):
+        self.csv_writer = csv_writer
+        self.log_file = log_file
+        self.metrics = metrics
+        self.downloaded = 0
+        self.extracted = 0
+        self.skipped = 0
+        self.failed = 0
+        self.unavailable = 0
+        self.retried = 0
+        self.processed = 0
+        self._lock = threading.Lock()
+
+    def record(self, video_id, title, url, status):
+        with self._lock:
+            self.csv_writer.writerow([video_id, title, url, status])
+            if self.log_file is not None:
+                self.log_file.flush()
+
+            if status == "succeeded":
+                self.downloaded += 1
+            elif status == "extracted":
+                self.extracted += 1
+            elif status == "skipped":
+                self.skipped += 1
+            elif status == "failed":
+                self.failed += 1
+            elif status in ("unavailable", "private"):
+                self.unavailable += 1
+            self.processed += 1
+            if self.metrics is not None:
+                self.metrics.item(status)
+            return self.downloaded, self.skipped, self.failed
+
+    def count_retry(self):
+        with self._lock:
+            self.retried += 1
+# ============================================================================
+# Items waiting for another attempt, ordered by the time they become ready
+# Also tracks items being worked on, since any of them may come back here
+class RetryQueue:
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def push(self, item, delay):
+        with self._lock:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), item))
+
+    def pop_ready(self):
+        with self._lock:
+            if self._heap and self._heap[0][0] <= time.monotonic():
+                self._in_flight += 1
+                return heapq.heappop(self._heap)[2]
+        return None
+
+    def started(self):
+        with self._lock:
+            self._in_flight += 1
+
+    def finished(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    # (waiting, in flight)
+    def status(self):
+        with self._lock:
+            return len(self._heap), self._in_flight
+
+    def idle(self):
+        with self._lock:
+            return not self._heap and self._in_flight == 0
+# ============================================================================
+# Every file yt-dlp produced for a finished download (media and subtitles)
+def downloaded_paths(info):
+    paths = []
+    for download in info.get('requested_downloads') or []:
+        if download.get('filepath'):
+            paths.append(download['filepath'])
+    return paths + subtitle_paths(info)
+
+def subtitle_paths(info):
+    return [subtitle['filepath'] for subtitle in (info.get('requested_subtitles') or {}).values()
+            if subtitle.get('filepath')]
+# ============================================================================
+# One output library being downloaded: its yt-dlp options, log and archive
+# name labels its lines when several jobs share one pool
+# postprocess is the spec from postprocess.split_options when ydl_opts only
+# download raw streams
+class DownloadJob:
+    def __init__(self, ydl_opts, stats, archive, total='?', name='', postprocess=None):
+        self.ydl_opts = ydl_opts
+        self.stats = stats
+        self.archive = archive
+        self.total = total
+        self.name = name
+        self.postprocess = postprocess
+# ============================================================================
+class _Pool:
+    def __init__(self, limiter, max_attempts, retry_delay):
+        self.limiter = limiter
+        self.max_attempts = max(1, int(max_attempts))
+        self.retry_delay = retry_delay
+        self.work_queue = None
+        self.retries = RetryQueue()
+        self.dispatch_done = threading.Event()
+        self.stage = None
+
+    # Items waiting for a download worker (new and retries) and being downloaded
+    def status(self):
+        retrying, in_flight = self.retries.status()
+        return self.work_queue.qsize() + retrying, in_flight
+
+    def report_backlog(self):
+        waiting, active = self.status()
+        line = f"download {waiting} waiting, {active} active"
+        if self.stage is not None:
+            post_waiting, post_running = self.stage.status()
+            line += f" | postprocess {post_waiting} waiting, {post_running} running"
+        print(f"\033[92m[PIPE]\033[0m Backlog: {line}")
+
+    def _next_item(self):
+        while True:
+            item = self.retries.pop_ready()
+            if item is not None:
+                return item
+            try:
+                item = self.work_queue.get(timeout=0.5)
+                self.retries.started()
+                return item
+            except queue.Empty:
+                if self.dispatch_done.is_set() and self.work_queue.empty() and self.retries.idle():
+                    return None
+
+    def worker(self):
+        import yt_dlp
+
+        # The hooks run on this worker's thread and feed the current video's timer
+        current = {'timer': None}
+
+        def progress_hook(d):
+            if current['timer'] is not None:
+                current['timer'].progress_hook(d)
+
+        def postprocessor_hook(d):
+            if current['timer'] is not None:
+                current['timer'].postprocessor_hook(d)
+
+        # One YoutubeDL per job this worker has served
+        instances = {}
+        try:
+            while True:
+                item = self._next_item()
+                if item is None:
+                    break
+                job = item[0]
+                ydl = instances.get(job)
+                if ydl is None:
+                    ydl = instances[job] = yt_dlp.YoutubeDL(job.ydl_opts)
+                    ydl.add_progress_hook(progress_hook)
+                    ydl.add_postprocessor_hook(postprocessor_hook)
+                current['timer'] = StageTimer(item[2][0])
+                try:
+                    self._download(ydl, current['timer'], *item)
+                finally:
+                    current['timer'] = None
+                    self.retries.finished()
+        finally:
+            for ydl in instances.values():
+                ydl.close()
+
+    def _record_metrics(self, stats, timer, status, attempt, waited):
+        if stats.metrics is not None:
+            stats.metrics.download(timer, status, attempt, waited)
+
+    def _download(self, ydl, timer, job, index, video, attempt):
+        video_id, title, url = video
+        stats = job.stats
+        label = f"[{job.name}] " if job.name else ""
+        waited = 0.0
+        try:
+            if self.limiter is not None:
+                waited = self.limiter.acquire()
+                if waited >= 1:
+                    print(f"\033[92m[INFO]\033[0m Waited {int(waited)}s for the shared request budget")
+                # Time spent waiting is reported as the pause stage, not as metadata
+                timer.started = time.monotonic()
+
+            print(f"\n\033[92m[INFO]\033[0m {label}Current Index = {index}, Total = {job.total}, Skip = {stats.skipped}, Error = {stats.failed}")
+            print(f"\033[92m[INFO]\033[0m {label}Downloading {title} ({video_id})"
+                  + (f" - attempt {attempt}/{self.max_attempts}" if attempt > 1 else ""))
+
+            start_time = datetime.now()
+            job.archive.mark_started(video_id, title, url)
+            info = ydl.extract_info(url, download=True)
+            if not info:
+                raise RuntimeError("yt-dlp returned no video information")
+            if job.postprocess is not None and self.stage is not None:
+                task = plan_task(info, job.postprocess)
+                if self.limiter is not None:
+                    self.limiter.report("ok")
+                print(f"\033[92m[INFO]\033[0m {label}Downloaded {title}, queued for {job.postprocess[0]}")
+                self.stage.submit(task, lambda seconds, error: self._postprocessed(
+                    job, video, task, subtitle_paths(info), timer, attempt, waited, seconds, error))
+                self.report_backlog()
+                return
+            job.archive.mark_done(video_id, downloaded_paths(info), title, url)
+            if self.limiter is not None:
+                self.limiter.report("ok")
+            self._record_metrics(stats, timer, "succeeded", attempt, waited)
+            downloaded, _, _ = stats.record(video_id, title, url, "succeeded")
+
+            elapsed = datetime.now() - start_time
+            print(f"\033[92m[INFO]\033[0m {label}{downloaded} download{'s' if downloaded != 1 else ''} complete.")
+            print(f"\033[92m[INFO]\033[0m Time taken: {str(timedelta(seconds=int(elapsed.total_seconds())))}")
+        except Exception as e:
+            status = classify_error(e)
+            if self.limiter is not None:
+                self.limiter.report(status)
+
+            if not is_permanent(status) and attempt < self.max_attempts:
+                delay = self.retry_delay * 2 ** (attempt - 1)
+                print(f"\033[93m[RETRY]\033[0m {label}{title} ({video_id}) {'throttled' if status == STATUS_THROTTLED else 'failed'}, "
+                      f"retrying in {int(delay)}s")
+                print(f"\033[93m[RETRY]\033[0m Reason: {e}")
+                job.archive.mark_failed(video_id, e)
+                self._record_metrics(stats, timer, "retry", attempt, waited)
+                stats.count_retry()
+                self.retries.push((job, index, video, attempt + 1), delay)
+                return
+
+            print(f"\033[91m[ERROR]\033[0m {label}Failed: {title} ({video_id})")
+            print(f"\033[91m[ERROR]\033[0m Reason: {e}")
+            job.archive.mark_failed(video_id, e)
+            self._record_metrics(stats, timer, "failed", attempt, waited)
+            stats.record(video_id, title, url, "failed")
+
+    # Second half of a raw download, called by the stage when ffmpeg is done
+    # A failed merge keeps the raw files, so the next run resumes from them
+    def _postprocessed(self, job, video, task, subtitles, timer, attempt, waited, seconds, error):
+        video_id, title, url = video
+        label = f"[{job.name}] " if job.name else ""
+        if error is not None:
+            reason = error.stderr.decode(errors='replace').strip() if getattr(error, 'stderr', None) else error
+            print(f"\033[91m[ERROR]\033[0m {label}Postprocessing failed: {title} ({video_id})")
+            print(f"\033[91m[ERROR]\033[0m Reason: {reason}")
+            job.archive.mark_failed(video_id, reason)
+            self._record_metrics(job.stats, timer, "failed", attempt, waited)
+            job.stats.record(video_id, title, url, "failed")
+            return
+        timer.add('merge' if task['kind'] == MERGE else 'extract_audio', seconds)
+        job.archive.mark_done(video_id, [task['output']] + subtitles, title, url)
+        self._record_metrics(job.stats, timer, "succeeded", attempt, waited)
+        downloaded, _, _ = job.stats.record(video_id, title, url, "succeeded")
+        print(f"\033[92m[INFO]\033[0m {label}{downloaded} download{'s' if downloaded != 1 else ''} complete "
+              f"({task['kind']} {seconds:.1f}s): {os.path.basename(task['output'])}")
+# ============================================================================
+# Next item of a job's stream that still needs downloading
+# Items already marked done in the archive are logged as skipped on the way
+def _next_pending(job, items):
+    for index, (video_id, title, url) in items:
+        if job.archive.is_done(video_id):
+            label = f"[{job.name}] " if job.name else ""
+            print(f"\033[93m[SKIP]\033[0m {label}Already downloaded: {title}")
+            job.stats.record(video_id, title, url, "skipped")
+            continue
+        return index, (video_id, title, url)
+    return None
+# ============================================================================
+# Download several jobs' (video_id, title, url) streams with one set of N
+# workers and one shared rate limiter
+# Pending items are dispatched round-robin across the jobs, so every job gets
+# an equal share of the request budget however long its listing is
+# postprocess_workers sizes the postprocessing pool (None: from the core count)
+def run_download_jobs(streams, workers=1, limiter=None, max_attempts=3, retry_delay=60, postprocess_workers=None):
+    workers = max(1, int(workers))
+    for job, _ in streams:
+        job.ydl_opts = dict(job.ydl_opts)
+        if workers > 1:
+            # Interleaved progress bars from several workers are unreadable
+            job.ydl_opts.setdefault('noprogress', True)
+
+    pool = _Pool(limiter, max_attempts, retry_delay)
+    pool.work_queue = queue.Queue(maxsize=workers * 2)
+    if any(job.postprocess is not None for job, _ in streams):
+        pool.stage = PostprocessStage(postprocess_workers)
+        print(f"\033[92m[INFO]\033[0m Postprocessing on {pool.stage.workers} process(es), "
+              f"backlog of {pool.stage.backlog}")
+    threads = [threading.Thread(target=pool.worker, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    for job, _ in streams:
+        interrupted = job.archive.interrupted()
+        if interrupted:
+            label = f"[{job.name}] " if job.name else ""
+            print(f"\033[92m[INFO]\033[0m {label}Resuming {len(interrupted)} download{'s' if len(interrupted) != 1 else ''} left unfinished by the last run")
+
+    active = collections.deque((job, enumerate(videos, 1)) for job, videos in streams)
+    while active:
+        job, items = active.popleft()
+        item = _next_pending(job, items)
+        if item is None:
+            continue
+        pool.work_queue.put((job, *item, 1))
+        active.append((job, items))
+
+    pool.dispatch_done.set()
+    for thread in threads:
+        thread.join()
+    if pool.stage is not None:
+        waiting, running = pool.stage.status()
+        if waiting or running:
+            print(f"\033[92m[INFO]\033[0m Downloads finished, waiting for {waiting + running} postprocessing task(s)")
+        pool.stage.close()
+        print(f"\033[92m[INFO]\033[0m Postprocessed {pool.stage.done} file(s) in "
+              f"{str(timedelta(seconds=int(pool.stage.seconds)))} of worker time, {pool.stage.failed} failed")
+    return [job.stats for job, _ in streams]
+# ============================================================================
+# Download (video_id, title, url) items with N workers
+# Items already marked done in the archive are logged as skipped
+# videos may be a generator, downloads start as soon as the first item arrives
+def run_download_pool(videos, ydl_opts, stats, archive, workers=1, limiter=None, total=None,
+                      max_attempts=3, retry_delay=60, postprocess=None, postprocess_workers=None):
+    if total is None:
+        total = len(videos) if hasattr(videos, '__len__') else '?'
+    job = DownloadJob(ydl_opts, stats, archive, total, postprocess=postprocess)
+    run_download_jobs([(job, videos)], workers, limiter, max_attempts, retry_delay, postprocess_workers)
+    return stats
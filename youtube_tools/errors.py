@@ -0,0 +1,68 @@
+# ============================================================================
+# Classify yt-dlp errors by what should happen next
+# Permanent errors are logged and never retried, throttling slows the shared
+# request budget down, anything else is a transient failure worth a retry
+# ============================================================================
+STATUS_PRIVATE = "private"
+STATUS_UNAVAILABLE = "unavailable"
+STATUS_THROTTLED = "throttled"
+STATUS_ERROR = "error"
+
+# Messages about a format or client problem, not the video itself; checked
+# first, since "Requested format is not available" would otherwise read as
+# an unavailable video
+TRANSIENT_ERRORS = (
+    "requested format",
+)
+
+# Messages yt-dlp uses for videos that will never download
+PERMANENT_ERRORS = (
+    ("private video", STATUS_PRIVATE),
+    ("video unavailable", STATUS_UNAVAILABLE),
+    ("has been removed", STATUS_UNAVAILABLE),
+    ("this video is not available", STATUS_UNAVAILABLE),
+    ("members-only", STATUS_UNAVAILABLE),
+    ("account associated with this video has been terminated", STATUS_UNAVAILABLE),
+    ("sign in to confirm your age", STATUS_UNAVAILABLE),
+)
+
+# Messages that mean the server wants us to slow down
+THROTTLE_ERRORS = (
+    "http error 429",
+    "too many requests",
+    "http error 403",
+    "rate-limit",
+    "rate limit",
+    "confirm you're not a bot",
+    "confirm you’re not a bot",
+)
+# ============================================================================
+def classify_error(error):
+    message = str(error).lower()
+    if any(needle in message for needle in TRANSIENT_ERRORS):
+        return STATUS_ERROR
+    for needle, status in PERMANENT_ERRORS:
+        if needle in message:
+            return status
+    for needle in THROTTLE_ERRORS:
+        if needle in message:
+            return STATUS_THROTTLED
+    return STATUS_ERROR
+
+def is_permanent(status):
+    return status in (STATUS_PRIVATE, STATUS_UNAVAILABLE)
+
+# ============================================================================
+# Self-check of the classification: python -m youtube_tools.errors
+EXAMPLES = (
+    ("ERROR: [youtube] dQw4w9WgXcQ: Requested format is not available. Use --list-formats", STATUS_ERROR),
+    ("ERROR: [youtube] dQw4w9WgXcQ: Video unavailable", STATUS_UNAVAILABLE),
+    ("ERROR: [youtube] dQw4w9WgXcQ: This video is not available", STATUS_UNAVAILABLE),
+    ("ERROR: [youtube] dQw4w9WgXcQ: Private video. Sign in if you've been granted access", STATUS_PRIVATE),
+    ("ERROR: unable to download video data: HTTP Error 429: Too Many Requests", STATUS_THROTTLED),
+)
+
+if __name__ == "__main__":
+    for message, expected in EXAMPLES:
+        assert classify_error(message) == expected, f"{message!r}: {classify_error(message)} != {expected}"
+    print(f"{len(EXAMPLES)} error classifications OK")
@@ -0,0 +1,107 @@
+# ============================================================================
+# Integrity check of the downloaded library
+# A download cut off mid-transfer or a failed merge can leave a broken file
+# under the final name, which every later run skips as already downloaded
+# Each recorded media file is probed (see media_probe.verify_media) and its
+# duration compared with the one the channel listing gave; probe results
+# are cached per (path, size, mtime), so only new or changed files are
+# probed again
+# ============================================================================
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from youtube_tools.media_probe import verify_media
+# ============================================================================
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS probes (
+    path        TEXT PRIMARY KEY,
+    size        INTEGER NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    duration    REAL,
+    problem     TEXT,
+    checked_at  REAL NOT NULL
+);
+"""
+
+MEDIA_EXTENSIONS = ('.mp4', '.mkv', '.webm', '.mp3', '.m4a', '.opus')
+
+# A file may be this much shorter than listed before it counts as truncated
+DURATION_SLACK = 0.02   # of the listed duration
+MIN_SLACK = 3.0         # seconds; listings are rounded to whole seconds
+# ============================================================================
+def duration_problem(duration, expected):
+    if not duration or not expected:
+        return None
+    if duration < expected - max(MIN_SLACK, expected * DURATION_SLACK):
+        return f"{duration:.0f}s of {expected:.0f}s"
+    return None
+# ============================================================================
+class ProbeCache:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # (duration, problem) while size and mtime are unchanged, else None
+    def get(self, path, stat):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT duration, problem FROM probes WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, stat.st_size, stat.st_mtime_ns)).fetchone()
+        return row
+
+    def put(self, path, stat, duration, problem):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO probes (path, size, mtime_ns, duration, problem, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (path, stat.st_size, stat.st_mtime_ns, duration, problem, time.time()))
+
+    def forget(self, path):
+        with self._lock:
+            self._conn.execute("DELETE FROM probes WHERE path = ?", (path,))
+# ============================================================================
+# files: (path, video_id); expected: video_id -> listed duration
+# Returns (results, probed): results are (path, video_id, problem) for every
+# file still on disk, problem None for a good file
+def verify_files(files, cache, expected=None, workers=8, recheck=False):
+    expected = expected or {}
+    counter = {'probed': 0}
+    lock = threading.Lock()
+
+    def verify(item):
+        path, video_id = item
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        cached = None if recheck else cache.get(path, stat)
+        if cached is None:
+            cached = verify_media(path)
+            cache.put(path, stat, *cached)
+            with lock:
+                counter['probed'] += 1
+        duration, problem = cached
+        problem = problem or duration_problem(duration, expected.get(video_id))
+        return path, video_id, problem
+
+    files = [item for item in files if item[0].lower().endswith(MEDIA_EXTENSIONS)]
+    # ffprobe is mostly process start-up and disk reads, so threads are enough
+    with ThreadPoolExecutor(max_workers=max(1, int(workers))) as pool:
+        results = [result for result in pool.map(verify, files) if result is not None]
+    return results, counter['probed']
@@ -0,0 +1,43 @@
+# ============================================================================
+# The library as the commands that read it see it: its folders, and the
+# video ID of any media or subtitle file in them
+# ============================================================================
+import os
+
+from youtube_tools.channel_cache import ChannelCache
+from youtube_tools.download_archive import DownloadArchive
+from youtube_tools.manifest import load_manifest
+from youtube_tools.rename_planner import extract_video_id, split_suffix
+from youtube_tools.ydl_options import normalize_filename
+# ============================================================================
+MEDIA_EXTENSIONS = ('.mp4', '.mkv', '.webm', '.mp3', '.m4a')
+
+# video_dir and the folders of every channel in the manifest
+def library_folders(settings):
+    folders = [settings.video_dir] if settings.video_dir else []
+    if os.path.exists(settings.manifest):
+        folders += [channel.video_dir for channel in load_manifest(settings.manifest)]
+    if not folders:
+        settings.require('video_dir')
+    return list(dict.fromkeys(os.path.abspath(folder) for folder in folders))
+
+# Video ID of a subtitle file: recorded in the archive, or its video's file is,
+# or the ID is in the name, or the name is a known title
+def video_id_resolver(settings):
+    archive = DownloadArchive(settings.archive_file, '.') if os.path.exists(settings.archive_file) else None
+    titles = {}
+    if os.path.exists(settings.channel_cache):
+        with ChannelCache(settings.channel_cache) as cache:
+            titles = cache.titles()
+    by_title = {normalize_filename(title): video_id for video_id, title in titles.items()}
+
+    def resolve(path):
+        folder, filename = os.path.split(path)
+        stem, _ = split_suffix(filename)
+        if archive:
+            for candidate in [path] + [os.path.join(folder, stem + ext) for ext in MEDIA_EXTENSIONS]:
+                row = archive.lookup_path(candidate)
+                if row:
+                    return row[0]
+        return extract_video_id(stem, titles) or by_title.get(normalize_filename(stem))
+    return resolve, archive
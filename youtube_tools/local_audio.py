@@ -0,0 +1,79 @@
+# ============================================================================
+# Local-first audio downloads
+# Before an audio download goes to YouTube, the archive is asked whether the
+# same video is already stored as an MP4 in any library; if so its audio is
+# extracted with ffmpeg, stream-copied when the target format can hold the
+# source codec (AAC -> m4a, Opus -> opus) and re-encoded otherwise
+# Only videos without a usable local copy reach the network
+# ============================================================================
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from youtube_tools.media_probe import probe_audio_codec
+# ============================================================================
+# Per target: extension, ffmpeg muxer, source codecs that can be copied as
+# they are, and the encoder used for everything else (same bitrates as the
+# FFmpegExtractAudio downloads)
+AUDIO_FORMATS = {
+    'mp3': ('.mp3', 'mp3', ('mp3',), ['-c:a', 'libmp3lame', '-b:a', '192k']),
+    'm4a': ('.m4a', 'ipod', ('aac', 'alac'), ['-c:a', 'aac', '-b:a', '192k']),
+    'opus': ('.opus', 'opus', ('opus',), ['-c:a', 'libopus', '-b:a', '128k']),
+}
+
+# Video files a library download may have left; the archive also records
+# the caption files downloaded with them
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.webm')
+
+# Returns "copied" or "encoded"; the target only appears once complete
+def extract_audio(source_path, target_path, audio_format='mp3'):
+    _, muxer, copyable, encode_args = AUDIO_FORMATS[audio_format]
+    copy = probe_audio_codec(source_path) in copyable
+    part_path = target_path + ".part"
+    try:
+        subprocess.run(
+            ["ffmpeg", "-nostdin", "-v", "error", "-i", source_path, "-map", "0:a:0", "-vn"]
+            + (['-c:a', 'copy'] if copy else encode_args) + ["-f", muxer, "-y", part_path],
+            capture_output=True, check=True)
+        os.replace(part_path, target_path)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    return "copied" if copy else "encoded"
+# The largest video file the archive records for video_id in any library
+def local_source(archive, video_id):
+    paths = [path for path in archive.library_paths(video_id, 'mp4') if path.lower().endswith(VIDEO_EXTENSIONS)]
+    return max(paths, key=os.path.getsize) if paths else None
+# ============================================================================
+# Filter a (video_id, title, url) stream for an audio job
+# Videos with a local MP4 are extracted on a background pool and recorded in
+# the job's archive and log; the rest (and any extraction failure, once the
+# stream ends) are passed on for the network downloaders
+def local_first(videos, archive, stats, output_dir, audio_format='mp3', workers=None, label=""):
+    ext = AUDIO_FORMATS[audio_format][0]
+    failed = []
+
+    def extract(video_id, title, url, source_path):
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        target_path = os.path.join(output_dir, stem + ext)
+        try:
+            how = extract_audio(source_path, target_path, audio_format)
+        except (OSError, subprocess.CalledProcessError) as e:
+            error = e.stderr.decode(errors='replace').strip() if getattr(e, 'stderr', None) else e
+            print(f"\033[93m[WARN]\033[0m {label}Local extraction failed, downloading instead: {title} ({error})")
+            failed.append((video_id, title, url))
+            return
+        archive.mark_done(video_id, [target_path], title, url)
+        print(f"\033[92m[LOCAL]\033[0m {label}Audio {how} from {source_path}")
+        stats.record(video_id, title, url, "extracted")
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        for video_id, title, url in videos:
+            source_path = None if archive.is_done(video_id) else local_source(archive, video_id)
+            if source_path:
+                pool.submit(extract, video_id, title, url, source_path)
+            else:
+                yield video_id, title, url
+    # The pool has drained, so every failure is known by now
+    yield from failed
@@ -0,0 +1,55 @@
+# ============================================================================
+# Channel manifest: many channels downloaded in one run
+# Every section of the manifest file is one channel, e.g.
+#
+#   [AccurateEnglish]
+#   channel_url = https://www.youtube.com/@AccurateEnglish/videos
+#   video_dir = accurate_english
+#   profile = mp4          ; mp4 (720p video) or mp3 (192k audio)
+#   keyword = grammar      ; optional, only titles containing it
+#
+# ============================================================================
+import configparser
+
+from youtube_tools.settings import SettingsError
+# ============================================================================
+PROFILES = ('mp4', 'mp3')
+
+class ChannelEntry:
+    def __init__(self, name, channel_url, video_dir, profile='mp4', keyword=''):
+        self.name = name
+        self.channel_url = channel_url
+        self.video_dir = video_dir
+        self.profile = profile
+        self.keyword = keyword
+
+    # Case-insensitive title filter; no keyword keeps every video
+    def matches(self, title):
+        return not self.keyword or self.keyword.lower() in (title or '').lower()
+# ============================================================================
+def load_manifest(path):
+    config = configparser.ConfigParser(inline_comment_prefixes=(';', '#'))
+    if not config.read(path, encoding='utf-8'):
+        raise SettingsError(f"Manifest not found: {path}")
+
+    channels = []
+    video_dirs = {}
+    for name in config.sections():
+        section = config[name]
+        channel_url = section.get('channel_url')
+        video_dir = section.get('video_dir')
+        profile = section.get('profile', fallback='mp4').lower()
+        if not channel_url or not video_dir:
+            raise SettingsError(f"[{name}] in {path} needs channel_url and video_dir")
+        if profile not in PROFILES:
+            raise SettingsError(f"[{name}] in {path}: profile must be one of {', '.join(PROFILES)}, not '{profile}'")
+        # Two sections writing the same library and profile would race on the same files
+        if (video_dir, profile) in video_dirs:
+            raise SettingsError(f"[{name}] and [{video_dirs[(video_dir, profile)]}] in {path} "
+                                f"both download {profile} into {video_dir}")
+        video_dirs[(video_dir, profile)] = name
+        channels.append(ChannelEntry(name, channel_url, video_dir, profile, section.get('keyword', fallback='')))
+
+    if not channels:
+        raise SettingsError(f"No channels listed in {path}")
+    return channels
@@ -0,0 +1,74 @@
+# ============================================================================
+# ffprobe and ffmpeg helpers shared by the transcription and library tools
+# ============================================================================
+import json
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+# ============================================================================
+# Container duration in seconds, or None when ffprobe cannot read the file
+def probe_duration(file_path):
+    try:
+        output = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "json", file_path],
+            capture_output=True, text=True, check=True).stdout
+        return float(json.loads(output)["format"]["duration"])
+    except (OSError, subprocess.CalledProcessError, KeyError, ValueError):
+        return None
+
+# Codec name of the first audio stream (e.g. "aac", "opus"), or None
+def probe_audio_codec(file_path):
+    try:
+        output = subprocess.run(
+            ["ffprobe", "-v", "error", "-select_streams", "a:0", "-show_entries", "stream=codec_name",
+             "-of", "json", file_path],
+            capture_output=True, text=True, check=True).stdout
+        return json.loads(output)["streams"][0]["codec_name"]
+    except (OSError, subprocess.CalledProcessError, KeyError, IndexError, ValueError):
+        return None
+
+# (duration, problem) of a media file; problem is None when the container
+# opens, has a stream and its last seconds can be read back, which fails
+# for files cut off mid-download or mid-merge
+def verify_media(file_path):
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration:stream=codec_type", "-of", "json", file_path],
+            capture_output=True, text=True)
+    except OSError as e:
+        return None, f"ffprobe failed: {e}"
+    try:
+        info = json.loads(result.stdout)
+        duration = float(info["format"]["duration"])
+    except (KeyError, ValueError):
+        return None, (result.stderr.strip().splitlines() or ["unreadable container"])[-1]
+    if not info.get("streams"):
+        return duration, "no audio or video stream"
+    # Copying the tail needs the data to be there, so it catches truncation
+    # that the header alone does not show; no decoding, so it stays cheap
+    tail = subprocess.run(
+        ["ffmpeg", "-nostdin", "-v", "error", "-sseof", "-3", "-i", file_path, "-map", "0", "-c", "copy",
+         "-f", "null", "-"],
+        capture_output=True, text=True)
+    errors = tail.stderr.strip().splitlines()
+    if tail.returncode != 0 or errors:
+        return duration, (errors or ["tail could not be read"])[-1]
+    return duration, None
+
+# ffprobe is mostly process start-up, so probe many files at once
+def probe_durations(file_paths, workers=8):
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(file_paths, pool.map(probe_duration, file_paths)))
+
+# SHA-256 of the first audio stream's packets, read without decoding
+# Stays the same across renames, copies and remuxes of the same download;
+# None when ffmpeg cannot read the file or it has no audio
+def audio_stream_hash(file_path):
+    try:
+        output = subprocess.run(
+            ["ffmpeg", "-nostdin", "-v", "error", "-i", file_path, "-map", "0:a:0", "-c", "copy",
+             "-f", "hash", "-hash", "sha256", "-"],
+            capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    algorithm, _, digest = output.strip().rpartition('\n')[-1].partition('=')
+    return digest if algorithm == "SHA256" and digest else None
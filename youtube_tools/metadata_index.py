@@ -0,0 +1,216 @@
+# ============================================================================
+# Local full-text index over channel metadata (SQLite FTS5)
+# Titles and durations come from the channel cache filled by enumeration,
+# descriptions and upload dates from the metadata cache filled by planning;
+# each refresh only copies rows changed since the last one
+# Queries use FTS5 syntax: words, AND / OR / NOT, "exact phrases", prefix*
+# ============================================================================
+import json
+import os
+import re
+import sqlite3
+import threading
+# ============================================================================
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    rowid       INTEGER PRIMARY KEY,
+    video_id    TEXT NOT NULL UNIQUE,
+    channel_url TEXT,
+    title       TEXT,
+    description TEXT,
+    upload_date TEXT,
+    duration    REAL
+);
+CREATE INDEX IF NOT EXISTS videos_by_channel ON videos (channel_url, upload_date);
+CREATE TABLE IF NOT EXISTS index_state (
+    source TEXT PRIMARY KEY,
+    mark   REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS videos_fts USING fts5(
+    title, description, content='videos', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS videos_insert AFTER INSERT ON videos BEGIN
+    INSERT INTO videos_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS videos_delete AFTER DELETE ON videos BEGIN
+    INSERT INTO videos_fts (videos_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS videos_update AFTER UPDATE ON videos BEGIN
+    INSERT INTO videos_fts (videos_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description);
+    INSERT INTO videos_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description);
+END;
+"""
+
+# Only touch a row (and so the FTS index) when something actually changed
+UPSERT = """
+INSERT INTO videos (video_id, channel_url, title, description, upload_date, duration)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (video_id) DO UPDATE SET
+    channel_url = COALESCE(excluded.channel_url, videos.channel_url),
+    title = COALESCE(excluded.title, videos.title),
+    description = COALESCE(excluded.description, videos.description),
+    upload_date = COALESCE(excluded.upload_date, videos.upload_date),
+    duration = COALESCE(excluded.duration, videos.duration)
+WHERE COALESCE(excluded.channel_url, videos.channel_url) IS NOT videos.channel_url
+   OR COALESCE(excluded.title, videos.title) IS NOT videos.title
+   OR COALESCE(excluded.description, videos.description) IS NOT videos.description
+   OR COALESCE(excluded.upload_date, videos.upload_date) IS NOT videos.upload_date
+   OR COALESCE(excluded.duration, videos.duration) IS NOT videos.duration
+"""
+
+# A query using any of these was meant as FTS5 syntax, so errors are reported
+QUERY_SYNTAX = re.compile(r'"|\*|\(|\b(?:AND|OR|NOT|NEAR)\b')
+
+# Title matches rank above description matches
+RANK_WEIGHTS = (10.0, 1.0)
+
+class QueryError(Exception):
+    pass
+
+# YYYY-MM-DD or YYYYMMDD -> YYYYMMDD, the form yt-dlp uses for upload_date
+def normalize_date(value):
+    if not value:
+        return None
+    digits = value.replace('-', '').replace('/', '')
+    if len(digits) != 8 or not digits.isdigit():
+        raise QueryError(f"Dates must look like 2024-01-31, not '{value}'")
+    return digits
+# ============================================================================
+class MetadataIndex:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            self._conn.executescript(SCHEMA)
+        except sqlite3.OperationalError as e:
+            self._conn.close()
+            raise RuntimeError(f"SQLite {sqlite3.sqlite_version} was built without FTS5: {e}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def count(self, channel_url=None):
+        query = "SELECT COUNT(*) FROM videos"
+        params = ()
+        if channel_url:
+            query += " WHERE channel_url = ?"
+            params = (channel_url,)
+        with self._lock:
+            return self._conn.execute(query, params).fetchone()[0]
+
+    # ------------------------------------------------------------------------
+    # Copy new and changed rows from the channel and metadata caches
+    # Returns the number of rows read from them
+    def refresh(self, channel_cache_path=None, metadata_cache_path=None):
+        copied = 0
+        with self._lock:
+            if channel_cache_path and os.path.exists(channel_cache_path):
+                copied += self._refresh_channels(channel_cache_path)
+            if metadata_cache_path and os.path.exists(metadata_cache_path):
+                copied += self._refresh_metadata(metadata_cache_path)
+        return copied
+
+    # Channel cache rows are re-stamped with the sync run that last listed
+    # them, so everything above the indexed run of a channel is new or changed
+    def _refresh_channels(self, path):
+        self._conn.execute("ATTACH DATABASE ? AS channel_cache", (path,))
+        try:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                rows = self._conn.execute(
+                    "SELECT c.video_id, c.channel_url, c.title, c.duration FROM channel_cache.channel_videos c "
+                    "LEFT JOIN index_state s ON s.source = 'channel:' || c.channel_url "
+                    "WHERE c.sync_run > COALESCE(s.mark, 0)").fetchall()
+                self._conn.executemany(UPSERT, [(video_id, channel_url, title, None, None, duration)
+                                                for video_id, channel_url, title, duration in rows])
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO index_state (source, mark) "
+                    "SELECT 'channel:' || channel_url, MAX(sync_run) FROM channel_cache.channel_videos "
+                    "GROUP BY channel_url")
+        finally:
+            self._conn.execute("DETACH DATABASE channel_cache")
+        return len(rows)
+
+    def _refresh_metadata(self, path):
+        self._conn.execute("ATTACH DATABASE ? AS metadata_cache", (path,))
+        try:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                mark = self._conn.execute(
+                    "SELECT COALESCE((SELECT mark FROM index_state WHERE source = 'metadata'), 0)").fetchone()[0]
+                rows = self._conn.execute(
+                    "SELECT video_id, fetched_at, info FROM metadata_cache.metadata "
+                    "WHERE status = 'ok' AND fetched_at > ? ORDER BY fetched_at", (mark,)).fetchall()
+                records = []
+                for video_id, fetched_at, info in rows:
+                    summary = json.loads(info) if info else {}
+                    records.append((video_id, None, summary.get('title'), summary.get('description'),
+                                    summary.get('upload_date'), summary.get('duration')))
+                    mark = max(mark, fetched_at)
+                self._conn.executemany(UPSERT, records)
+                self._conn.execute("INSERT OR REPLACE INTO index_state (source, mark) VALUES ('metadata', ?)", (mark,))
+        finally:
+            self._conn.execute("DETACH DATABASE metadata_cache")
+        return len(rows)
+
+    # ------------------------------------------------------------------------
+    # (video_id, title, upload_date, duration) rows, best match first, or
+    # newest first without a text query
+    def search(self, query=None, channel_url=None, after=None, before=None,
+               min_duration=None, max_duration=None, missing_dates=False, limit=None):
+        sql = "SELECT v.video_id, v.title, v.upload_date, v.duration FROM videos v"
+        conditions = []
+        params = []
+        if query:
+            sql += " JOIN videos_fts ON videos_fts.rowid = v.rowid"
+            conditions.append("videos_fts MATCH ?")
+            params.append(query)
+        if channel_url:
+            conditions.append("v.channel_url = ?")
+            params.append(channel_url)
+        if after:
+            conditions.append("v.upload_date >= ?")
+            params.append(normalize_date(after))
+        if before:
+            conditions.append("v.upload_date <= ?")
+            params.append(normalize_date(before))
+        if min_duration is not None:
+            conditions.append("v.duration >= ?")
+            params.append(min_duration)
+        if max_duration is not None:
+            conditions.append("v.duration <= ?")
+            params.append(max_duration)
+        if missing_dates:
+            conditions.append("v.upload_date IS NULL")
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        if query:
+            sql += f" ORDER BY bm25(videos_fts, {RANK_WEIGHTS[0]}, {RANK_WEIGHTS[1]})"
+        else:
+            sql += " ORDER BY v.upload_date DESC, v.rowid"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._lock:
+            try:
+                return self._conn.execute(sql, params).fetchall()
+            except sqlite3.OperationalError as e:
+                if not query:
+                    raise
+                if QUERY_SYNTAX.search(query):
+                    raise QueryError(f"Invalid query '{query}': {e}")
+        # Plain words that are not valid FTS5 (e.g. "C++" or "how-to"): search them as one phrase
+        phrase = '"' + query.replace('"', '""') + '"'
+        with self._lock:
+            return self._conn.execute(sql, [phrase] + params[1:]).fetchall()
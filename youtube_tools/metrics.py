@@ -0,0 +1,165 @@
+# ============================================================================
+# Per-stage timing and throughput instrumentation
+# Every finished video or transcript is written as one JSON line, and running
+# totals are rewritten to a Prometheus textfile-collector file
+# Download stages are timed from yt-dlp progress_hooks and postprocessor_hooks
+# ============================================================================
+import json
+import os
+import threading
+import time
+from datetime import datetime
+# ============================================================================
+# Postprocessor names from yt-dlp mapped to stage names
+POSTPROCESSOR_STAGES = {
+    'Merger': 'merge',
+    'FFmpegMerger': 'merge',
+    'FFmpegExtractAudio': 'extract_audio',
+    'FFmpegSubtitlesConvertor': 'convert_subtitles',
+    'MoveFiles': 'move_files',
+}
+# ============================================================================
+# Timings for one video, fed by the yt-dlp hooks of the worker handling it
+class StageTimer:
+    def __init__(self, video_id):
+        self.video_id = video_id
+        self.started = time.monotonic()
+        self.stages = {}
+        self.bytes = 0
+        self._metadata_open = True
+        self._downloads = {}
+        self._postprocessors = {}
+
+    def add(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    # Everything before the first byte is metadata extraction
+    def _close_metadata(self):
+        if self._metadata_open:
+            self._metadata_open = False
+            self.add('metadata', time.monotonic() - self.started)
+
+    def progress_hook(self, d):
+        filename = d.get('filename')
+        if d['status'] == 'downloading':
+            self._close_metadata()
+            self._downloads.setdefault(filename, time.monotonic())
+        elif d['status'] == 'finished':
+            self._close_metadata()
+            started = self._downloads.pop(filename, None)
+            elapsed = d.get('elapsed')
+            if elapsed is None:
+                elapsed = time.monotonic() - started if started else 0.0
+            self.add('download', elapsed)
+            self.bytes += d.get('total_bytes') or d.get('downloaded_bytes') or 0
+
+    def postprocessor_hook(self, d):
+        name = d.get('postprocessor')
+        if d['status'] == 'started':
+            self._postprocessors[name] = time.monotonic()
+        elif d['status'] == 'finished' and name in self._postprocessors:
+            stage = POSTPROCESSOR_STAGES.get(name, name.lower())
+            self.add(stage, time.monotonic() - self._postprocessors.pop(name))
+
+    def total(self):
+        return time.monotonic() - self.started
+# ============================================================================
+class MetricsRecorder:
+    def __init__(self, job, jsonl_path=None, prometheus_dir=None):
+        self.job = job
+        self.jsonl_path = jsonl_path or None
+        self.prometheus_path = os.path.join(prometheus_dir, f"youtube_{job}.prom") if prometheus_dir else None
+        self.started = time.time()
+        self.stage_seconds = {}
+        self.items = {}
+        self.bytes = 0
+        self.audio_seconds = 0.0
+        self._lock = threading.Lock()
+        self._file = open(self.jsonl_path, 'a', encoding='utf-8') if self.jsonl_path else None
+
+    def close(self):
+        self.write_prometheus()
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _emit(self, record):
+        if self._file:
+            record = {"time": datetime.now().isoformat(timespec='milliseconds'), "job": self.job, **record}
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def _add_stages(self, stages):
+        for stage, seconds in stages.items():
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+
+    # Count a logged item (succeeded, skipped, failed, ...)
+    def item(self, status):
+        with self._lock:
+            self.items[status] = self.items.get(status, 0) + 1
+
+    def download(self, timer, status, attempt=1, pause=0.0):
+        if pause:
+            timer.add('pause', pause)
+        with self._lock:
+            self._add_stages(timer.stages)
+            self.bytes += timer.bytes
+            self._emit({"event": "download", "video_id": timer.video_id, "status": status, "attempt": attempt,
+                        "seconds": round(timer.total(), 3), "bytes": timer.bytes,
+                        "stages": {stage: round(seconds, 3) for stage, seconds in timer.stages.items()}})
+        self.write_prometheus()
+
+    def transcription(self, file_path, audio_seconds, decode_seconds, inference_seconds, status="succeeded"):
+        stages = {'decode': decode_seconds, 'inference': inference_seconds}
+        with self._lock:
+            self._add_stages(stages)
+            self.audio_seconds += audio_seconds or 0
+            rtf = inference_seconds / audio_seconds if audio_seconds else None
+            self._emit({"event": "transcribe", "file": file_path, "status": status,
+                        "audio_seconds": audio_seconds, "rtf": round(rtf, 4) if rtf is not None else None,
+                        "stages": {stage: round(seconds, 3) for stage, seconds in stages.items()}})
+        self.write_prometheus()
+
+    # Rewrite the textfile atomically so the collector never reads half a file
+    def write_prometheus(self):
+        if not self.prometheus_path:
+            return
+        with self._lock:
+            job = self.job
+            lines = [
+                "# HELP youtube_stage_seconds_total Seconds spent per pipeline stage in this run.",
+                "# TYPE youtube_stage_seconds_total counter",
+            ]
+            for stage, seconds in sorted(self.stage_seconds.items()):
+                lines.append(f'youtube_stage_seconds_total{{job="{job}",stage="{stage}"}} {seconds:.3f}')
+            lines += [
+                "# HELP youtube_items_total Items processed in this run by outcome.",
+                "# TYPE youtube_items_total counter",
+            ]
+            for status, count in sorted(self.items.items()):
+                lines.append(f'youtube_items_total{{job="{job}",status="{status}"}} {count}')
+            lines += [
+                "# HELP youtube_download_bytes_total Bytes downloaded in this run.",
+                "# TYPE youtube_download_bytes_total counter",
+                f'youtube_download_bytes_total{{job="{job}"}} {self.bytes}',
+                "# HELP youtube_audio_seconds_total Seconds of audio transcribed in this run.",
+                "# TYPE youtube_audio_seconds_total counter",
+                f'youtube_audio_seconds_total{{job="{job}"}} {self.audio_seconds:.3f}',
+                "# HELP youtube_run_start_timestamp_seconds Start time of the current run.",
+                "# TYPE youtube_run_start_timestamp_seconds gauge",
+                f'youtube_run_start_timestamp_seconds{{job="{job}"}} {self.started:.0f}',
+                "# HELP youtube_last_update_timestamp_seconds Time of the last metrics update.",
+                "# TYPE youtube_last_update_timestamp_seconds gauge",
+                f'youtube_last_update_timestamp_seconds{{job="{job}"}} {time.time():.0f}',
+            ]
+            temp_path = self.prometheus_path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(temp_path, self.prometheus_path)
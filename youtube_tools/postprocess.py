@@ -0,0 +1,155 @@
+# ============================================================================
+# Postprocessing as its own pipeline stage
+# Download workers fetch the raw streams only (video and audio as separate
+# files, audio in its source codec); merging into MP4 and audio conversion
+# run on a process pool fed through a bounded backlog, so the network keeps
+# downloading while ffmpeg works and a full backlog slows the downloaders
+# instead of piling up raw files
+# ============================================================================
+import multiprocessing
+import os
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from youtube_tools.local_audio import AUDIO_FORMATS, extract_audio
+# ============================================================================
+MERGE = "merge"
+AUDIO = "audio"
+
+# Raw files are named after the final file plus the format, e.g. "Title.f137.mp4"
+RAW_SUFFIX = re.compile(r'\.f[^.]+\.[^.]+$')
+
+# Default pool size: every core but one, which stays with the download threads
+def default_workers():
+    return max(1, (os.cpu_count() or 2) - 1)
+
+# Downloader options -> (raw download options, spec) where spec is
+# (MERGE, container) or (AUDIO, audio_format); options without a merge or an
+# audio conversion come back unchanged with spec None
+def split_options(ydl_opts):
+    opts = dict(ydl_opts)
+    outtmpl = opts['outtmpl']
+    folder, name = os.path.split(outtmpl)
+    stem = name[:-len('.%(ext)s')] if name.endswith('.%(ext)s') else os.path.splitext(name)[0]
+    raw_outtmpl = {'default': os.path.join(folder, stem + '.f%(format_id)s.%(ext)s'), 'subtitle': outtmpl}
+
+    container = opts.pop('merge_output_format', None)
+    if container and '+' in opts['format']:
+        # "video+audio/fallback" -> "video,audio/fallback": two downloads, no merge
+        # The video branch has no fallback, so where only muxed formats exist
+        # it matches nothing and the audio branch takes the muxed file alone,
+        # under the same cap as before; a single file is remuxed, not merged
+        merged, _, fallback = opts['format'].partition('/')
+        video, audio = merged.split('+', 1)
+        opts['format'] = f"{video},{audio}/{fallback}" if fallback else f"{video},{audio}"
+        opts['outtmpl'] = raw_outtmpl
+        return opts, (MERGE, container)
+
+    extractors = [pp for pp in opts.get('postprocessors', []) if pp.get('key') == 'FFmpegExtractAudio']
+    if extractors and extractors[0].get('preferredcodec') in AUDIO_FORMATS:
+        opts['postprocessors'] = [pp for pp in opts['postprocessors'] if pp not in extractors]
+        opts['outtmpl'] = raw_outtmpl
+        return opts, (AUDIO, extractors[0]['preferredcodec'])
+    return ydl_opts, None
+
+# The work left for a finished raw download, as a picklable dict
+def plan_task(info, spec):
+    kind, target = spec
+    inputs = []
+    for download in info.get('requested_downloads') or []:
+        path = download.get('filepath')
+        if path and path not in [existing for existing, _, _ in inputs]:
+            inputs.append((path, download.get('vcodec') not in (None, 'none'), download.get('acodec') not in (None, 'none')))
+    if not inputs:
+        raise RuntimeError("yt-dlp reported no downloaded file")
+    base = RAW_SUFFIX.sub('', inputs[0][0])
+    ext = '.' + target if kind == MERGE else AUDIO_FORMATS[target][0]
+    return {'kind': kind, 'target': target, 'inputs': inputs, 'output': base + ext}
+
+# Runs in a pool process; returns the seconds spent
+# Raw files are removed only once the output is complete
+def run_task(task):
+    start_time = time.monotonic()
+    inputs, output = task['inputs'], task['output']
+    if task['kind'] == AUDIO:
+        audio = next((path for path, _, has_audio in inputs if has_audio), inputs[0][0])
+        extract_audio(audio, output, task['target'])
+    elif len(inputs) == 1 and os.path.splitext(inputs[0][0])[1] == os.path.splitext(output)[1]:
+        # Already a single file in the right container
+        os.replace(inputs[0][0], output)
+        return time.monotonic() - start_time
+    else:
+        video = next((i for i, (_, has_video, _) in enumerate(inputs) if has_video), 0)
+        audio = next((i for i, (_, _, has_audio) in enumerate(inputs) if has_audio), video)
+        command = ["ffmpeg", "-nostdin", "-v", "error"]
+        for path, _, _ in inputs:
+            command += ["-i", path]
+        part_path = output + ".part"
+        command += ["-map", f"{video}:v:0", "-map", f"{audio}:a:0?", "-c", "copy", "-f", task['target'], "-y", part_path]
+        try:
+            subprocess.run(command, capture_output=True, check=True)
+            os.replace(part_path, output)
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+    for path, _, _ in inputs:
+        if path != output and os.path.exists(path):
+            os.remove(path)
+    return time.monotonic() - start_time
+# ============================================================================
+# Process pool behind a bounded backlog
+# submit() blocks while backlog tasks are waiting or running
+class PostprocessStage:
+    def __init__(self, workers=None, backlog=None):
+        self.workers = max(1, int(workers or default_workers()))
+        self.backlog = max(self.workers, int(backlog or self.workers * 2))
+        self._slots = threading.BoundedSemaphore(self.backlog)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.done = 0
+        self.failed = 0
+        self.seconds = 0.0
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # on_done(seconds, error) runs on a pool thread once the task has finished
+    def submit(self, task, on_done):
+        self._slots.acquire()
+        with self._lock:
+            self._pending += 1
+
+        def finished(future):
+            try:
+                seconds, error = future.result(), None
+            except Exception as e:
+                seconds, error = 0.0, e
+            with self._lock:
+                self._pending -= 1
+                if error is None:
+                    self.done += 1
+                    self.seconds += seconds
+                else:
+                    self.failed += 1
+            self._slots.release()
+            on_done(seconds, error)
+
+        self._pool.submit(run_task, task).add_done_callback(finished)
+
+    # (waiting, running)
+    def status(self):
+        with self._lock:
+            running = min(self._pending, self.workers)
+            return self._pending - running, running
+
+    # Waits for every submitted task
+    def close(self):
+        self._pool.shutdown(wait=True)
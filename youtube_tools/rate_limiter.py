@@ -0,0 +1,70 @@
+# ============================================================================
+# Global request budget shared by every download worker
+# Requests are spaced evenly over the minute instead of each worker
+# sleeping for a random 5s to 30s after every video
+# AdaptiveRateController adjusts that budget from throttling and success signals
+# ============================================================================
+import threading
+import time
+
+from youtube_tools.errors import STATUS_THROTTLED
+# ============================================================================
+class RateLimiter:
+    def __init__(self, requests_per_minute):
+        self.requests_per_minute = requests_per_minute
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    # Block until the caller's slot in the shared budget comes up
+    # Returns the number of seconds spent waiting
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    # Outcome of a request (an errors.STATUS_* value or "ok"), ignored here
+    def report(self, status):
+        pass
+# ============================================================================
+# Adaptive pacing driven by error signals
+# Throttling (HTTP 429/403, rate-limit messages) doubles the spacing between
+# requests and pauses everyone for an exponentially growing cooldown;
+# successes shrink the spacing again towards max_requests_per_minute
+class AdaptiveRateController(RateLimiter):
+    def __init__(self, requests_per_minute, max_requests_per_minute=None,
+                 cooldown=60.0, max_cooldown=1800.0, speedup=0.9):
+        super().__init__(requests_per_minute)
+        max_rpm = max_requests_per_minute or requests_per_minute
+        self.min_interval = 60.0 / max_rpm if max_rpm > 0 else 0.0
+        self.max_interval = max(self.interval, 1.0) * 16
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.speedup = speedup
+        self.throttle_streak = 0
+
+    def report(self, status):
+        with self._lock:
+            if status == STATUS_THROTTLED:
+                self.throttle_streak += 1
+                self.interval = min(self.max_interval, max(self.interval, 1.0) * 2)
+                pause = min(self.max_cooldown, self.cooldown * 2 ** (self.throttle_streak - 1))
+                self._next_slot = max(self._next_slot, time.monotonic() + pause)
+                rpm = 60.0 / self.interval
+            elif status == "ok":
+                self.throttle_streak = 0
+                # Shrink towards min_interval, never slow down a faster starting budget
+                if self.interval > self.min_interval:
+                    self.interval = max(self.min_interval, self.interval * self.speedup)
+                return
+            else:
+                return
+
+        print(f"\033[93m[WARN]\033[0m Throttled by the server: pausing all workers {int(pause)}s, "
+              f"budget now {rpm:.1f} requests/minute")
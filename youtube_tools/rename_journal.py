@@ -0,0 +1,185 @@
+# ============================================================================
+# Journaled, parallel file renames
+# The full plan is written to a JSON-lines journal before anything is touched
+# and every finished rename is appended as it happens, so an interrupted run
+# can be resumed or rolled back later
+# A rename that fails is recorded as failed, together with the renames of
+# its chain that depended on it; failed renames are not retried by a resume,
+# so one locked or missing file cannot keep a plan open forever
+# Renames are grouped in chains: renames inside a chain depend on each other
+# and run in order, separate chains run in parallel
+# ============================================================================
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+# ============================================================================
+class RenameJournal:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    # Returns (ops, done_ids, complete) from an existing journal
+    def load(self):
+        ops, done, _, complete = self.load_all()
+        return ops, done, complete
+
+    # Returns (ops, done_ids, failed_ids, complete)
+    def load_all(self):
+        ops, done, failed, complete = [], set(), set(), False
+        if not os.path.exists(self.path):
+            return ops, done, failed, True
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn last line from a crash
+                if record.get("type") == "rename":
+                    ops.append(record)
+                elif record.get("type") == "done":
+                    done.add(record["id"])
+                elif record.get("type") == "failed":
+                    failed.add(record["id"])
+                elif record.get("type") == "undone":
+                    done.discard(record["id"])
+                elif record.get("type") == "complete":
+                    complete = True
+        return ops, done, failed, complete
+
+    def has_pending(self):
+        ops, done, failed, complete = self.load_all()
+        return not complete and any(op["id"] not in done and op["id"] not in failed for op in ops)
+
+    # Close an interrupted plan without finishing it; its done renames can
+    # still be rolled back
+    def abandon(self):
+        ops, done, failed, _ = self.load_all()
+        self.reopen()
+        left = sum(1 for op in ops if op["id"] not in done and op["id"] not in failed)
+        self.record("complete", abandoned=left)
+        self.close()
+        return left
+
+    def start(self, ops, **header):
+        self.begin(count=len(ops), **header)
+        self.add(ops)
+
+    # Streamed plans: begin() once, then add() each batch before applying it
+    def begin(self, **header):
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._write({"type": "plan", "created": datetime.now().isoformat(timespec='seconds'), **header})
+        self.next_id = 0
+
+    def add(self, ops):
+        with self._lock:
+            for op in ops:
+                self._write({"type": "rename", **op})
+                self.next_id = max(self.next_id, op["id"] + 1)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def reopen(self):
+        ops, _, _ = self.load()
+        self.next_id = max((op["id"] for op in ops), default=-1) + 1
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def record(self, record_type, op_id=None, **fields):
+        record = {"type": record_type, "id": op_id} if op_id is not None else {"type": record_type}
+        with self._lock:
+            self._write({**record, **fields})
+            self._file.flush()
+# ============================================================================
+def _rename(src, dst):
+    # A crash between os.rename and the journal write leaves src gone and dst
+    # present, that counts as already done
+    if not os.path.lexists(src) and os.path.lexists(dst):
+        return False
+    if os.path.lexists(dst) and os.path.normcase(src) != os.path.normcase(dst):
+        raise FileExistsError(f"target already exists: {dst}")
+    os.rename(src, dst)
+    return True
+
+def _by_chain(ops):
+    chains = {}
+    for op in ops:
+        chains.setdefault(op["chain"], []).append(op)
+    return list(chains.values())
+
+# Apply ops (dicts with id, chain, src, dst), skipping ids already in done
+# or failed
+# on_renamed(src, dst) is called after each successful rename
+# complete=False leaves the journal open for further batches
+# Returns (renamed_count, errors)
+def apply_plan(journal, ops, workers=8, done=None, on_renamed=None, complete=True, failed=None):
+    done = done or set()
+    failed = failed or set()
+    counter = {"renamed": 0}
+    errors = []
+    counter_lock = threading.Lock()
+
+    def run_chain(chain):
+        for i, op in enumerate(chain):
+            if op["id"] in done or op["id"] in failed:
+                continue
+            try:
+                _rename(op["src"], op["dst"])
+            except OSError as e:
+                with counter_lock:
+                    errors.append((op, e))
+                print(f"\033[91m[ERROR]\033[0m Could not rename {op['src']}: {e}")
+                journal.record("failed", op["id"], error=str(e))
+                # Later renames in this chain depend on this one
+                for later in chain[i + 1:]:
+                    if later["id"] not in done:
+                        journal.record("failed", later["id"], error=f"depends on rename {op['id']}")
+                return
+            journal.record("done", op["id"])
+            if on_renamed:
+                on_renamed(op["src"], op["dst"])
+            if not op.get("quiet"):
+                with counter_lock:
+                    counter["renamed"] += 1
+                print(f"\033[92m[RENAME]\033[0m {os.path.basename(op['src'])} → {os.path.basename(op['dst'])}")
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        list(pool.map(run_chain, _by_chain(ops)))
+
+    if complete:
+        journal.record("complete", errors=len(errors))
+    return counter["renamed"], errors
+
+# Undo every rename the journal recorded as done, newest first
+def rollback(journal, on_renamed=None):
+    ops, done, _ = journal.load()
+    journal.reopen()
+    undone = 0
+    try:
+        for op in reversed(ops):
+            if op["id"] not in done:
+                continue
+            try:
+                _rename(op["dst"], op["src"])
+            except OSError as e:
+                print(f"\033[91m[ERROR]\033[0m Could not restore {op['src']}: {e}")
+                continue
+            journal.record("undone", op["id"])
+            if on_renamed:
+                on_renamed(op["dst"], op["src"])
+            if not op.get("quiet"):
+                undone += 1
+                print(f"\033[92m[RESTORE]\033[0m {os.path.basename(op['dst'])} → {os.path.basename(op['src'])}")
+        journal.record("complete")
+    finally:
+        journal.close()
+    return undone
@@ -0,0 +1,124 @@
+# ============================================================================
+# Rename plan for rename_by_id.py
+# One os.scandir pass maps files to their video ID, then the plan is checked
+# for collisions and ordered so that chains (a → b while b → c) and swap
+# cycles (a → b while b → a) can be applied safely
+# ============================================================================
+import os
+import re
+# ============================================================================
+# An ID is exactly 11 ID characters not touching other ID characters,
+# e.g. "#MkpR0cKWCfE", "[MkpR0cKWCfE]" or "Title - MkpR0cKWCfE"
+VIDEO_ID_PATTERN = re.compile(r'(?<![A-Za-z0-9_-])([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])')
+# Language tag yt-dlp puts in front of subtitle extensions, e.g. ".en.srt"
+LANGUAGE_SUFFIX = re.compile(r'\.[a-z]{2,3}(?:-[A-Za-z0-9]+)?$')
+
+def sanitize_filename(name):
+    return re.sub(r'[\\/*?:"<>|]', '', name).strip()
+
+# Returns the video ID when exactly one known ID appears in the name
+def extract_video_id(stem, known_ids):
+    candidates = {match for match in VIDEO_ID_PATTERN.findall(stem) if match in known_ids}
+    if len(candidates) == 1:
+        return candidates.pop()
+    return None
+
+def split_suffix(filename):
+    stem, ext = os.path.splitext(filename)
+    language = LANGUAGE_SUFFIX.search(stem)
+    if language and ext.lower() in ('.srt', '.vtt', '.ass'):
+        return stem[:language.start()], language.group(0) + ext
+    return stem, ext
+# ============================================================================
+def _key(path):
+    return os.path.normcase(path)
+
+# Returns (ops, skipped): ops are dicts with id, chain, src and dst;
+# skipped is a list of (filename, reason)
+def plan_renames(folder, video_titles, lookup_path=None):
+    known_ids = set(video_titles)
+    targets = {}   # src -> dst
+    skipped = []
+
+    with os.scandir(folder) as entries:
+        names = {}
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            names[_key(entry.path)] = entry.path
+
+            stem, suffix = split_suffix(entry.name)
+            known = lookup_path(entry.path) if lookup_path else None
+            video_id = known[0] if known else extract_video_id(stem, known_ids)
+            if video_id not in video_titles:
+                continue
+
+            new_filename = f"{sanitize_filename(video_titles[video_id])}{suffix}"
+            if new_filename == entry.name:
+                continue
+            targets[entry.path] = os.path.join(folder, new_filename)
+
+    # Two files wanting the same name: the first one (by name) wins
+    claimed = {}
+    for src in sorted(targets):
+        dst_key = _key(targets[src])
+        if dst_key in claimed:
+            skipped.append((os.path.basename(src), f"same target as {os.path.basename(claimed[dst_key])}"))
+            continue
+        claimed[dst_key] = src
+    targets = {src: targets[src] for src in claimed.values()}
+
+    # A target taken by a file that is not moving away is left alone; dropping
+    # one rename can block the chain that was waiting on it, so repeat
+    changed = True
+    while changed:
+        changed = False
+        sources = {_key(src) for src in targets}
+        for src, dst in list(targets.items()):
+            if _key(dst) in names and _key(dst) not in sources and _key(dst) != _key(src):
+                skipped.append((os.path.basename(src), f"already exists: {os.path.basename(dst)}"))
+                del targets[src]
+                changed = True
+
+    return order_chains(targets), skipped
+# ============================================================================
+# Turn src -> dst pairs into ordered ops, one chain per dependent group
+# Chains are applied from the free end backwards; cycles go through a temp name
+def order_chains(targets):
+    by_src = {_key(src): (src, dst) for src, dst in targets.items()}
+    renamed_onto = {_key(dst) for dst in targets.values()}
+    visited = set()
+    ops = []
+
+    def add(chain, src, dst, **extra):
+        ops.append({"id": len(ops), "chain": chain, "src": src, "dst": dst, **extra})
+
+    def walk(start):
+        members = []
+        node = start
+        while node in by_src and node not in visited:
+            visited.add(node)
+            members.append(node)
+            node = _key(by_src[node][1])
+        return members
+
+    chain = 0
+    # Heads are files nothing renames onto, their chains end at a free name
+    for head in sorted(key for key in by_src if key not in renamed_onto):
+        for member in reversed(walk(head)):
+            add(chain, *by_src[member])
+        chain += 1
+
+    # Whatever is left is a swap cycle: park one file, shift the rest, move it in
+    for start in sorted(key for key in by_src if key not in visited):
+        if start in visited:
+            continue
+        members = walk(start)
+        first_src, first_dst = by_src[members[0]]
+        temp = f"{first_src}.renaming"
+        add(chain, first_src, temp, quiet=True)
+        for member in reversed(members[1:]):
+            add(chain, *by_src[member])
+        add(chain, temp, first_dst)
+        chain += 1
+    return ops
@@ -0,0 +1,93 @@
+# ============================================================================
+# settings.ini, read once for every command
+# Every key and its default lives here; channel_url, csv_name and video_dir
+# have no default and are only required by the commands that use them
+# ============================================================================
+import configparser
+# ============================================================================
+class SettingsError(Exception):
+    pass
+
+class Settings:
+    def __init__(self, path='settings.ini'):
+        self.path = path
+        config = configparser.ConfigParser()
+        config.read(path, encoding='utf-8')
+        if not config.has_section('Settings'):
+            config.add_section('Settings')
+        section = config['Settings']
+
+        # Inputs and outputs
+        self.channel_url = section.get('channel_url')
+        self.csv_name = section.get('csv_name')
+        self.video_dir = section.get('video_dir')
+        self.keyword = section.get('keyword', fallback='')
+
+        # Downloads
+        self.download_workers = section.getint('download_workers', fallback=1)
+        self.requests_per_minute = section.getfloat('requests_per_minute', fallback=4)
+        self.max_requests_per_minute = section.getfloat('max_requests_per_minute', fallback=12)
+        self.max_attempts = section.getint('max_attempts', fallback=3)
+        self.retry_delay = section.getfloat('retry_delay', fallback=60)
+        self.separate_postprocessing = section.getboolean('separate_postprocessing', fallback=False)
+        self.postprocess_workers = section.getint('postprocess_workers', fallback=0)
+        self.archive_file = section.get('archive_file', fallback='download_archive.sqlite3')
+        self.channel_cache = section.get('channel_cache', fallback='channel_cache.sqlite3')
+        self.incremental_sync = section.getboolean('incremental_sync', fallback=True)
+        self.manifest = section.get('manifest', fallback='channels.ini')
+        self.audio_format = section.get('audio_format', fallback='mp3')
+        self.local_audio = section.getboolean('local_audio', fallback=True)
+
+        # Download planning
+        self.plan_downloads = section.getboolean('plan_downloads', fallback=False)
+        self.metadata_cache = section.get('metadata_cache', fallback='metadata_cache.sqlite3')
+        self.metadata_workers = section.getint('metadata_workers', fallback=8)
+        self.metadata_requests_per_minute = section.getfloat('metadata_requests_per_minute', fallback=60)
+        self.queue_order = section.get('queue_order', fallback='csv')
+        self.bandwidth_mbps = section.getfloat('bandwidth_mbps', fallback=20)
+
+        # Search
+        self.metadata_index = section.get('metadata_index', fallback='metadata_index.sqlite3')
+        self.transcript_index = section.get('transcript_index', fallback='transcript_index.sqlite3')
+
+        # Renames
+        self.rename_journal = section.get('rename_journal', fallback='rename_journal.jsonl')
+        self.sanitize_journal = section.get('sanitize_journal', fallback='sanitize_journal.jsonl')
+        self.rename_workers = section.getint('rename_workers', fallback=8)
+
+        # Transcription
+        self.use_captions = section.getboolean('use_captions', fallback=True)
+        self.check_captions = section.getboolean('check_captions', fallback=True)
+        self.caption_languages = section.get('caption_languages', fallback='en')
+        self.transcribe_engine = section.get('transcribe_engine', fallback='openai-whisper')
+        self.whisper_model = section.get('whisper_model', fallback='base')
+        self.whisper_threads = section.getint('whisper_threads', fallback=0)
+        self.beam_size = section.getint('beam_size', fallback=0)
+        self.compute_type = section.get('compute_type', fallback='int8')
+        self.transcribe_workers = section.getint('transcribe_workers', fallback=0)
+        self.decode_ahead = section.getint('decode_ahead', fallback=2)
+        self.stream_window = section.getfloat('stream_window', fallback=300)
+        self.split_long_files = section.getfloat('split_long_files', fallback=1200)
+        self.transcript_cache = section.get('transcript_cache', fallback='transcript_cache.sqlite3')
+        self.transcript_cache_mb = section.getfloat('transcript_cache_mb', fallback=512)
+
+        # Deduplication
+        self.dedup_cache = section.get('dedup_cache', fallback='dedup_cache.sqlite3')
+        self.dedup_report = section.get('dedup_report', fallback='dedup_report.json')
+        self.dedup_workers = section.getint('dedup_workers', fallback=8)
+        self.dedup_min_mb = section.getfloat('dedup_min_mb', fallback=1)
+
+        # Integrity
+        self.verify_cache = section.get('verify_cache', fallback='verify_cache.sqlite3')
+        self.verify_workers = section.getint('verify_workers', fallback=8)
+
+        # Metrics
+        self.metrics_file = section.get('metrics_file', fallback='metrics.jsonl')
+        self.prometheus_dir = section.get('prometheus_dir', fallback='')
+
+    # Value of a key that has no default
+    def require(self, key):
+        value = getattr(self, key)
+        if not value:
+            raise SettingsError(f"'{key}' is not set in {self.path}")
+        return value
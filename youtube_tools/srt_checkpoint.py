@@ -0,0 +1,91 @@
+# ============================================================================
+# SRT file written segment by segment with resumable checkpoints
+# Cues go to "<name>.srt.part" as they are produced; a checkpoint stores the
+# audio offset reached, the cue count, the byte length of the part file and
+# the text to prompt the next window with
+# After an interruption the part file is cut back to the last checkpoint and
+# transcription continues from its offset; the checkpoint is only trusted
+# for the same source file and the same engine options
+# ============================================================================
+import json
+import os
+# ============================================================================
+def format_time(t):
+    h = int(t // 3600)
+    m = int((t % 3600) // 60)
+    s = int(t % 60)
+    ms = int((t - int(t)) * 1000)
+    return f"{h:02}:{m:02}:{s:02},{ms:03}"
+
+def srt_block(index, segment):
+    return f"{index}\n{format_time(segment['start'])} --> {format_time(segment['end'])}\n{segment['text'].strip()}\n\n"
+
+def checkpoint_path(srt_file):
+    return srt_file + ".checkpoint.json"
+# ============================================================================
+class CheckpointedSrt:
+    # identity: anything JSON-serializable that must match for a resume
+    def __init__(self, srt_file, identity):
+        self.srt_file = srt_file
+        self.part_path = srt_file + ".part"
+        self.checkpoint_path = checkpoint_path(srt_file)
+        self.identity = identity
+        self.offset = 0.0
+        self.index = 0
+        self.prompt = None
+        self.resumed = False
+        self._bytes = 0
+        self._file = None
+
+        state = self._load()
+        if state is not None:
+            self.offset, self.index, self.prompt, self._bytes = \
+                state['offset'], state['index'], state['prompt'], state['bytes']
+            self.resumed = True
+
+    def _load(self):
+        try:
+            with open(self.checkpoint_path, encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('identity') != self.identity or os.path.getsize(self.part_path) < state['bytes']:
+                return None
+            return state
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def __enter__(self):
+        self._file = open(self.part_path, 'r+b' if self.resumed else 'wb')
+        self._file.seek(self._bytes)
+        self._file.truncate()
+        return self
+
+    # The part file and checkpoint stay behind on errors, ready for a resume
+    def __exit__(self, *exc):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def write(self, segment):
+        self.index += 1
+        self._file.write(srt_block(self.index, segment).encode('utf-8'))
+
+    # Everything written so far is on disk before the checkpoint points past it
+    def checkpoint(self, offset, prompt=None):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.offset = offset
+        self.prompt = prompt
+        self._bytes = self._file.tell()
+        temp_path = self.checkpoint_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'identity': self.identity, 'offset': offset, 'index': self.index,
+                       'bytes': self._bytes, 'prompt': prompt}, f)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def finish(self):
+        self.__exit__()
+        os.replace(self.part_path, self.srt_file)
+        try:
+            os.remove(self.checkpoint_path)
+        except OSError:
+            pass
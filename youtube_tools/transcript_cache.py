@@ -0,0 +1,138 @@
+# ============================================================================
+# Content-addressed cache of finished transcriptions
+# Entries are keyed by the hash of a file's audio stream plus the model and
+# decoding options, and hold the segments themselves, so a renamed file or
+# the same video in another channel folder gets its SRT written again
+# without running Whisper
+# Audio hashes are remembered per (path, size, mtime); the cache is kept
+# under max_bytes by dropping the least recently used entries
+# ============================================================================
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from youtube_tools.media_probe import audio_stream_hash
+# ============================================================================
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS audio_hashes (
+    path        TEXT PRIMARY KEY,
+    size        INTEGER NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    audio_hash  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transcripts (
+    key         TEXT PRIMARY KEY,
+    audio_hash  TEXT NOT NULL,
+    options     TEXT NOT NULL,
+    segments    BLOB NOT NULL,
+    bytes       INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    last_used   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transcripts_by_use ON transcripts (last_used);
+"""
+
+def _path_key(path):
+    return os.path.normcase(os.path.abspath(path))
+
+def _options_text(options):
+    return json.dumps(options, sort_keys=True, separators=(',', ':'))
+# ============================================================================
+class TranscriptCache:
+    def __init__(self, db_path, max_bytes=512 * 1024 ** 2):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------------
+    # Audio hash of a file, from the table while its size and mtime are unchanged
+    def audio_hash(self, file_path):
+        path = _path_key(file_path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT audio_hash FROM audio_hashes WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, stat.st_size, stat.st_mtime_ns)).fetchone()
+        if row:
+            return row[0]
+        digest = audio_stream_hash(path)
+        if digest:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO audio_hashes (path, size, mtime_ns, audio_hash) VALUES (?, ?, ?, ?)",
+                    (path, stat.st_size, stat.st_mtime_ns, digest))
+        return digest
+
+    # ffmpeg mostly waits on the disk, so hash many files at once
+    def audio_hashes(self, file_paths, workers=8):
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(zip(file_paths, pool.map(self.audio_hash, file_paths)))
+
+    # Cache key for an audio hash transcribed with the given options (a dict)
+    @staticmethod
+    def key(audio_hash, options):
+        return hashlib.sha256(f"{audio_hash}|{_options_text(options)}".encode()).hexdigest()
+
+    # ------------------------------------------------------------------------
+    # Segments (dicts with start, end and text) or None
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT segments FROM transcripts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE transcripts SET last_used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key, audio_hash, options, segments):
+        blob = zlib.compress(json.dumps(
+            [{'start': segment['start'], 'end': segment['end'], 'text': segment['text']} for segment in segments],
+            ensure_ascii=False).encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts (key, audio_hash, options, segments, bytes, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", (key, audio_hash, _options_text(options), blob, len(blob), now, now))
+            self._evict()
+
+    # Drop least recently used entries until the cache fits in max_bytes
+    def _evict(self):
+        if not self.max_bytes:
+            return
+        total = self._conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM transcripts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, bytes FROM transcripts ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("DELETE FROM transcripts WHERE key = ?", doomed)
+
+    def stats(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM transcripts").fetchone()
@@ -0,0 +1,219 @@
+# ============================================================================
+# Local full-text index over subtitle segments (SQLite FTS5)
+# Every .srt / .vtt cue becomes one row with its start and end in
+# milliseconds, so a hit points at the moment a phrase is spoken
+# A refresh only re-parses files whose mtime or size changed and drops the
+# rows of files that are gone
+# ============================================================================
+import os
+import re
+import sqlite3
+import threading
+
+from youtube_tools.metadata_index import QUERY_SYNTAX, QueryError
+from youtube_tools.rename_planner import split_suffix
+# ============================================================================
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path        TEXT PRIMARY KEY,
+    mtime_ns    INTEGER NOT NULL,
+    size        INTEGER NOT NULL,
+    video_id    TEXT
+);
+CREATE INDEX IF NOT EXISTS files_by_video ON files (video_id);
+CREATE TABLE IF NOT EXISTS segments (
+    rowid       INTEGER PRIMARY KEY,
+    path        TEXT NOT NULL,
+    start_ms    INTEGER NOT NULL,
+    end_ms      INTEGER NOT NULL,
+    text        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_by_path ON segments (path);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text, content='segments', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS segments_insert AFTER INSERT ON segments BEGIN
+    INSERT INTO segments_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS segments_delete AFTER DELETE ON segments BEGIN
+    INSERT INTO segments_fts (segments_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+END;
+"""
+
+SUBTITLE_EXTENSIONS = ('.srt', '.vtt')
+
+# Changed files are written in batches so an interrupted refresh keeps its progress
+COMMIT_EVERY = 200
+
+# 01:02:03,456 (SRT), 01:02:03.456 or 02:03.456 (WebVTT)
+TIMESTAMP = re.compile(r'(?:(\d+):)?(\d{1,2}):(\d{2})[,.](\d{3})')
+# <i>, <c.colorE5E5E5>, <00:00:01.234> karaoke stamps and {\an8} positioning
+MARKUP = re.compile(r'<[^>]*>|\{\\[^}]*\}')
+# ============================================================================
+def _to_ms(match):
+    hours, minutes, seconds, millis = match.groups()
+    return ((int(hours or 0) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int(millis)
+
+def format_ms(ms):
+    return f"{ms // 3600000:02}:{ms // 60000 % 60:02}:{ms // 1000 % 60:02}.{ms % 1000:03}"
+
+# (start_ms, end_ms, text) for every cue of an SRT or WebVTT file
+# YouTube auto captions repeat the previous line at the top of each cue;
+# lines already shown by the previous cue are dropped
+def parse_subtitles(path):
+    with open(path, encoding='utf-8-sig', errors='replace') as f:
+        blocks = re.split(r'\n\s*\n', f.read().replace('\r\n', '\n'))
+    cues = []
+    previous = ()
+    for block in blocks:
+        lines = block.strip().split('\n')
+        for i, line in enumerate(lines):
+            if '-->' in line:
+                break
+        else:
+            continue
+        start, _, end = lines[i].partition('-->')
+        start, end = TIMESTAMP.search(start), TIMESTAMP.search(end)
+        if not start or not end:
+            continue
+        text_lines = [MARKUP.sub('', line).strip() for line in lines[i + 1:]]
+        text_lines = [line for line in text_lines if line]
+        new_lines = [line for line in text_lines if line not in previous]
+        previous = text_lines
+        if new_lines:
+            cues.append((_to_ms(start), _to_ms(end), ' '.join(new_lines)))
+    return cues
+
+# (path, mtime_ns, size) for every subtitle file under folder
+# A downloaded caption ("Title.en.srt") that was rewritten as the video's
+# "Title.srt" is skipped, so its cues are not indexed twice
+def scan_subtitles(folder):
+    stack = [folder]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+            elif entry.name.lower().endswith(SUBTITLE_EXTENSIONS):
+                stem, suffix = split_suffix(entry.name)
+                tagged = suffix != os.path.splitext(entry.name)[1]
+                if tagged and os.path.exists(os.path.join(os.path.dirname(entry.path), stem + ".srt")):
+                    continue
+                stat = entry.stat()
+                yield os.path.normcase(os.path.abspath(entry.path)), stat.st_mtime_ns, stat.st_size
+
+def watch_link(video_id, start_ms):
+    # YouTube only takes whole seconds; round down so playback starts before the phrase
+    return f"https://www.youtube.com/watch?v={video_id}&t={start_ms // 1000}s"
+# ============================================================================
+class TranscriptIndex:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            self._conn.executescript(SCHEMA)
+        except sqlite3.OperationalError as e:
+            self._conn.close()
+            raise RuntimeError(f"SQLite {sqlite3.sqlite_version} was built without FTS5: {e}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*), (SELECT COUNT(*) FROM segments) FROM files").fetchone()
+
+    # ------------------------------------------------------------------------
+    # Bring the index in line with the subtitle files under folders
+    # resolve_id(path) returns the video ID of a subtitle file or None; files
+    # still without one are retried on every refresh
+    # Returns (reindexed files, indexed segments, removed files)
+    def refresh(self, folders, resolve_id=None):
+        resolve_id = resolve_id or (lambda path: None)
+        on_disk = {}
+        for folder in folders:
+            if os.path.isdir(folder):
+                for path, mtime_ns, size in scan_subtitles(folder):
+                    on_disk[path] = (mtime_ns, size)
+
+        roots = [os.path.join(os.path.normcase(os.path.abspath(folder)), '') for folder in folders]
+        with self._lock:
+            known = {path: (mtime_ns, size, video_id) for path, mtime_ns, size, video_id
+                     in self._conn.execute("SELECT path, mtime_ns, size, video_id FROM files")}
+        # Files of folders that were not scanned this time are left alone
+        removed = [path for path in known if path not in on_disk and any(path.startswith(root) for root in roots)]
+        changed = [path for path, stat in on_disk.items() if known.get(path, (None, None))[:2] != stat]
+        unresolved = [path for path, (mtime_ns, size, video_id) in known.items()
+                      if video_id is None and on_disk.get(path) == (mtime_ns, size)]
+
+        segment_count = 0
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                for path in removed:
+                    self._conn.execute("DELETE FROM segments WHERE path = ?", (path,))
+                    self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+                for path in unresolved:
+                    video_id = resolve_id(path)
+                    if video_id:
+                        self._conn.execute("UPDATE files SET video_id = ? WHERE path = ?", (video_id, path))
+
+            for start in range(0, len(changed), COMMIT_EVERY):
+                with self._conn:
+                    self._conn.execute("BEGIN")
+                    for path in changed[start:start + COMMIT_EVERY]:
+                        try:
+                            cues = parse_subtitles(path)
+                        except OSError as e:
+                            print(f"\033[93m[WARN]\033[0m Cannot read {path}: {e}")
+                            continue
+                        self._conn.execute("DELETE FROM segments WHERE path = ?", (path,))
+                        self._conn.executemany(
+                            "INSERT INTO segments (path, start_ms, end_ms, text) VALUES (?, ?, ?, ?)",
+                            [(path, start_ms, end_ms, text) for start_ms, end_ms, text in cues])
+                        mtime_ns, size = on_disk[path]
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO files (path, mtime_ns, size, video_id) VALUES (?, ?, ?, ?)",
+                            (path, mtime_ns, size, resolve_id(path)))
+                        segment_count += len(cues)
+        return len(changed), segment_count, len(removed)
+
+    # ------------------------------------------------------------------------
+    # (video_id, path, start_ms, end_ms, text) hits, best match first
+    # At most per_video hits per video (or per file when its ID is unknown),
+    # so one long lecture does not fill the whole result list
+    # Matched terms in text are wrapped in mark
+    def search(self, query, limit=20, per_video=3, mark=('', '')):
+        sql = """
+            SELECT video_id, path, start_ms, end_ms, text FROM (
+                SELECT f.video_id, s.path, s.start_ms, s.end_ms, h.text, h.score,
+                       ROW_NUMBER() OVER (PARTITION BY COALESCE(f.video_id, s.path) ORDER BY h.score) AS hit
+                FROM (SELECT rowid, highlight(segments_fts, 0, ?, ?) AS text, bm25(segments_fts) AS score
+                      FROM segments_fts WHERE segments_fts MATCH ?) h
+                JOIN segments s ON s.rowid = h.rowid
+                JOIN files f ON f.path = s.path)
+            WHERE hit <= ? ORDER BY score, path, start_ms LIMIT ?"""
+        params = [mark[0], mark[1], query, per_video or 2 ** 31, limit or -1]
+        with self._lock:
+            try:
+                return self._conn.execute(sql, params).fetchall()
+            except sqlite3.OperationalError as e:
+                if QUERY_SYNTAX.search(query):
+                    raise QueryError(f"Invalid query '{query}': {e}")
+        # Plain words that are not valid FTS5 (e.g. "C++" or "how-to"): search them as one phrase
+        params[2] = '"' + query.replace('"', '""') + '"'
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
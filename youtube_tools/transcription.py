@@ -0,0 +1,326 @@
+# ============================================================================
+# Batch transcription with a pool of Whisper worker processes
+# Each worker loads its engine (see transcription_engines) once, files are
+# scheduled longest first so one long video does not start last and hold up
+# the whole batch
+# With a stream window, audio is transcribed window by window and every
+# window's cues are written and checkpointed at once (see srt_checkpoint),
+# so a long file shows progress and an interrupted one resumes
+# Audio is decoded ahead by AudioPrefetcher so ffmpeg overlaps with inference
+# With several workers, a file of at least split_long seconds is cut at
+# silences into chunks that all workers transcribe at once (see chunking);
+# the chunks' cues are stitched back into one SRT in file time
+# With a TranscriptCache, files whose audio was transcribed before with the
+# same options get their SRT from the cache and never reach a worker
+# ============================================================================
+import multiprocessing
+import os
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import timedelta
+
+from youtube_tools.audio_prefetch import SAMPLE_RATE, AudioPrefetcher, load_pcm
+from youtube_tools.chunking import MIN_CHUNK, detect_silences, plan_chunks, stitch
+from youtube_tools.srt_checkpoint import CheckpointedSrt, checkpoint_path, format_time, srt_block
+from youtube_tools.transcript_index import parse_subtitles
+from youtube_tools.transcription_engines import create_engine
+# ============================================================================
+# Text of the previous window passed on as the next window's prompt
+PROMPT_CHARS = 200
+
+# workers = 0 picks the pool size: one worker with all cores for short files;
+# with a file to split, half the cores each running a worker, at most this
+# many since every worker holds its own copy of the model
+AUTO_SPLIT_WORKERS = 4
+
+def auto_workers(splittable):
+    if not splittable:
+        return 1
+    return min(AUTO_SPLIT_WORKERS, max(1, (os.cpu_count() or 1) // 2))
+
+def write_srt(segments, srt_file):
+    with open(srt_file, "w", encoding="utf-8") as f:
+        for i, segment in enumerate(segments, start=1):
+            f.write(srt_block(i, segment))
+# ============================================================================
+# Worker process state: one engine per process, loaded by the pool initializer
+_engine = None
+
+def _load_engine(spec, threads=None):
+    global _engine
+    spec = dict(spec)
+    if threads and not spec.get('threads'):
+        spec['threads'] = threads
+    _engine = create_engine(spec)
+    _engine.load()
+
+# Returns (seconds, segments)
+# window: stream window in seconds (0 transcribes the file in one call)
+# options: engine options, a checkpoint is only resumed with the same ones
+def _transcribe_one(file_path, srt_file, verbose, pcm_path=None, window=0, options=None):
+    if window and pcm_path:
+        return _transcribe_streaming(file_path, srt_file, verbose, pcm_path, window, options)
+    audio = load_pcm(pcm_path) if pcm_path else file_path
+    start_time = time.monotonic()
+    segments = _engine.transcribe(audio, verbose=verbose)
+    write_srt(segments, srt_file)
+    return time.monotonic() - start_time, segments
+
+def _transcribe_streaming(file_path, srt_file, verbose, pcm_path, window, options):
+    audio = load_pcm(pcm_path)
+    total = len(audio) / SAMPLE_RATE
+    stat = os.stat(file_path)
+    identity = {'options': options, 'window': window, 'source': [stat.st_size, stat.st_mtime_ns]}
+    segments = []
+    start_time = time.monotonic()
+
+    with CheckpointedSrt(srt_file, identity) as srt:
+        if srt.resumed:
+            print(f"\033[92m[INFO]\033[0m Resuming {os.path.basename(file_path)} at "
+                  f"{str(timedelta(seconds=int(srt.offset)))} ({srt.index} cues already written)")
+        while total - srt.offset > 0.05:
+            start = srt.offset
+            end = min(total, start + window)
+            last_window = end >= total
+            chunk = audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)]
+            next_offset = end
+            pending = None
+            for segment in _engine.transcribe_stream(chunk, srt.prompt):
+                segment = {'start': start + segment['start'], 'end': start + min(segment['end'], end - start),
+                           'text': segment['text']}
+                if pending is not None:
+                    _emit(srt, segments, pending, verbose)
+                pending = segment
+            # The last cue may be cut off by the window edge: unless the audio
+            # ends here, it is dropped and decoded again by the next window
+            if pending is not None:
+                if last_window or pending['start'] <= start + window / 2:
+                    _emit(srt, segments, pending, verbose)
+                else:
+                    next_offset = pending['start']
+            text = " ".join(segment['text'].strip() for segment in segments[-8:])
+            srt.checkpoint(next_offset, text[-PROMPT_CHARS:] or srt.prompt)
+        srt.finish()
+
+    if srt.resumed:
+        # Earlier cues were written by the interrupted run; read them back for the cache
+        segments = [{'start': start / 1000, 'end': end / 1000, 'text': text}
+                    for start, end, text in parse_subtitles(srt_file)]
+    return time.monotonic() - start_time, segments
+
+# One chunk of a split file; returns (seconds, segments in file time)
+def _transcribe_chunk(pcm_path, start, end):
+    audio = load_pcm(pcm_path)
+    start_time = time.monotonic()
+    segments = _engine.transcribe(audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)])
+    segments = [{'start': start + segment['start'], 'end': start + min(segment['end'], end - start),
+                 'text': segment['text']} for segment in segments]
+    return time.monotonic() - start_time, segments
+
+def _emit(srt, segments, segment, verbose):
+    srt.write(segment)
+    segments.append(segment)
+    if verbose:
+        print(f"[{format_time(segment['start'])} --> {format_time(segment['end'])}] {segment['text'].strip()}")
+# ============================================================================
+# Realtime factor = processing time / audio duration (below 1 is faster than realtime)
+def _rtf(elapsed, duration):
+    return elapsed / duration if duration else None
+
+def _report(file_path, srt_file, elapsed, duration):
+    rtf = _rtf(elapsed, duration)
+    rtf_text = f", RTF {rtf:.2f}" if rtf is not None else ""
+    print(f"\033[92m[INFO]\033[0m Subtitle saved: {srt_file}")
+    print(f"\033[92m[INFO]\033[0m {os.path.basename(file_path)}: {str(timedelta(seconds=int(elapsed)))} for "
+          f"{str(timedelta(seconds=int(duration or 0)))} of audio{rtf_text}")
+
+# Write the SRT of every job the cache already holds
+# Returns (jobs still to transcribe, {file_path: (key, audio_hash)}, served)
+def _serve_from_cache(jobs, cache, options, metrics=None):
+    hashes = cache.audio_hashes([job[0] for job in jobs])
+    remaining = []
+    keys = {}
+    served = 0
+    for job in jobs:
+        file_path, srt_file, _ = job
+        audio_hash = hashes[file_path]
+        if audio_hash is None:
+            remaining.append(job)
+            continue
+        key = cache.key(audio_hash, options)
+        segments = cache.get(key)
+        if segments is None:
+            keys[file_path] = (key, audio_hash)
+            remaining.append(job)
+            continue
+        write_srt(segments, srt_file)
+        print(f"\033[92m[CACHE]\033[0m Subtitle saved: {srt_file}")
+        if metrics is not None:
+            metrics.item("cached")
+        served += 1
+    return remaining, keys, served
+
+# Chunks for one file: about one per worker, cut in silences where there are
+# any; a file with an interrupted streamed run is left to resume instead
+def _plan_split(job, pcm_path, workers, split_long):
+    file_path, srt_file, duration = job
+    if not split_long or workers < 2 or not duration or duration < split_long:
+        return None
+    if os.path.exists(checkpoint_path(srt_file)):
+        return None
+    try:
+        silences = detect_silences(pcm_path)
+    except (OSError, subprocess.CalledProcessError):
+        silences = []
+    chunks = plan_chunks(duration, silences, max(MIN_CHUNK, duration / workers))
+    return chunks if len(chunks) > 1 else None
+# ============================================================================
+# jobs: list of (file_path, srt_file, duration_seconds or None)
+# engine: spec dict for transcription_engines.create_engine, or a model name
+# for openai-whisper
+# decode_ahead: decoded files allowed to wait ahead of the transcribers
+# stream_window: seconds of audio per streamed, checkpointed window (0: off)
+# metrics: optional MetricsRecorder for per-file decode and inference time
+# cache: optional TranscriptCache to serve repeated audio and store new results
+# workers: size of the process pool, 0 for auto_workers
+# split_long: seconds of audio from which a file is split across the workers (0: off)
+# Returns the number of subtitles written
+def transcribe_files(jobs, engine="base", workers=1, decode_ahead=2, metrics=None, cache=None, stream_window=0,
+                     split_long=0):
+    spec = {'model': engine} if isinstance(engine, str) else dict(engine)
+    # Everything that changes the output goes into the cache key
+    options = create_engine(spec).options()
+    engine_options = dict(options)
+    if stream_window:
+        options['window'] = stream_window
+    keys = {}
+    served = 0
+    if cache is not None and jobs:
+        jobs, keys, served = _serve_from_cache(jobs, cache, options, metrics)
+        if served:
+            print(f"\033[92m[INFO]\033[0m {served} subtitle{'s' if served != 1 else ''} from the transcription cache")
+    if not jobs:
+        return served
+
+    # Longest first, unknown durations last
+    jobs = sorted(jobs, key=lambda job: job[2] or 0, reverse=True)
+    # More workers than files only pay off when a long file is split across them
+    splittable = split_long and any((job[2] or 0) >= split_long for job in jobs)
+    workers = int(workers) or auto_workers(splittable)
+    workers = max(1, workers if splittable else min(workers, len(jobs) or 1))
+
+    batch_start = time.monotonic()
+    totals = {"audio": 0.0, "processing": 0.0, "decode": 0.0, "complete": served}
+
+    def finish(job, result, decode_seconds):
+        file_path, srt_file, duration = job
+        elapsed, segments = result
+        _report(file_path, srt_file, elapsed, duration)
+        if file_path in keys:
+            key, audio_hash = keys[file_path]
+            cache.put(key, audio_hash, options, segments)
+        if metrics is not None:
+            metrics.transcription(file_path, duration, decode_seconds, elapsed)
+            metrics.item("succeeded")
+        totals["audio"] += duration or 0
+        totals["processing"] += elapsed
+        totals["complete"] += 1
+
+    # Every worker keeps one file in flight plus decode_ahead waiting
+    with AudioPrefetcher(jobs, depth=workers + decode_ahead) as prefetcher:
+        if workers == 1:
+            _load_engine(spec)
+            for job, pcm_path, decode_seconds, error in prefetcher:
+                totals["decode"] += decode_seconds
+                print(f"\n\033[92m[INFO]\033[0m Transcribing: {os.path.basename(job[0])}")
+                try:
+                    if error:
+                        raise RuntimeError(f"could not decode audio: {error}")
+                    finish(job, _transcribe_one(job[0], job[1], True, pcm_path, stream_window, engine_options),
+                           decode_seconds)
+                except Exception as e:
+                    print(f"\033[91m[ERROR]\033[0m Failed to transcribe {os.path.basename(job[0])}: {e}")
+                finally:
+                    prefetcher.release(pcm_path)
+        else:
+            # Split the cores between workers so the engines' thread pools do not fight
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                     initializer=_load_engine, initargs=(spec, threads)) as pool:
+                futures = {}
+                # Split files by file_path: chunk results in order and the chunks still running
+                splits = {}
+
+                def failed(job, error):
+                    print(f"\033[91m[ERROR]\033[0m Failed to transcribe {os.path.basename(job[0])}: {error}")
+
+                def collect(done):
+                    for future in done:
+                        job, pcm_path, decode_seconds, chunk = futures.pop(future)
+                        if chunk is None:
+                            prefetcher.release(pcm_path)
+                            try:
+                                finish(job, future.result(), decode_seconds)
+                            except Exception as e:
+                                failed(job, e)
+                            continue
+
+                        split = splits[job[0]]
+                        index, keep_start, keep_end = chunk
+                        try:
+                            split['parts'][index] = (keep_start, keep_end, future.result()[1])
+                        except Exception as e:
+                            split['error'] = split['error'] or e
+                        split['running'] -= 1
+                        if split['running']:
+                            continue
+                        del splits[job[0]]
+                        prefetcher.release(pcm_path)
+                        if split['error'] is not None:
+                            failed(job, split['error'])
+                            continue
+                        try:
+                            segments = stitch(split['parts'])
+                            write_srt(segments, job[1])
+                            finish(job, (time.monotonic() - split['start_time'], segments), decode_seconds)
+                        except Exception as e:
+                            failed(job, e)
+
+                for job, pcm_path, decode_seconds, error in prefetcher:
+                    totals["decode"] += decode_seconds
+                    if error:
+                        print(f"\033[91m[ERROR]\033[0m Could not decode audio of {os.path.basename(job[0])}: {error}")
+                        prefetcher.release(pcm_path)
+                        continue
+                    chunks = _plan_split(job, pcm_path, workers, split_long)
+                    if chunks:
+                        print(f"\033[92m[INFO]\033[0m Queued: {os.path.basename(job[0])} in {len(chunks)} chunks")
+                        splits[job[0]] = {'parts': [None] * len(chunks), 'running': len(chunks), 'error': None,
+                                          'start_time': time.monotonic()}
+                        for index, (start, end, keep_start, keep_end) in enumerate(chunks):
+                            future = pool.submit(_transcribe_chunk, pcm_path, start, end)
+                            futures[future] = (job, pcm_path, decode_seconds, (index, keep_start, keep_end))
+                    else:
+                        print(f"\033[92m[INFO]\033[0m Queued: {os.path.basename(job[0])}")
+                        future = pool.submit(_transcribe_one, job[0], job[1], False, pcm_path, stream_window,
+                                             engine_options)
+                        futures[future] = (job, pcm_path, decode_seconds, None)
+
+                    # Report finished files while the decoder keeps working ahead
+                    done = [future for future in futures if future.done()]
+                    collect(done)
+
+                while futures:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    collect(done)
+
+    wall = time.monotonic() - batch_start
+    total_audio = totals["audio"]
+    if total_audio:
+        print(f"\n\033[92m[INFO]\033[0m Aggregate: {str(timedelta(seconds=int(total_audio)))} of audio in "
+              f"{str(timedelta(seconds=int(wall)))} with {workers} worker{'s' if workers != 1 else ''}")
+        print(f"\033[92m[INFO]\033[0m Per-worker RTF {totals['processing'] / total_audio:.2f}, "
+              f"batch RTF {wall / total_audio:.2f}, decode {str(timedelta(seconds=int(totals['decode'])))} (overlapped)")
+    return totals["complete"]
@@ -0,0 +1,92 @@
+# ============================================================================
+# Transcription engines behind one interface
+# An engine loads its model once and turns audio (a media path or 16 kHz
+# mono float32 samples) into segments: dicts with start, end and text
+# transcribe_stream() yields them as they are decoded where the backend can,
+# and takes the preceding text as a prompt so a window continues in context
+#   openai-whisper  the reference PyTorch implementation, fp32 on CPU
+#   faster-whisper  CTranslate2 with int8 weights by default, much faster on
+#                   CPU-only hosts at nearly the same accuracy
+# Each backend is imported only when its engine is loaded
+# ============================================================================
+def _set(options):
+    return {key: value for key, value in options.items() if value is not None}
+
+def _clock(seconds):
+    return f"{int(seconds // 60):02}:{seconds % 60:06.3f}"
+# ============================================================================
+class OpenAIWhisperEngine:
+    name = "openai-whisper"
+
+    def __init__(self, model="base", threads=None, beam_size=None, compute_type=None):
+        self.model = model
+        self.threads = threads
+        self.beam_size = beam_size
+        self._model = None
+
+    # What changes the output; used in the transcription cache key
+    def options(self):
+        return _set({'engine': self.name, 'model': self.model, 'beam_size': self.beam_size})
+
+    def load(self):
+        import torch
+        import whisper
+
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        self._model = whisper.load_model(self.model)
+
+    def transcribe(self, audio, verbose=False):
+        return list(self.transcribe_stream(audio, verbose=verbose))
+
+    # openai-whisper returns the whole result at once
+    def transcribe_stream(self, audio, prompt=None, verbose=False):
+        options = {'beam_size': self.beam_size} if self.beam_size else {}
+        result = self._model.transcribe(audio, verbose=verbose, initial_prompt=prompt, **options)
+        for segment in result["segments"]:
+            yield {'start': segment['start'], 'end': segment['end'], 'text': segment['text']}
+
+class FasterWhisperEngine:
+    name = "faster-whisper"
+
+    def __init__(self, model="base", threads=None, beam_size=None, compute_type=None):
+        self.model = model
+        self.threads = threads
+        self.beam_size = beam_size
+        self.compute_type = compute_type or "int8"
+        self._model = None
+
+    def options(self):
+        return _set({'engine': self.name, 'model': self.model, 'beam_size': self.beam_size,
+                     'compute_type': self.compute_type})
+
+    def load(self):
+        from faster_whisper import WhisperModel
+
+        self._model = WhisperModel(self.model, device="cpu", compute_type=self.compute_type,
+                                   cpu_threads=self.threads or 0)
+
+    def transcribe(self, audio, verbose=False):
+        return list(self.transcribe_stream(audio, verbose=verbose))
+
+    def transcribe_stream(self, audio, prompt=None, verbose=False):
+        if not isinstance(audio, str):
+            import numpy as np
+            audio = np.asarray(audio, dtype=np.float32)
+        # Segments are decoded lazily while the caller consumes them
+        generator, _ = self._model.transcribe(audio, beam_size=self.beam_size or 5, initial_prompt=prompt)
+        for segment in generator:
+            if verbose:
+                print(f"[{_clock(segment.start)} --> {_clock(segment.end)}] {segment.text.strip()}")
+            yield {'start': segment.start, 'end': segment.end, 'text': segment.text}
+# ============================================================================
+ENGINES = {engine.name: engine for engine in (OpenAIWhisperEngine, FasterWhisperEngine)}
+
+# Engine from a spec dict: engine, model, threads, beam_size, compute_type
+# (the last three may be None for the backend's default)
+def create_engine(spec):
+    spec = dict(spec)
+    name = spec.pop('engine', OpenAIWhisperEngine.name)
+    if name not in ENGINES:
+        raise ValueError(f"Unknown transcription engine '{name}' (available: {', '.join(ENGINES)})")
+    return ENGINES[name](**spec)
@@ -0,0 +1,79 @@
+# ============================================================================
+# yt-dlp options, file name normalization and the CSV reader shared by
+# download, plan, search and the transcript commands, kept out of the
+# command modules so a command never has to import another one
+# ============================================================================
+import csv
+import os
+import re
+import unicodedata
+# ============================================================================
+# Helper: sanitize video titles to match saved filenames
+def sanitize_filename(name):
+    return re.sub(r'[\\/*?:"<>|]', '', name).strip().lower()
+
+# Strong normalization to avoid duplicates
+def normalize_filename(name):
+    name = name.lower()
+    name = re.sub(r'[\W_]+', '', name)
+    name = ''.join(c for c in name if not unicodedata.category(c).startswith('So'))
+    return name.strip()
+# ============================================================================
+# yt-dlp download options
+def channel_options(output_dir):
+    return {
+        'outtmpl': os.path.join(output_dir, '%(title)s.%(ext)s'),
+        'writesubtitles': True,
+        'writeautomaticsub': True,
+        'subtitleslangs': ['en'],
+        'subtitlesformat': 'srt',
+        'format': 'bestvideo[height<=720]+bestaudio/best[height<=720]',
+        'merge_output_format': 'mp4',
+        'quiet': False,
+    }
+
+def csv_options(profile, output_dir, audio_format='mp3'):
+    if profile == 'mp3':
+        # m4a and opus are copied without re-encoding when the source allows
+        return {
+            'outtmpl': os.path.join(output_dir, '%(title)s.%(ext)s'),
+            'format': 'bestaudio/best',
+            'postprocessors': [{
+                'key': 'FFmpegExtractAudio',
+                'preferredcodec': audio_format,
+                'preferredquality': '192',
+            }],
+            'quiet': False,
+        }
+
+    # Fixed for 2024–2025 YouTube SABR + client restrictions
+    # Uses cookies.txt instead of browser cookies
+    # Please use cookies.txt by Lennon Hill and download cookies.txt to project folder
+    return {
+        'outtmpl': os.path.join(output_dir, '%(title)s.%(ext)s'),
+        'format': 'bestvideo[height<=720]+bestaudio/best[height<=720]',
+        'merge_output_format': 'mp4',
+        'quiet': False,
+
+        # ---- FIXES ----
+        'cookiefile': 'cookies.txt',
+        'user_agent': 'Mozilla/5.0 (Linux; Android 10)',
+        'client': 'android',
+        'player_client': 'android',
+        'force_sabr': False,
+        'http_headers': {
+            'User-Agent': 'Mozilla/5.0 (Linux; Android 10)',
+        },
+    }
+# ============================================================================
+# Load CSV input (Video ID, Title, URL)
+def load_csv(input_csv):
+    videos = []
+    with open(input_csv, mode='r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)  # Skip header
+        for row in reader:
+            if len(row) >= 3:
+                video_id, title, url = row[0], row[1], row[2]
+                videos.append((video_id, title, url))
+    return videos